@@ -0,0 +1,100 @@
+"""
+========================================
+Modular Telegram Bot - Database Benchmark
+========================================
+Nama: DB Benchmark
+Deskripsi: Membandingkan throughput update (updates/detik) antara
+           koneksi per-call (perilaku lama) dan koneksi pooled
+Command: -
+Usage: python benchmarks/db_benchmark.py [--updates N] [--users N]
+========================================
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+from utils.migrations import run_migrations
+from utils.storage import MemoryBackend, StorageBackend
+
+
+class LegacyDatabase(Database):
+    """Database dengan perilaku lama: connect/commit/close setiap call"""
+
+    def _init_tables(self):
+        # Tanpa koneksi pooled agar journal mode tetap default (bukan WAL)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.migration_report = run_migrations(conn)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    _get_read_connection = _get_connection
+
+
+def simulate_updates(database: StorageBackend, updates: int, users: int) -> float:
+    """
+    Menjalankan beban seperti handler: update_user_activity + log_command.
+
+    Returns:
+        Jumlah update per detik
+    """
+    for user_id in range(users):
+        database.add_user(user_id, username=f"user{user_id}")
+
+    start = time.perf_counter()
+    for i in range(updates):
+        user_id = i % users
+        database.update_user_activity(user_id)
+        database.log_command("bench", user_id)
+    elapsed = time.perf_counter() - start
+
+    return updates / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database handler")
+    parser.add_argument("--updates", type=int, default=2000, help="Jumlah update simulasi")
+    parser.add_argument("--users", type=int, default=100, help="Jumlah user unik")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyDatabase(os.path.join(tmp, "legacy.db"))
+        legacy_rate = simulate_updates(legacy, args.updates, args.users)
+        legacy.close()
+
+        pooled = Database(os.path.join(tmp, "pooled.db"))
+        pooled_rate = simulate_updates(pooled, args.updates, args.users)
+        pooled.close()
+
+    memory_rate = simulate_updates(MemoryBackend(), args.updates, args.users)
+
+    print(f"Updates      : {args.updates} ({args.users} users)")
+    print(f"Per-call     : {legacy_rate:,.0f} updates/s")
+    print(f"Pooled (WAL) : {pooled_rate:,.0f} updates/s")
+    print(f"Speedup      : {pooled_rate / legacy_rate:.1f}x")
+    print(f"In-memory    : {memory_rate:,.0f} updates/s (tanpa disk I/O)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+========================================
+Modular Telegram Bot - Supervisor Benchmark
+========================================
+Nama: Supervisor Benchmark
+Deskripsi: Mengukur throughput (updates/detik) mode supervisor saat
+           jumlah worker ditambah. Update sintetis di-shard per chat
+           lewat WorkerPool; setiap worker menjalankan handler CPU-bound
+           dan menulis statistik ke database WAL yang sama
+Command: -
+Usage: python benchmarks/supervisor_benchmark.py [--updates N] [--chats N]
+                                                 [--workers 1,2,4] [--work N]
+========================================
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.supervisor import WorkerPool, serve_connection
+from utils.async_database import AsyncDatabase
+from utils.database import Database
+
+
+def cpu_work(iterations: int) -> int:
+    """Beban CPU murni Python (seperti plugin qrcode/calculator)"""
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return total
+
+
+def bench_worker(index: int, count: int, connection, db_path: str, work: int, ready):
+    """Worker benchmark: handler CPU-bound + write buffer ke database bersama"""
+
+    async def main():
+        async_db = AsyncDatabase(Database(db_path))
+        async_db.start()
+
+        async def handle(data: bytes):
+            update = json.loads(data)
+            user_id = update["message"]["from"]["id"]
+            cpu_work(work)
+            await async_db.update_user_activity(user_id)
+            await async_db.log_command("bench", user_id)
+
+        ready.put(index)
+        await serve_connection(connection, handle)
+        await async_db.stop()
+        async_db.close()
+        async_db.database.close()
+
+    asyncio.run(main())
+
+
+def make_update(update_id: int, chat_id: int) -> bytes:
+    """Payload update sintetis (format JSON Bot API)"""
+    return json.dumps({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "bench"},
+            "text": "/bench"
+        }
+    }).encode()
+
+
+async def run_pool(workers: int, db_path: str, updates: int, chats: int, work: int) -> dict:
+    """
+    Menjalankan satu putaran benchmark. Waktu diukur dari dispatch
+    pertama sampai semua worker selesai memproses dan keluar.
+    """
+    ready = multiprocessing.get_context("spawn").Queue()
+    pool = WorkerPool(workers, bench_worker, args=(db_path, work, ready))
+    pool.start()
+    loop = asyncio.get_running_loop()
+    for _ in range(workers):
+        await loop.run_in_executor(None, ready.get)
+
+    start = time.perf_counter()
+    for i in range(updates):
+        chat_id = i % chats + 1
+        await pool.dispatch(chat_id, make_update(i, chat_id))
+    await pool.stop()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "workers": workers,
+        "rate": updates / elapsed if elapsed > 0 else float("inf"),
+        "dispatched": pool.get_metrics()["dispatched"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mode supervisor")
+    parser.add_argument("--updates", type=int, default=5000, help="Jumlah update simulasi")
+    parser.add_argument("--chats", type=int, default=500, help="Jumlah chat unik")
+    parser.add_argument("--workers", default="1,2,4", help="Daftar jumlah worker, pisahkan koma")
+    parser.add_argument("--work", type=int, default=20000,
+                        help="Iterasi CPU per update (0 = hanya I/O database)")
+    args = parser.parse_args()
+    counts = [int(value) for value in args.workers.split(",") if value.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in counts:
+            db_path = os.path.join(tmp, f"workers_{workers}.db")
+            # Migrasi dijalankan sekali sebelum worker dibuat
+            database = Database(db_path)
+            for user_id in range(1, args.chats + 1):
+                database.add_user(user_id, username=f"user{user_id}")
+            database.close()
+
+            results.append(asyncio.run(
+                run_pool(workers, db_path, args.updates, args.chats, args.work)
+            ))
+
+    base = results[0]["rate"]
+    print(f"Updates : {args.updates} ({args.chats} chats, {args.work} CPU iterations/update)")
+    print(f"CPU     : {os.cpu_count()} cores")
+    for result in results:
+        print(f"{result['workers']:>2} worker(s) : {result['rate']:>8,.0f} updates/s "
+              f"({result['rate'] / base:.2f}x)  shard={result['dispatched']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,11 @@ Usage: Jalankan file ini untuk memulai bot
 """
 
 import asyncio
+import json
+import secrets
 import signal
 import sys
+import time
 from typing import Optional
 
 from telegram import Update, Bot
@@ -27,13 +30,36 @@ from telegram.ext import (
 
 from config import (
     BOT_TOKEN, BOT_NAME, BOT_VERSION, BOT_AUTHOR,
-    LOG_LEVEL, LOG_FILE, PLUGINS_FOLDER,
+    BOT_MODE, BOT_WORKERS, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_URL,
+    UPDATE_CONCURRENCY, UPDATE_MAX_PENDING, UPDATE_DEDUP_WINDOW, BACKLOG_BATCH_SIZE,
+    ADMISSION_LOW_DEPTH, ADMISSION_HIGH_DEPTH, ADMISSION_LOW_LATENCY_MS, ADMISSION_HIGH_LATENCY_MS,
+    ADMISSION_DEFER_SECONDS, ADMISSION_REPLY_COOLDOWN, BUSY_MESSAGE,
+    INBOUND_USER_LIMIT, INBOUND_CHAT_LIMIT, INBOUND_COMMAND_LIMITS, RATE_LIMITED_MESSAGE, ADMIN_IDS,
+    RATE_LIMIT_GLOBAL, RATE_LIMIT_PRIVATE, RATE_LIMIT_GROUP_PER_MINUTE, RATE_LIMIT_MAX_RETRIES,
+    BROADCAST_CONCURRENCY, BROADCAST_BATCH_SIZE, BROADCAST_PROGRESS_INTERVAL,
+    HEALTH_HOST, HEALTH_PORT, HEALTH_MAX_LOOP_LAG_MS, HEALTH_MAX_UPDATE_AGE,
+    HEALTH_MAX_OUTBOUND_QUEUE, HEALTH_DB_QUICK_CHECK_INTERVAL, LOOP_MONITOR_INTERVAL_MS, LOOP_BLOCK_THRESHOLD_MS,
+    ERROR_SAMPLE_WINDOW, ERROR_REPLY_COOLDOWN,
+    SHUTDOWN_TIMEOUT, LOG_LEVEL, LOG_FILE, PLUGINS_FOLDER,
     WELCOME_MESSAGE, HELP_MESSAGE,
     BUTTON_PLUGINS, BUTTON_HELP, BUTTON_INFO, BUTTON_BACK
 )
+from core.admission import AdmissionController
+from core.broadcast import BroadcastEngine
+from core.error_tracker import ErrorTracker
+from core.health import HealthServer
+from core.inbound_limiter import InboundRateLimiter, parse_command_limits, parse_limit
+from core.loop_monitor import LoopMonitor
 from core.plugin_manager import PluginManager
+from core.rate_limiter import FloodRateLimiter
+from core.supervisor import AckSender, WorkerPool, serve_connection
+from core.update_processor import ChatOrderedUpdateProcessor
+from core.update_tracker import UpdateTracker
+from core.webhook import WebhookServer
 from utils.logger import BotLogger, logger
 from utils.database import db
+from utils.async_database import async_db
+from utils.maintenance import create_scheduler
 
 class ModularBot:
     """
@@ -44,22 +70,90 @@ class ModularBot:
     def __init__(self):
         self.application: Optional[Application] = None
         self.plugin_manager = PluginManager(PLUGINS_FOLDER)
+        self.maintenance = create_scheduler(async_db)
+        self.webhook: Optional[WebhookServer] = None
+        self.update_processor = ChatOrderedUpdateProcessor(
+            max_concurrent=UPDATE_CONCURRENCY, max_pending=UPDATE_MAX_PENDING
+        )
+        # Update user yang spam ditolak sebelum sampai ke handler
+        self.inbound_limiter = InboundRateLimiter(
+            user_limit=parse_limit(INBOUND_USER_LIMIT),
+            chat_limit=parse_limit(INBOUND_CHAT_LIMIT),
+            command_limits=parse_command_limits(INBOUND_COMMAND_LIMITS),
+            exempt_ids=ADMIN_IDS,
+            message=RATE_LIMITED_MESSAGE
+        )
+        # Update plugin prioritas rendah ditunda/dibuang saat beban tinggi
+        self.admission = AdmissionController(
+            self.update_processor,
+            low_depth=ADMISSION_LOW_DEPTH,
+            high_depth=ADMISSION_HIGH_DEPTH,
+            low_latency_ms=ADMISSION_LOW_LATENCY_MS,
+            high_latency_ms=ADMISSION_HIGH_LATENCY_MS,
+            defer_seconds=ADMISSION_DEFER_SECONDS,
+            busy_message=BUSY_MESSAGE,
+            reply_cooldown=ADMISSION_REPLY_COOLDOWN
+        )
+        # update_id terakhir yang diproses + dedup (proses penerima saja)
+        self.tracker = UpdateTracker(async_db, window=UPDATE_DEDUP_WINDOW)
+        self.rate_limiter = FloodRateLimiter(
+            global_rate=RATE_LIMIT_GLOBAL,
+            private_rate=RATE_LIMIT_PRIVATE,
+            group_per_minute=RATE_LIMIT_GROUP_PER_MINUTE,
+            max_retries=RATE_LIMIT_MAX_RETRIES
+        )
+        self.broadcast = BroadcastEngine(
+            async_db,
+            concurrency=BROADCAST_CONCURRENCY,
+            batch_size=BROADCAST_BATCH_SIZE,
+            progress_interval=BROADCAST_PROGRESS_INTERVAL
+        )
+        self.errors = ErrorTracker(window=ERROR_SAMPLE_WINDOW, reply_cooldown=ERROR_REPLY_COOLDOWN)
         self.logger = BotLogger("ModularBot", LOG_LEVEL, LOG_FILE)
         self._running = False
+        # Proses utama menjalankan job maintenance dan melanjutkan broadcast
+        # (mode supervisor: hanya worker 0)
+        self.is_primary = True
+        self.workers: Optional[WorkerPool] = None
+        self._receiver: Optional[asyncio.Task] = None
+        self.health: Optional[HealthServer] = None
+        self.loop_monitor = LoopMonitor(
+            interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+            threshold_ms=LOOP_BLOCK_THRESHOLD_MS
+        )
+        # True setelah plugin diinisialisasi dan bot mulai menerima update
+        self.ready = False
+        self._last_forward_at: Optional[float] = None
+        self._quick_checked_at = 0.0
+        self._shutdown_task: Optional[asyncio.Future] = None
         
         # Validasi token
         if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
             self.logger.error("❌ BOT_TOKEN belum diatur! Silakan edit config.py atau set environment variable.")
             sys.exit(1)
+        
+        # Tanpa WEBHOOK_URL secret acak tidak bisa didaftarkan ke Telegram,
+        # dan endpoint tanpa secret menerima update palsu dari siapa pun
+        if BOT_MODE == "webhook" and not WEBHOOK_SECRET and not WEBHOOK_URL:
+            self.logger.error("❌ WEBHOOK_SECRET belum diatur! Mode webhook tanpa WEBHOOK_URL "
+                              "membutuhkan secret yang sama dengan yang didaftarkan ke Telegram.")
+            sys.exit(1)
     
-    async def initialize(self):
+    async def initialize(self, signals=(signal.SIGINT, signal.SIGTERM)):
         """Inisialisasi bot dan semua komponen"""
         self.logger.info("🔄 Initializing bot...")
         
-        # Buat application
+        # Laporan migrasi skema database
+        if db.migration_report:
+            self.logger.info(f"🗄️ {db.migration_report.summary()}")
+        
+        # Buat application (update diproses concurrent, berurutan per chat,
+        # pesan keluar mengikuti batas flood Telegram)
         self.application = (
             ApplicationBuilder()
             .token(BOT_TOKEN)
+            .concurrent_updates(self.update_processor)
+            .rate_limiter(self.rate_limiter)
             .build()
         )
         
@@ -74,11 +168,25 @@ class ModularBot:
         # Register error handler
         self.application.add_error_handler(self._error_handler)
         
+        # Rate limit masuk lalu admission control (klasifikasi memakai
+        # handler yang terdaftar)
+        self.inbound_limiter.bind(self.application)
+        self.update_processor.limiter = self.inbound_limiter
+        self.admission.bind(self.application)
+        self.update_processor.admission = self.admission
+        
         # Inisialisasi semua plugin
         await self.plugin_manager.initialize_all_plugins()
         
+        # Aktifkan write buffer database
+        async_db.start()
+        
+        # Jadwalkan backup online dan maintenance database
+        if self.is_primary:
+            self.maintenance.start()
+        
         # Setup signal handlers untuk graceful shutdown
-        for sig in (signal.SIGINT, signal.SIGTERM):
+        for sig in signals:
             asyncio.get_event_loop().add_signal_handler(
                 sig, lambda: asyncio.create_task(self.shutdown())
             )
@@ -88,14 +196,24 @@ class ModularBot:
     
     async def run(self):
         """Menjalankan bot"""
+        self._start_loop_monitor()
+        # Health endpoint dijalankan lebih dulu agar status warming up terlihat
+        await self._start_health(
+            {"plugins": self._check_ready, "database": self._check_database},
+            self._health_signals
+        )
         await self.initialize()
         
-        self.logger.info("🚀 Starting bot polling...")
-        
         # Start the bot
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling(drop_pending_updates=True)
+        
+        self.update_processor.tracker = self.tracker
+        await self._start_receiving()
+        
+        # Lanjutkan broadcast yang terputus saat bot berhenti
+        await self.broadcast.start(self.application)
+        self.ready = True
         
         # Keep running sampai dihentikan
         while self._running:
@@ -104,35 +222,334 @@ class ModularBot:
         # Cleanup
         await self.shutdown()
     
-    async def shutdown(self):
-        """Shutdown bot dengan graceful"""
-        if not self._running:
+    async def _start_receiving(self):
+        """
+        Mulai menerima update dari Telegram (webhook atau polling).
+        Update yang tertunda selama bot mati tidak dibuang: mode polling
+        mengejar backlog lebih dulu, mode webhook menerimanya dari Telegram.
+        """
+        await self.tracker.load()
+        self.tracker.start()
+        if BOT_MODE == "webhook":
+            await self._start_webhook()
+        else:
+            try:
+                await self.tracker.catch_up(
+                    self.application.bot, self.application.update_queue, BACKLOG_BATCH_SIZE
+                )
+            except Exception as e:
+                self.logger.error(f"❌ Backlog catch-up failed, continuing with polling: {e}")
+            self.logger.info("🚀 Starting bot polling...")
+            await self.application.updater.start_polling(drop_pending_updates=False)
+    
+    async def run_worker(self, connection, index: int = 0, count: int = 1):
+        """
+        Menjalankan bot sebagai worker mode supervisor: stack plugin
+        normal, tetapi update dibaca dari pipe supervisor, bukan dari
+        Telegram. Worker berhenti saat pipe ditutup atau menerima SIGTERM.
+        """
+        self.is_primary = index == 0
+        # Batas flood global dibagi rata (batas per chat tetap, karena
+        # satu chat selalu diproses oleh worker yang sama)
+        self.rate_limiter = FloodRateLimiter(
+            global_rate=RATE_LIMIT_GLOBAL / count,
+            private_rate=RATE_LIMIT_PRIVATE,
+            group_per_minute=RATE_LIMIT_GROUP_PER_MINUTE,
+            max_retries=RATE_LIMIT_MAX_RETRIES
+        )
+        self.logger.info(f"👷 Worker {index}/{count} starting")
+        self._start_loop_monitor()
+        await self.initialize(signals=(signal.SIGTERM,))
+        
+        await self.application.initialize()
+        await self.application.start()
+        await self.broadcast.start(self.application, resume=self.is_primary)
+        self.ready = True
+        
+        async def enqueue(data: bytes):
+            update = Update.de_json(json.loads(data), self.application.bot)
+            await self.application.update_queue.put(update)
+        
+        # Ack ke supervisor setelah setiap update selesai diproses
+        self.update_processor.tracker = AckSender(connection)
+        self._receiver = asyncio.create_task(serve_connection(connection, enqueue))
+        while self._running and not self._receiver.done():
+            await asyncio.sleep(0.5)
+        
+        # Pipe ditutup atau SIGTERM: drain update yang sudah diterima
+        await self.shutdown()
+        connection.close()
+    
+    async def run_supervisor(self, workers: int):
+        """
+        Mode supervisor: proses ini hanya menerima update (polling atau
+        webhook) dan meneruskannya ke `workers` proses worker, di-shard
+        per chat_id. Plugin, handler dan database dijalankan di worker.
+        """
+        self.logger.info(f"🧭 Supervisor starting with {workers} workers...")
+        self._start_loop_monitor()
+        await self._start_health(
+            {"workers": self._check_workers, "database": self._check_database},
+            self._supervisor_signals
+        )
+        
+        # Application tanpa handler; update_queue dikonsumsi supervisor
+        self.application = ApplicationBuilder().token(BOT_TOKEN).build()
+        await self.application.initialize()
+        
+        # Update baru dianggap selesai (offset boleh maju) setelah worker mengirim ack
+        self.workers = WorkerPool(workers, on_ack=self.tracker.done)
+        self.workers.start()
+        forwarder = asyncio.create_task(self._forward_updates())
+        
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_event_loop().add_signal_handler(sig, self._stop_supervisor)
+        
+        self._running = True
+        await self._start_receiving()
+        self.ready = True
+        
+        while self._running:
+            await asyncio.sleep(1)
+        
+        # Berhenti menerima, teruskan sisa antrian, lalu tutup pipe worker
+        self.ready = False
+        self.logger.info("🛑 Stopping supervisor...")
+        if self.webhook:
+            await self.webhook.stop()
+        if self.application.updater.running:
+            await self.application.updater.stop()
+        await self.application.update_queue.join()
+        forwarder.cancel()
+        await self.workers.stop()
+        await self.tracker.stop()
+        self.logger.info(f"👷 Workers stopped: {self.workers.get_metrics()}")
+        await self.application.shutdown()
+        if self.health:
+            await self.health.stop()
+        await self.loop_monitor.stop()
+        async_db.close()
+        db.close()
+        self.logger.bot_stopped()
+    
+    def _stop_supervisor(self):
+        self._running = False
+    
+    async def _forward_updates(self):
+        """Meneruskan update dari update_queue ke worker sesuai chat"""
+        queue = self.application.update_queue
+        while True:
+            update = await queue.get()
+            self._last_forward_at = time.time()
+            # Duplikat dibuang di sini; update baru selesai saat worker
+            # mengirim ack (tracker.done dipanggil lewat on_ack WorkerPool)
+            if not self.tracker.begin(update.update_id):
+                queue.task_done()
+                continue
+            try:
+                key = ChatOrderedUpdateProcessor.get_chat_key(update)
+                await self.workers.dispatch(key, update.to_json().encode(), update.update_id)
+            except Exception as e:
+                self.logger.error(f"Failed to forward update: {e}")
+                self.tracker.done(update.update_id)
+            finally:
+                queue.task_done()
+    
+    async def _start_health(self, ready_checks: dict, signals):
+        """Menjalankan health endpoint (jika HEALTH_PORT > 0)"""
+        if HEALTH_PORT <= 0:
             return
+        self.health = HealthServer(
+            ready_checks, signals,
+            host=HEALTH_HOST,
+            port=HEALTH_PORT,
+            max_loop_lag_ms=HEALTH_MAX_LOOP_LAG_MS,
+            max_update_age=HEALTH_MAX_UPDATE_AGE,
+            max_outbound_queue=HEALTH_MAX_OUTBOUND_QUEUE,
+            loop_monitor=self.loop_monitor if self.loop_monitor.running else None
+        )
+        try:
+            await self.health.start()
+        except Exception as e:
+            self.logger.error(f"❌ Health endpoint not started: {e}")
+            self.health = None
+    
+    def _start_loop_monitor(self):
+        """Menjalankan monitor lag event loop (jika LOOP_MONITOR_INTERVAL_MS > 0)"""
+        if LOOP_MONITOR_INTERVAL_MS > 0:
+            self.loop_monitor.start()
+    
+    async def _check_ready(self) -> bool:
+        return self.ready
+    
+    async def _check_database(self) -> bool:
+        """
+        Readiness database di pool reader (probe tidak pernah antre di
+        thread writer); quick_check dijalankan paling sering setiap
+        HEALTH_DB_QUICK_CHECK_INTERVAL detik
+        """
+        now = time.monotonic()
+        quick_check = (HEALTH_DB_QUICK_CHECK_INTERVAL > 0
+                       and now - self._quick_checked_at >= HEALTH_DB_QUICK_CHECK_INTERVAL)
+        if quick_check:
+            self._quick_checked_at = now
+        return await async_db.run_read(async_db.database.check_health, quick_check)
+    
+    async def _check_workers(self) -> bool:
+        metrics = self.workers.get_metrics() if self.workers else None
+        return bool(metrics) and metrics["alive"] == metrics["workers"]
+    
+    def _health_signals(self) -> dict:
+        """Sinyal liveness mode satu proses"""
+        last_update = self.update_processor.last_update_at
+        return {
+            "update_age_s": time.time() - last_update if last_update else None,
+            "outbound_queue": self.rate_limiter.get_metrics()["queued"],
+            "in_flight": self.update_processor.in_flight,
+            "pending_updates": self.update_processor.pending
+        }
+    
+    def _supervisor_signals(self) -> dict:
+        """Sinyal liveness mode supervisor (antrian = update menunggu dikirim ke worker)"""
+        metrics = self.workers.get_metrics() if self.workers else {"queued": []}
+        return {
+            "update_age_s": time.time() - self._last_forward_at if self._last_forward_at else None,
+            "outbound_queue": sum(metrics["queued"]),
+            "workers_alive": metrics.get("alive", 0)
+        }
+    
+    async def _start_webhook(self):
+        """
+        Menjalankan server webhook dan (opsional) mendaftarkan URL ke Telegram.
+        Endpoint tidak pernah dibuka tanpa secret token: jika WEBHOOK_SECRET
+        kosong, secret acak dibuat dan didaftarkan lewat setWebhook.
+        """
+        secret_token = WEBHOOK_SECRET
+        if not secret_token:
+            secret_token = secrets.token_urlsafe(32)
+            self.logger.warning("⚠️ WEBHOOK_SECRET is empty: using a random secret for this run "
+                                "(set WEBHOOK_SECRET to keep it stable across restarts)")
         
+        self.logger.info("🚀 Starting bot webhook...")
+        self.webhook = WebhookServer(
+            self.application,
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            path=WEBHOOK_PATH,
+            secret_token=secret_token
+        )
+        await self.webhook.start()
+        
+        if WEBHOOK_URL:
+            await self.application.bot.set_webhook(
+                url=WEBHOOK_URL,
+                secret_token=secret_token,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=False
+            )
+            self.logger.info(f"🔗 Webhook registered: {WEBHOOK_URL}")
+    
+    async def shutdown(self):
+        """
+        Shutdown bot dengan graceful. Dipanggil berkali-kali (signal dan
+        akhir run()) tetap hanya menjalankan satu drain; pemanggil lain
+        ikut menunggu sampai selesai.
+        """
+        if self._shutdown_task is None:
+            if not self._running:
+                return
+            self._shutdown_task = asyncio.ensure_future(self._drain_and_stop())
+        await asyncio.shield(self._shutdown_task)
+    
+    async def _drain_and_stop(self):
+        """
+        Urutan shutdown:
+        1. Berhenti menerima update (webhook, polling, pipe supervisor)
+        2. Tunggu update yang sedang diproses sampai SHUTDOWN_TIMEOUT,
+           sisanya dibatalkan
+        3. Hentikan broadcast setelah batch aktif (checkpoint)
+        4. Simpan update_id terakhir yang selesai diproses
+        5. Shutdown plugin (reminder/timer tertunda disimpan ke database)
+        6. Flush write buffer, lalu stop Application dan tutup database
+        """
         self._running = False
-        self.logger.info("🛑 Shutting down bot...")
+        self.ready = False
+        started = time.perf_counter()
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        self.logger.info(f"🛑 Shutting down bot (drain timeout {SHUTDOWN_TIMEOUT:g}s)...")
         
-        # Shutdown semua plugin
+        # Berhenti menerima update baru
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self.application:
+            if self.webhook:
+                await self.webhook.stop()
+            if self.application.updater and self.application.updater.running:
+                await self.application.updater.stop()
+        
+        # Tunggu handler yang sedang berjalan sampai deadline
+        drained = True
+        if self.application and self.application.running:
+            drained = await self._drain_updates(deadline)
+            if not drained:
+                cancelled = self.update_processor.cancel_pending()
+                self.logger.warning(f"⏱️ Drain timeout: {cancelled} unfinished updates cancelled")
+        
+        # Hentikan broadcast setelah batch aktif (dilanjutkan saat start berikutnya)
+        await self.broadcast.stop(timeout=max(1.0, deadline - time.monotonic()))
+        
+        # Simpan update_id terakhir yang selesai (backlog dilanjutkan dari sini)
+        await self.tracker.stop()
+        
+        # Shutdown semua plugin (pekerjaan terjadwal disimpan ke database)
         await self.plugin_manager.shutdown_all_plugins()
         
+        # Hentikan job maintenance
+        await self.maintenance.stop()
+        
+        # Flush write buffer sebelum Application berhenti
+        await async_db.stop()
+        self.logger.info(f"💾 Write buffer flushed: {async_db.buffer.get_metrics()}")
+        
         # Stop application
         if self.application:
-            await self.application.updater.stop()
-            await self.application.stop()
+            if self.application.running:
+                await self.application.stop()
             await self.application.shutdown()
         
+        # Tunggu operasi database lalu tutup koneksi
+        async_db.close()
+        db.close()
+        
+        if self.health:
+            await self.health.stop()
+        await self.loop_monitor.stop()
+        
+        self.logger.info(
+            f"✅ Drain {'complete' if drained else 'timed out'} in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
         self.logger.bot_stopped()
     
-    async def _error_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handler untuk error"""
-        self.logger.error(f"Exception while handling update: {context.error}")
-        
-        # Log detail error
-        import traceback
-        self.logger.error(traceback.format_exc())
+    async def _drain_updates(self, deadline: float) -> bool:
+        """Menunggu update_queue kosong dan semua handler selesai sampai deadline"""
+        while self.application.update_queue.qsize():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return await self.update_processor.drain(max(0.0, deadline - time.monotonic()))
+    
+    async def _error_handler(self, update: object, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk error. Error dikelompokkan per fingerprint: traceback
+        dicatat sekali per window dan balasan ke chat yang sama dibatasi
+        cooldown, agar upstream yang mati tidak membanjiri log dan kuota kirim.
+        """
+        chat = update.effective_chat if isinstance(update, Update) else None
+        reply = self.errors.record(context.error, chat.id if chat else None)
         
         # Kirim pesan error ke user jika ada update
-        if update and update.effective_message:
+        if reply and update.effective_message:
             try:
                 await update.effective_message.reply_text(
                     "⚠️ <b>Terjadi kesalahan!</b>\n\n"
@@ -156,39 +573,36 @@ class ModularBot:
     
     async def send_broadcast(self, message: str, parse_mode: str = "HTML") -> dict:
         """
-        Mengirim broadcast ke semua user.
-        Hanya untuk admin.
+        Mengirim broadcast ke semua user dan menunggu sampai selesai.
+        Hanya untuk admin. Untuk broadcast di background (dengan progres
+        dan pembatalan) gunakan self.broadcast.create() dan submit().
         
         Returns:
             dict dengan hasil broadcast
         """
-        from config import ADMIN_IDS
-        
-        users = db.get_all_users(limit=10000)
-        success = 0
-        failed = 0
-        
-        for user in users:
-            try:
-                await self.application.bot.send_message(
-                    chat_id=user["user_id"],
-                    text=message,
-                    parse_mode=parse_mode
-                )
-                success += 1
-            except Exception as e:
-                failed += 1
-                self.logger.error(f"Failed to send broadcast to {user['user_id']}: {e}")
-        
-        return {"success": success, "failed": failed, "total": len(users)}
+        job_id = await self.broadcast.create(message, parse_mode)
+        job = await self.broadcast.submit(job_id)
+        failed = job["failed"] + job["blocked"]
+        return {"success": job["sent"], "failed": failed, "total": job["sent"] + failed,
+                "job_id": job_id}
 
-# Singleton instance
+# Dijalankan sebagai script (`python bot.py`, atau di-load ulang sebagai
+# __mp_main__ oleh worker spawn): daftarkan module ini juga sebagai `bot`
+# agar `from bot import bot` di plugin/supervisor tidak meng-import file ini
+# lagi dan membuat ModularBot kedua
+if __name__ in ("__main__", "__mp_main__"):
+    sys.modules.setdefault("bot", sys.modules[__name__])
+
+# Singleton instance (satu per proses)
 bot = ModularBot()
 
-# Entry point
-if __name__ == "__main__":
+def main():
+    """Entry point: menjalankan singleton `bot` (supervisor jika BOT_WORKERS > 1)"""
     try:
-        asyncio.run(bot.run())
+        if BOT_WORKERS > 1:
+            asyncio.run(bot.run_supervisor(BOT_WORKERS))
+        else:
+            asyncio.run(bot.run())
     except KeyboardInterrupt:
         print("\n👋 Bot dihentikan oleh user")
     except Exception as e:
@@ -196,3 +610,7 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
         sys.exit(1)
+
+# Entry point
+if __name__ == "__main__":
+    main()
@@ -25,8 +25,109 @@ BOT_NAME = os.getenv("BOT_NAME", "ModularBot")
 BOT_VERSION = "1.0.0"
 BOT_AUTHOR = "Developer"
 
+# Mode penerimaan update: polling (default) atau webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+# Wajib diisi jika WEBHOOK_URL kosong; jika kosong dan WEBHOOK_URL diisi,
+# secret acak dibuat setiap start dan didaftarkan lewat setWebhook
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# URL publik yang didaftarkan ke Telegram (kosong = tidak memanggil setWebhook,
+# misal saat di belakang load balancer yang sudah terdaftar atau saat test lokal)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+
+# Health endpoint HTTP (/health, /health/ready, /health/live); port 0 = nonaktif
+HEALTH_HOST = os.getenv("HEALTH_HOST", "127.0.0.1")
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8080"))
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "1000"))
+HEALTH_MAX_UPDATE_AGE = float(os.getenv("HEALTH_MAX_UPDATE_AGE", "0"))  # detik, 0 = tidak dicek
+HEALTH_MAX_OUTBOUND_QUEUE = int(os.getenv("HEALTH_MAX_OUTBOUND_QUEUE", "1000"))
+# Interval PRAGMA quick_check pada readiness check database (detik, 0 = nonaktif)
+HEALTH_DB_QUICK_CHECK_INTERVAL = float(os.getenv("HEALTH_DB_QUICK_CHECK_INTERVAL", "300"))
+
+# Monitor lag event loop: interval sampel (ms, 0 = nonaktif) dan ambang
+# loop dianggap tertahan sehingga stack-nya dicatat ke log (ms, 0 = tanpa stack)
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250"))
+
+# Proteksi badai error: traceback per fingerprint dicatat sekali per window,
+# balasan error ke chat yang sama untuk fingerprint sama dibatasi cooldown (detik)
+ERROR_SAMPLE_WINDOW = float(os.getenv("ERROR_SAMPLE_WINDOW", "60"))
+ERROR_REPLY_COOLDOWN = float(os.getenv("ERROR_REPLY_COOLDOWN", "300"))
+
+# Batas waktu menunggu handler yang sedang berjalan saat shutdown (detik)
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+
+# Mode supervisor: >1 menjalankan satu proses penerima dan N proses worker
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+
+# Pemrosesan update concurrent (urutan per chat tetap terjaga)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "64"))
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "4096"))
+# Admission control: di atas watermark update plugin "fun" lalu "utility"
+# ditunda/dibuang (admin dan menu tidak pernah); LOW_DEPTH 0 = nonaktif
+ADMISSION_LOW_DEPTH = int(os.getenv("ADMISSION_LOW_DEPTH", "200"))
+ADMISSION_HIGH_DEPTH = int(os.getenv("ADMISSION_HIGH_DEPTH", "1000"))
+ADMISSION_LOW_LATENCY_MS = float(os.getenv("ADMISSION_LOW_LATENCY_MS", "2000"))  # 0 = tidak dicek
+ADMISSION_HIGH_LATENCY_MS = float(os.getenv("ADMISSION_HIGH_LATENCY_MS", "10000"))
+ADMISSION_DEFER_SECONDS = float(os.getenv("ADMISSION_DEFER_SECONDS", "5"))
+ADMISSION_REPLY_COOLDOWN = float(os.getenv("ADMISSION_REPLY_COOLDOWN", "30"))  # detik per chat
+# Jumlah update_id terakhir yang diingat untuk membuang duplikat (retry webhook)
+UPDATE_DEDUP_WINDOW = int(os.getenv("UPDATE_DEDUP_WINDOW", "2048"))
+# Update backlog yang diproses per halaman saat startup (maks 100, batas getUpdates)
+BACKLOG_BATCH_SIZE = min(100, int(os.getenv("BACKLOG_BATCH_SIZE", "100")))
+
+# Rate limit update masuk ("jumlah/detik", kosong = tanpa batas); admin tidak dibatasi
+INBOUND_USER_LIMIT = os.getenv("INBOUND_USER_LIMIT", "30/60")  # semua update per user
+INBOUND_CHAT_LIMIT = os.getenv("INBOUND_CHAT_LIMIT", "120/60")  # semua user per grup
+# Per command per user; alias dipisah | berbagi satu bucket
+INBOUND_COMMAND_LIMITS = os.getenv(
+    "INBOUND_COMMAND_LIMITS",
+    "qr|qrurl=5/60,weather|forecast=10/60,translate|tr|detect=10/60,short|unshort=10/60"
+)
+
+# Batas flood Telegram untuk pesan keluar
+RATE_LIMIT_GLOBAL = float(os.getenv("RATE_LIMIT_GLOBAL", "30"))  # pesan/detik
+RATE_LIMIT_PRIVATE = float(os.getenv("RATE_LIMIT_PRIVATE", "1"))  # pesan/detik per chat
+RATE_LIMIT_GROUP_PER_MINUTE = float(os.getenv("RATE_LIMIT_GROUP_PER_MINUTE", "20"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+
+# Broadcast (job persisten, dilanjutkan setelah restart)
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", "100"))  # user per checkpoint
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", "5"))  # detik
+
 # Database Configuration
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/bot_database.db")
+# Backend storage: sqlite:///path, memory://, atau dbm:///path
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATABASE_PATH}")
+DATABASE_BUSY_TIMEOUT = int(os.getenv("DATABASE_BUSY_TIMEOUT", "5000"))  # milidetik
+DATABASE_CACHED_STATEMENTS = int(os.getenv("DATABASE_CACHED_STATEMENTS", "256"))
+DATABASE_READER_THREADS = int(os.getenv("DATABASE_READER_THREADS", "4"))
+DATABASE_BUSY_RETRIES = int(os.getenv("DATABASE_BUSY_RETRIES", "5"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))  # 0 = slow-query log nonaktif
+
+# Cache profil user in-process (LRU + TTL)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))  # detik
+
+# Write-behind buffer untuk aktivitas user dan statistik command
+WRITE_BUFFER_INTERVAL_MS = int(os.getenv("WRITE_BUFFER_INTERVAL_MS", "1000"))
+WRITE_BUFFER_MAX_EVENTS = int(os.getenv("WRITE_BUFFER_MAX_EVENTS", "500"))
+
+# Backup online dan maintenance database (interval 0 = nonaktif)
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+BACKUP_STEP_SLEEP_MS = int(os.getenv("BACKUP_STEP_SLEEP_MS", "50"))
+MAINTENANCE_INTERVAL_HOURS = float(os.getenv("MAINTENANCE_INTERVAL_HOURS", "6"))
+INCREMENTAL_VACUUM_PAGES = int(os.getenv("INCREMENTAL_VACUUM_PAGES", "1000"))
+
+# Retensi statistik per user (hari, 0 = simpan selamanya); agregat harian tetap disimpan
+STATS_RETENTION_DAYS = int(os.getenv("STATS_RETENTION_DAYS", "90"))
+STATS_RETENTION_CHUNK = int(os.getenv("STATS_RETENTION_CHUNK", "1000"))  # baris per transaksi
 
 # Plugin Configuration
 PLUGINS_FOLDER = "plugins"
@@ -65,6 +166,10 @@ Gunakan tombol di bawah untuk navigasi:
 Atau gunakan command /help untuk bantuan lengkap.
 """
 
+BUSY_MESSAGE = "⏳ Bot sedang sibuk, silakan coba lagi beberapa saat lagi."
+
+RATE_LIMITED_MESSAGE = "⏱️ Terlalu banyak permintaan, coba lagi dalam {seconds} detik."
+
 # Button Labels
 BUTTON_PLUGINS = "📦 Plugins"
 BUTTON_HELP = "❓ Bantuan"
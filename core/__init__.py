@@ -3,11 +3,16 @@
 Modular Telegram Bot - Core Package
 ========================================
 Nama: Core
-Deskripsi: Package untuk core functionality (plugin base dan manager)
+Deskripsi: Package untuk core functionality (plugin base, manager, webhook
+           health endpoint dan monitor event loop)
 ========================================
 """
 
 from core.plugin_base import PluginBase, PluginInfo
 from core.plugin_manager import PluginManager
+from core.webhook import WebhookServer
+from core.health import HealthServer
+from core.loop_monitor import LoopMonitor
 
-__all__ = ['PluginBase', 'PluginInfo', 'PluginManager']
+__all__ = ['PluginBase', 'PluginInfo', 'PluginManager', 'WebhookServer', 'HealthServer',
+           'LoopMonitor']
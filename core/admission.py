@@ -0,0 +1,181 @@
+"""
+========================================
+Modular Telegram Bot - Admission Control
+========================================
+Nama: AdmissionController
+Deskripsi: Membatasi pekerjaan prioritas rendah saat bot kelebihan beban.
+           Beban diukur dari kedalaman antrian processor dan latensi
+           handler; di atas watermark, update plugin kategori "fun"
+           dibuang lebih dulu, lalu "utility", admin dan menu tidak pernah
+Command: /queues (bagian Admission)
+Usage: ADMISSION_LOW_DEPTH=200 ADMISSION_HIGH_DEPTH=1000 python bot.py
+========================================
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, Set
+
+from telegram import Update
+
+from utils.logger import logger
+
+class AdmissionController:
+    """
+    Admission control di depan handler.
+
+    Level beban:
+    - 0: normal, semua update diterima (tanpa klasifikasi)
+    - 1: kedalaman >= `low_depth` atau latensi >= `low_latency_ms`
+    - 2: kedalaman >= `high_depth` atau latensi >= `high_latency_ms`
+
+    `SHED_LEVELS` menentukan level mulai dibuangnya setiap kategori; satu
+    level di bawahnya update ditunda (defer) sampai beban turun atau
+    `defer_seconds` habis, lalu tetap dijalankan. Kategori yang tidak ada
+    di `SHED_LEVELS` (admin, info/menu, core) tidak pernah ditahan.
+    `admit` dipanggil processor di dalam giliran chat, sehingga update yang
+    ditunda ikut menahan update berikutnya dari chat yang sama (urutan
+    per chat tetap terjaga).
+
+    Update yang dibuang dibalas `busy_message` (teks tetap tanpa
+    parse_mode, tanpa akses database), paling banyak sekali per chat
+    setiap `reply_cooldown` detik. Balasan dikirim di task terpisah agar
+    dispatch tidak menunggu jaringan.
+    """
+
+    SHED_LEVELS = {"fun": 1, "utility": 2}
+
+    def __init__(self, processor, low_depth: int = 200, high_depth: int = 1000,
+                 low_latency_ms: float = 2000, high_latency_ms: float = 10000,
+                 defer_seconds: float = 5.0, busy_message: str = "",
+                 reply_cooldown: float = 30.0):
+        self.processor = processor
+        self.low_depth = low_depth
+        self.high_depth = high_depth
+        self.low_latency_ms = low_latency_ms
+        self.high_latency_ms = high_latency_ms
+        self.defer_seconds = defer_seconds
+        self.busy_message = busy_message
+        self.reply_cooldown = reply_cooldown
+        self.application = None
+        self.deferred = 0
+        self.shed: Dict[str, int] = {}
+        self.deferred_total = 0
+        self._replied: Dict[Any, float] = {}
+        self._replies: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.low_depth > 0
+
+    def bind(self, application):
+        """Application yang handler-nya dipakai untuk klasifikasi dan balasan"""
+        self.application = application
+
+    def level(self) -> int:
+        """Level beban saat ini (0, 1 atau 2)"""
+        # Update yang sedang ditunda dan update yang sedang dinilai tidak dihitung
+        depth = max(0, self.processor.pending - self.deferred - 1)
+        # Latensi hanya relevan jika masih ada antrian (EWMA tidak basi saat idle)
+        latency = self.processor.latency_ms if depth else 0.0
+        if depth >= self.high_depth or (self.high_latency_ms and latency >= self.high_latency_ms):
+            return 2
+        if depth >= self.low_depth or (self.low_latency_ms and latency >= self.low_latency_ms):
+            return 1
+        return 0
+
+    def categorize(self, update: object) -> Optional[str]:
+        """
+        PLUGIN_CATEGORY dari handler pertama yang akan menangani update
+        (urutan grup sama seperti Application), None jika bukan plugin
+        """
+        if self.application is None:
+            return None
+        for group in sorted(self.application.handlers):
+            for handler in self.application.handlers[group]:
+                check = handler.check_update(update)
+                if check is None or check is False:
+                    continue
+                plugin = getattr(handler.callback, "__self__", None)
+                return getattr(plugin, "PLUGIN_CATEGORY", None)
+        return None
+
+    async def admit(self, update: object) -> bool:
+        """
+        Memutuskan apakah update boleh diproses (mungkin menunggu dulu jika
+        ditunda). False = update dibuang dan sudah dibalas pesan sibuk.
+        """
+        if not self.enabled or not isinstance(update, Update):
+            return True
+        level = self.level()
+        if level == 0:
+            return True
+
+        category = self.categorize(update)
+        shed_level = self.SHED_LEVELS.get(category)
+        if shed_level is None:
+            return True
+
+        if level < shed_level:
+            level = await self._defer(shed_level)
+        if level >= shed_level:
+            self.shed[category] = self.shed.get(category, 0) + 1
+            self._reply_busy(update)
+            return False
+        return True
+
+    async def _defer(self, shed_level: int) -> int:
+        """Menunggu beban turun ke level 0, sampai `defer_seconds`"""
+        self.deferred += 1
+        self.deferred_total += 1
+        deadline = time.monotonic() + self.defer_seconds
+        try:
+            while True:
+                await asyncio.sleep(0.1)
+                level = self.level()
+                if level == 0 or level >= shed_level or time.monotonic() >= deadline:
+                    return level
+        finally:
+            self.deferred -= 1
+
+    def _reply_busy(self, update: Update):
+        """Menjadwalkan balasan pesan sibuk (dibatasi per chat)"""
+        if not self.busy_message or self.application is None:
+            return
+        chat = update.effective_chat
+        key = chat.id if chat else None
+        now = time.monotonic()
+        if key is not None and now - self._replied.get(key, -self.reply_cooldown) < self.reply_cooldown:
+            return
+        if len(self._replied) > 10000:
+            self._replied = {k: t for k, t in self._replied.items()
+                             if now - t < self.reply_cooldown}
+        if update.callback_query:
+            reply = update.callback_query.answer(self.busy_message)
+        elif key is not None:
+            self._replied[key] = now
+            reply = self.application.bot.send_message(key, self.busy_message)
+        else:
+            return
+        task = asyncio.get_running_loop().create_task(self._send_reply(reply))
+        self._replies.add(task)
+        task.add_done_callback(self._replies.discard)
+
+    @staticmethod
+    async def _send_reply(reply: Awaitable[Any]):
+        try:
+            await reply
+        except Exception as e:
+            logger.debug(f"Busy reply failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik admission untuk admin command"""
+        return {
+            "enabled": self.enabled,
+            "level": self.level() if self.enabled else 0,
+            "latency_ms": round(self.processor.latency_ms, 1),
+            "deferred": self.deferred,
+            "deferred_total": self.deferred_total,
+            "shed": sum(self.shed.values()),
+            "shed_by_category": dict(self.shed)
+        }
@@ -0,0 +1,277 @@
+"""
+========================================
+Modular Telegram Bot - Broadcast Engine
+========================================
+Nama: BroadcastEngine
+Deskripsi: Broadcast ke semua user sebagai job persisten: dikirim
+           concurrent (dibatasi) lewat rate limiter, checkpoint per
+           batch sehingga bisa dilanjutkan setelah restart, dan bisa
+           dibatalkan
+Command: -
+Usage: job_id = await bot.broadcast.create("Halo!", created_by=admin_id)
+       bot.broadcast.submit(job_id)
+       await bot.broadcast.cancel(job_id)
+========================================
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.error import BadRequest, Forbidden
+from telegram.ext import Application
+
+from core.rate_limiter import PRIORITY_BULK
+from utils.async_database import AsyncDatabase
+from utils.logger import logger
+from utils.storage import UserRow
+
+# Status job yang belum selesai (dilanjutkan saat bot start)
+ACTIVE_STATUSES = ("pending", "running")
+
+# Filter penerima: user yang dibanned atau memblokir bot dilewati
+RECIPIENT_FILTERS = {"is_banned": False, "is_blocked": False}
+
+class BroadcastEngine:
+    """
+    Menjalankan job broadcast yang tersimpan di tabel broadcast_jobs.
+
+    User dibaca per batch dengan keyset pagination, setiap batch dikirim
+    dengan maksimal `concurrency` request sekaligus (batas flood diatur
+    oleh FloodRateLimiter, prioritas PRIORITY_BULK). Setelah satu batch
+    selesai, counter, hasil penerima yang gagal dan posisi keyset
+    disimpan dalam satu transaksi. Jika bot berhenti di tengah batch,
+    batch tersebut dikirim ulang saat job dilanjutkan (at-least-once per
+    batch).
+
+    User yang memblokir bot (Forbidden) ditandai is_blocked dan tidak
+    dikirimi broadcast berikutnya sampai ia aktif lagi.
+    """
+
+    def __init__(self, database: AsyncDatabase, concurrency: int = 8,
+                 batch_size: int = 100, progress_interval: float = 5.0):
+        self.database = database
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.progress_interval = progress_interval
+        self.application: Optional[Application] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    async def start(self, application: Application, resume: bool = True) -> List[int]:
+        """
+        Menyimpan application lalu (jika `resume`) melanjutkan job yang
+        belum selesai. Pada mode supervisor hanya worker 0 yang resume.
+
+        Returns:
+            list id job yang dilanjutkan
+        """
+        self.application = application
+        self._stopping = False
+        if not resume:
+            return []
+        jobs = await self.database.run_read(
+            self.database.database.get_broadcast_jobs, ACTIVE_STATUSES, 100
+        )
+        resumed = []
+        for job in sorted(jobs, key=lambda job: job["id"]):
+            self.submit(job["id"])
+            resumed.append(job["id"])
+        if resumed:
+            logger.info(f"📤 Resuming broadcast jobs: {resumed}")
+        return resumed
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Menghentikan semua job setelah batch yang sedang berjalan selesai.
+        Status job tetap running sehingga dilanjutkan pada start berikutnya.
+        """
+        self._stopping = True
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def create(self, message: str, parse_mode: Optional[str] = "HTML",
+                     created_by: Optional[int] = None, status_chat_id: Optional[int] = None,
+                     status_message_id: Optional[int] = None) -> int:
+        """Membuat job broadcast baru (belum dijalankan)"""
+        total = await self.database.get_user_count()
+        job_id = await self.database.run_write(
+            self.database.database.create_broadcast_job, message, parse_mode,
+            created_by, total, status_chat_id, status_message_id
+        )
+        if not job_id:
+            raise RuntimeError("Gagal membuat job broadcast")
+        return job_id
+
+    def submit(self, job_id: int) -> asyncio.Task:
+        """Menjalankan job di background (sekali per job)"""
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self.run_job(job_id))
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return task
+
+    async def cancel(self, job_id: int) -> bool:
+        """
+        Membatalkan job. Status disimpan di database, sehingga job yang
+        sedang berjalan (di proses mana pun) berhenti setelah batch aktif
+        selesai dan di-checkpoint.
+        """
+        job = await self.database.run_read(self.database.database.get_broadcast_job, job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return False
+        return await self.database.run_write(
+            self.database.database.set_broadcast_status, job_id, "cancelled"
+        )
+
+    async def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Data job beserta rincian outcome penerima yang gagal"""
+        job = await self.database.run_read(self.database.database.get_broadcast_job, job_id)
+        if job is not None:
+            job["outcomes"] = await self.database.run_read(
+                self.database.database.get_broadcast_outcomes, job_id
+            )
+        return job
+
+    async def run_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Menjalankan (atau melanjutkan) job sampai selesai, dibatalkan
+        atau engine dihentikan.
+
+        Returns:
+            data job terakhir
+        """
+        storage = self.database.database
+        job = await self.database.run_read(storage.get_broadcast_job, job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return job
+
+        await self.database.run_write(storage.set_broadcast_status, job_id, "running")
+        after: Optional[Tuple[str, int]] = None
+        if job["cursor_user_id"] is not None:
+            after = (job["cursor_joined_date"], job["cursor_user_id"])
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_report = 0.0
+        status = "running"
+        started = time.perf_counter()
+
+        try:
+            while True:
+                if self._stopping:
+                    break
+                current = await self.database.run_read(storage.get_broadcast_job, job_id)
+                if current is None or current["status"] == "cancelled":
+                    status = "cancelled"
+                    break
+
+                rows = await self.database.run_read(
+                    storage.get_users_page, self.batch_size, after, RECIPIENT_FILTERS
+                )
+                if not rows:
+                    status = "done"
+                    break
+
+                results = await asyncio.gather(*[
+                    self._send(semaphore, row, job["message"], job["parse_mode"]) for row in rows
+                ])
+                outcomes = [result for result in results if result is not None]
+                after = (rows[-1].joined_date, rows[-1].user_id)
+                await self.database.run_write(
+                    storage.checkpoint_broadcast, job_id, after,
+                    len(rows) - len(outcomes), outcomes
+                )
+
+                if len(rows) < self.batch_size:
+                    status = "done"
+                    break
+
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    await self._report(job_id)
+        finally:
+            if status != "running":
+                await self.database.run_write(storage.set_broadcast_status, job_id, status)
+
+        job = await self._report(job_id)
+        if status != "running":
+            logger.info(
+                f"Broadcast #{job_id} {status} in {time.perf_counter() - started:.1f}s: "
+                f"sent={job['sent']} failed={job['failed']} blocked={job['blocked']}"
+            )
+        return job
+
+    async def _send(self, semaphore: asyncio.Semaphore, row: UserRow, message: str,
+                    parse_mode: Optional[str]) -> Optional[Tuple[int, str, Optional[str]]]:
+        """Mengirim ke satu user; None jika berhasil, selain itu (user_id, outcome, error)"""
+        async with semaphore:
+            try:
+                await self.application.bot.send_message(
+                    chat_id=row.user_id,
+                    text=message,
+                    parse_mode=parse_mode,
+                    rate_limit_args={"priority": PRIORITY_BULK}
+                )
+                return None
+            except Forbidden as e:
+                return (row.user_id, "blocked", str(e))
+            except Exception as e:
+                logger.error(f"Failed to send broadcast to {row.user_id}: {e}")
+                return (row.user_id, "failed", str(e))
+
+    async def _report(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Memperbarui pesan status job (jika ada) dengan progres terbaru"""
+        job = await self.get_job(job_id)
+        if job is None or not job["status_chat_id"] or self.application is None:
+            return job
+        try:
+            await self.application.bot.edit_message_text(
+                self.format_status(job),
+                chat_id=job["status_chat_id"],
+                message_id=job["status_message_id"],
+                parse_mode="HTML"
+            )
+        except BadRequest as e:
+            # "message is not modified" dan pesan yang sudah dihapus diabaikan
+            logger.debug(f"Broadcast #{job_id} status not updated: {e}")
+        except Exception as e:
+            logger.warning(f"Broadcast #{job_id} status not updated: {e}")
+        return job
+
+    @staticmethod
+    def format_status(job: Dict[str, Any]) -> str:
+        """Teks status job untuk admin"""
+        processed = job["sent"] + job["failed"] + job["blocked"]
+        total = max(job["total"], processed)
+        percent = processed * 100 // total if total else 100
+        titles = {
+            "pending": "⏳ <b>Broadcast Menunggu</b>",
+            "running": "📤 <b>Mengirim Broadcast...</b>",
+            "done": "✅ <b>Broadcast Selesai!</b>",
+            "cancelled": "🛑 <b>Broadcast Dibatalkan</b>"
+        }
+        text = (
+            f"{titles.get(job['status'], job['status'])} #{job['id']}\n\n"
+            f"📊 <b>Progres:</b> {processed}/{total} ({percent}%)\n"
+            f"📤 <b>Berhasil:</b> {job['sent']}\n"
+            f"❌ <b>Gagal:</b> {job['failed']}\n"
+            f"🚫 <b>Memblokir bot:</b> {job['blocked']}"
+        )
+        if job["status"] in ACTIVE_STATUSES:
+            text += f"\n\n<i>Batalkan: /cancelbroadcast {job['id']}</i>"
+        return text
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Job yang sedang berjalan di proses ini"""
+        return {
+            "running_jobs": sorted(self._tasks),
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size
+        }
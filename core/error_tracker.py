@@ -0,0 +1,139 @@
+"""
+========================================
+Modular Telegram Bot - Error Tracker
+========================================
+Nama: ErrorTracker
+Deskripsi: Proteksi badai error: error dikelompokkan per fingerprint
+           (tipe exception + frame teratas di project), traceback hanya
+           dicatat sekali per window, dan balasan error ke user untuk
+           fingerprint + chat yang sama dibatasi cooldown
+Command: /errors (ringkasan fingerprint teratas)
+Usage: tracker = ErrorTracker(window=60, reply_cooldown=300)
+       if tracker.record(error, chat_id): kirim balasan error
+========================================
+"""
+
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.loop_monitor import find_culprit, relative_path
+from utils.logger import logger
+
+class ErrorStats:
+    """Counter untuk satu fingerprint"""
+
+    __slots__ = ("count", "suppressed", "window_start", "first_seen", "last_seen", "last_message")
+
+    def __init__(self, now: float):
+        self.count = 0
+        self.suppressed = 0
+        self.window_start = None
+        self.first_seen = now
+        self.last_seen = now
+        self.last_message = ""
+
+def fingerprint(error: BaseException) -> str:
+    """Tipe exception + frame project terdalam tempat error terjadi"""
+    stack = traceback.extract_tb(error.__traceback__) if error.__traceback__ else []
+    frame = find_culprit(stack)
+    name = type(error).__name__
+    if frame is None:
+        return name
+    return f"{name} @ {relative_path(frame.filename)}:{frame.lineno} in {frame.name}"
+
+class ErrorTracker:
+    """
+    Pengelompokan error handler.
+
+    - Setiap error menaikkan counter fingerprint-nya
+    - Traceback lengkap dicatat untuk error pertama di setiap `window`
+      detik per fingerprint; error berikutnya di window yang sama hanya
+      dihitung, dan jumlahnya disebut pada sampel berikutnya
+    - `record()` mengembalikan False jika chat yang sama sudah dibalas
+      untuk fingerprint yang sama dalam `reply_cooldown` detik
+
+    Jumlah fingerprint dibatasi `max_fingerprints`; yang paling lama
+    tidak muncul dibuang lebih dulu.
+    """
+
+    def __init__(self, window: float = 60.0, reply_cooldown: float = 300.0,
+                 max_fingerprints: int = 500, max_replies: int = 10000):
+        self.window = window
+        self.reply_cooldown = reply_cooldown
+        self.max_fingerprints = max_fingerprints
+        self.max_replies = max_replies
+        self._stats: Dict[str, ErrorStats] = {}
+        self._replied: Dict[Tuple[str, Any], float] = {}
+        self.total = 0
+        self.replies_suppressed = 0
+        self.started_at = time.time()
+
+    def record(self, error: BaseException, chat_id: Optional[Any] = None) -> bool:
+        """
+        Mencatat satu error (dan mencatat log jika perlu).
+
+        Returns:
+            True jika user di `chat_id` boleh dikirimi balasan error
+        """
+        now = time.monotonic()
+        key = fingerprint(error)
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                oldest = min(self._stats, key=lambda k: self._stats[k].last_seen)
+                del self._stats[oldest]
+            stats = self._stats[key] = ErrorStats(now)
+
+        self.total += 1
+        stats.count += 1
+        stats.last_seen = now
+        stats.last_message = str(error)[:200]
+
+        if stats.window_start is None or now - stats.window_start >= self.window:
+            suffix = (f" (+{stats.suppressed} similar since last traceback)"
+                      if stats.suppressed else "")
+            stats.window_start = now
+            stats.suppressed = 0
+            logger.error(f"Exception while handling update [{key}]: {error}{suffix}\n"
+                         + "".join(traceback.format_exception(type(error), error,
+                                                              error.__traceback__)))
+        else:
+            stats.suppressed += 1
+
+        if chat_id is None:
+            return False
+        reply_key = (key, chat_id)
+        if now - self._replied.get(reply_key, -self.reply_cooldown) < self.reply_cooldown:
+            self.replies_suppressed += 1
+            return False
+        if len(self._replied) >= self.max_replies:
+            self._replied = {k: t for k, t in self._replied.items()
+                             if now - t < self.reply_cooldown}
+        self._replied[reply_key] = now
+        return True
+
+    def summary(self, top: int = 10) -> List[Dict[str, Any]]:
+        """Fingerprint dengan error terbanyak"""
+        now = time.monotonic()
+        ranked = sorted(self._stats.items(), key=lambda item: item[1].count, reverse=True)
+        return [
+            {
+                "fingerprint": key,
+                "count": stats.count,
+                "last_seen": datetime.fromtimestamp(time.time() - (now - stats.last_seen))
+                                     .isoformat(timespec="seconds"),
+                "last_message": stats.last_message
+            }
+            for key, stats in ranked[:top]
+        ]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik error untuk admin command"""
+        return {
+            "total": self.total,
+            "fingerprints": len(self._stats),
+            "replies_suppressed": self.replies_suppressed,
+            "since": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds")
+        }
@@ -0,0 +1,157 @@
+"""
+========================================
+Modular Telegram Bot - Health Server
+========================================
+Nama: HealthServer
+Deskripsi: Endpoint HTTP lokal (aiohttp) untuk readiness dan liveness
+           bot, dipakai oleh HEALTHCHECK Docker dan probe orchestrator
+Command: -
+Usage: HEALTH_PORT=8080 python bot.py
+       curl http://127.0.0.1:8080/health/ready
+       curl http://127.0.0.1:8080/health/live
+========================================
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.logger import logger
+
+class HealthServer:
+    """
+    Server health check.
+
+    - GET /health/ready: 200 jika semua `ready_checks` lulus (misal plugin
+      sudah diinisialisasi, database bisa dibaca dan write terakhir
+      tidak gagal), selain itu 503
+    - GET /health/live: 200 jika event loop tidak tertahan, update terakhir
+      belum terlalu lama (jika `max_update_age` > 0) dan antrian pesan
+      keluar di bawah batas, selain itu 503
+    - GET /health: gabungan keduanya
+
+    Lag event loop dibaca dari `loop_monitor` jika diberikan; tanpa itu
+    diukur sendiri oleh task kecil yang tidur `probe_interval` detik dan
+    mencatat keterlambatan bangunnya. Jika loop benar-benar macet, request
+    health juga tidak dijawab dan probe orchestrator akan timeout.
+    """
+
+    def __init__(self, ready_checks: Dict[str, Callable[[], Awaitable[bool]]],
+                 signals: Callable[[], Dict[str, Any]], host: str = "127.0.0.1",
+                 port: int = 8080, max_loop_lag_ms: float = 1000,
+                 max_update_age: float = 0, max_outbound_queue: int = 1000,
+                 check_timeout: float = 2.0, probe_interval: float = 0.5,
+                 loop_monitor=None):
+        self.ready_checks = ready_checks
+        self.signals = signals
+        self.host = host
+        self.port = port
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_update_age = max_update_age
+        self.max_outbound_queue = max_outbound_queue
+        self.check_timeout = check_timeout
+        self.probe_interval = probe_interval
+        self.loop_monitor = loop_monitor
+        self._probe_lag_ms = 0.0
+        self._runner = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Menjalankan server HTTP dan probe lag event loop"""
+        try:
+            from aiohttp import web
+        except ImportError:
+            raise RuntimeError("Health endpoint membutuhkan aiohttp (pip install aiohttp)")
+
+        app = web.Application()
+        app.router.add_get("/health", self._handle_health)
+        app.router.add_get("/health/ready", self._handle_ready)
+        app.router.add_get("/health/live", self._handle_live)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.loop_monitor is None:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        logger.info(f"🩺 Health endpoint on http://{self.host}:{self.port}/health")
+
+    async def stop(self):
+        """Menghentikan server HTTP"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def loop_lag_ms(self) -> float:
+        """Lag event loop terakhir (milidetik)"""
+        if self.loop_monitor is not None:
+            return self.loop_monitor.lag_ms
+        return self._probe_lag_ms
+
+    async def _probe(self):
+        """Mengukur keterlambatan event loop secara berkala"""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.probe_interval
+            await asyncio.sleep(self.probe_interval)
+            self._probe_lag_ms = max(0.0, (loop.time() - expected) * 1000)
+
+    async def _run_check(self, check: Callable[[], Awaitable[bool]]) -> bool:
+        try:
+            return bool(await asyncio.wait_for(check(), self.check_timeout))
+        except Exception:
+            return False
+
+    async def readiness(self) -> Dict[str, Any]:
+        """Hasil semua readiness check"""
+        names = list(self.ready_checks)
+        results = await asyncio.gather(*[self._run_check(self.ready_checks[name])
+                                         for name in names])
+        checks = dict(zip(names, results))
+        return {"ready": all(results), "checks": checks}
+
+    def liveness(self) -> Dict[str, Any]:
+        """Sinyal liveness dan daftar sinyal yang melewati batas"""
+        signals = self.signals()
+        update_age = signals.get("update_age_s")
+        outbound_queue = signals.get("outbound_queue", 0)
+
+        failing = []
+        if self.loop_lag_ms > self.max_loop_lag_ms:
+            failing.append("loop_lag")
+        if self.max_update_age > 0 and update_age is not None and update_age > self.max_update_age:
+            failing.append("update_age")
+        if outbound_queue > self.max_outbound_queue:
+            failing.append("outbound_queue")
+
+        return {
+            "live": not failing,
+            "failing": failing,
+            "loop_lag_ms": round(self.loop_lag_ms, 2),
+            **{key: round(value, 2) if isinstance(value, float) else value
+               for key, value in signals.items()}
+        }
+
+    @staticmethod
+    def _response(ok: bool, body: Dict[str, Any]):
+        from aiohttp import web
+        return web.Response(status=200 if ok else 503, text=json.dumps(body),
+                            content_type="application/json")
+
+    async def _handle_ready(self, request):
+        body = await self.readiness()
+        return self._response(body["ready"], body)
+
+    async def _handle_live(self, request):
+        body = self.liveness()
+        return self._response(body["live"], body)
+
+    async def _handle_health(self, request):
+        ready = await self.readiness()
+        live = self.liveness()
+        body = {"ready": ready, "live": live, "time": int(time.time())}
+        return self._response(ready["ready"] and live["live"], body)
@@ -0,0 +1,230 @@
+"""
+========================================
+Modular Telegram Bot - Inbound Rate Limiter
+========================================
+Nama: InboundRateLimiter
+Deskripsi: Rate limiting update masuk per user, per chat dan per command
+           (token bucket) sebelum update sampai ke handler plugin,
+           sehingga satu user yang spam /qr atau /weather tidak
+           menghabiskan CPU dan kuota API upstream
+Command: /queues (bagian Rate Limit Masuk)
+Usage: INBOUND_USER_LIMIT=20/60 INBOUND_COMMAND_LIMITS="qr|qrurl=5/60,weather=10/60" \\
+       python bot.py
+========================================
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from telegram import Update
+
+from core.rate_limiter import TokenBucket
+from utils.logger import logger
+
+# Batas: (jumlah update, periode dalam detik)
+Limit = Tuple[float, float]
+
+def parse_limit(value: str) -> Optional[Limit]:
+    """Parse "jumlah/detik" (misal "5/60"); None jika kosong atau 0"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    count, _, period = value.partition("/")
+    count, period = float(count), float(period or 1)
+    if count <= 0 or period <= 0:
+        return None
+    return count, period
+
+def parse_command_limits(value: str) -> Dict[str, Tuple[str, Limit]]:
+    """
+    Parse "command=jumlah/detik,..." (misal "qr|qrurl=5/60,weather=10/60").
+    Command yang digabung dengan | berbagi satu bucket.
+
+    Returns:
+        {command: (nama grup, limit)}
+    """
+    limits = {}
+    for item in (value or "").split(","):
+        commands, _, limit = item.partition("=")
+        parsed = parse_limit(limit)
+        names = [name.strip().lstrip("/").lower() for name in commands.split("|") if name.strip()]
+        if names and parsed:
+            for name in names:
+                limits[name] = (names[0], parsed)
+    return limits
+
+class UserBucket(TokenBucket):
+    """Token bucket update masuk; `warned` = user sudah diberi tahu sejak ditolak"""
+
+    __slots__ = ("warned",)
+
+    def __init__(self, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self.warned = False
+
+class InboundRateLimiter:
+    """
+    Filter sebelum dispatch.
+
+    Setiap update memakai satu token dari semua bucket yang berlaku:
+    - per user (`user_limit`) untuk semua update user tersebut
+    - per chat grup (`chat_limit`) untuk semua user di grup tersebut
+    - per (command, user) untuk command di `command_limits` (alias yang
+      digabung berbagi bucket)
+
+    Token hanya diambil jika semua bucket punya token, sehingga update
+    yang ditolak tidak mengurangi kuota bucket lain. Update yang ditolak
+    tidak diteruskan ke handler (dan database); user diberi tahu sekali
+    per periode tertolak. `admit` sinkron dan pemberitahuan dikirim di
+    task terpisah, sehingga keputusan diambil sebelum update menunggu
+    giliran chat-nya tanpa mengubah urutan. Bucket yang sudah penuh lagi
+    dibuang setiap `prune_interval` detik. Admin (`exempt_ids`) tidak
+    dibatasi.
+
+    Mode supervisor: setiap worker punya bucket sendiri, dan update di-shard
+    per chat, sehingga batas per user berlaku per worker.
+    """
+
+    def __init__(self, user_limit: Optional[Limit] = None, chat_limit: Optional[Limit] = None,
+                 command_limits: Optional[Dict[str, Tuple[str, Limit]]] = None,
+                 exempt_ids: Iterable[int] = (), message: str = "",
+                 prune_interval: float = 60.0):
+        self.user_limit = user_limit
+        self.chat_limit = chat_limit
+        self.command_limits = command_limits or {}
+        self.exempt_ids = set(exempt_ids)
+        self.message = message
+        self.prune_interval = prune_interval
+        self.application = None
+        self._buckets: Dict[Hashable, UserBucket] = {}
+        self._last_prune = time.monotonic()
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {}
+        self._notices: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.user_limit or self.chat_limit or self.command_limits)
+
+    def bind(self, application):
+        """Application yang dipakai untuk mengirim pemberitahuan"""
+        self.application = application
+
+    @staticmethod
+    def command_of(update: Update) -> Optional[str]:
+        """Nama command (tanpa / dan @bot, huruf kecil) dari pesan teks"""
+        message = update.effective_message
+        text = message.text if message else None
+        if not text or not text.startswith("/"):
+            return None
+        parts = text[1:].split(maxsplit=1)
+        return parts[0].split("@", 1)[0].lower() if parts else None
+
+    def _bucket(self, key: Hashable, limit: Limit, now: float) -> UserBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            count, period = limit
+            bucket = self._buckets[key] = UserBucket(count / period, count)
+            # Waktu yang sama dengan refill, agar bucket baru tetap penuh
+            bucket.updated = now
+        return bucket
+
+    def _rules(self, update: Update) -> List[Tuple[str, Hashable, Limit]]:
+        """Bucket yang berlaku untuk update: (scope, key, limit)"""
+        user = update.effective_user
+        chat = update.effective_chat
+        rules = []
+        if user is not None:
+            command = self.command_of(update)
+            rule = self.command_limits.get(command) if command else None
+            if rule:
+                group, limit = rule
+                rules.append((f"/{group}", (group, user.id), limit))
+            if self.user_limit:
+                rules.append(("user", ("user", user.id), self.user_limit))
+        # Chat pribadi sudah tercakup batas per user
+        if self.chat_limit and chat is not None and (user is None or chat.id != user.id):
+            rules.append(("chat", ("chat", chat.id), self.chat_limit))
+        return rules
+
+    def check(self, update: Update) -> Tuple[float, Optional[str], Optional[UserBucket]]:
+        """
+        Mengambil token untuk update.
+
+        Returns:
+            (detik tunggu, scope, bucket) - detik tunggu 0 jika diterima,
+            selain itu scope dan bucket yang menolak
+        """
+        now = time.monotonic()
+        if now - self._last_prune > self.prune_interval:
+            self._prune(now)
+
+        buckets = [(scope, self._bucket(key, limit, now))
+                   for scope, key, limit in self._rules(update)]
+        for scope, bucket in buckets:
+            if bucket.refill(now) < 1:
+                return (1 - bucket.tokens) / bucket.rate, scope, bucket
+        for _, bucket in buckets:
+            bucket.tokens -= 1
+            bucket.warned = False
+        return 0.0, None, None
+
+    def _prune(self, now: float):
+        """Membuang bucket yang sudah penuh lagi (tidak ada pengaruhnya)"""
+        self._last_prune = now
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_idle(now)]:
+            del self._buckets[key]
+
+    def admit(self, update: object) -> bool:
+        """False jika update ditolak (tidak boleh sampai ke handler)"""
+        if not self.enabled or not isinstance(update, Update):
+            return True
+        user = update.effective_user
+        if user is not None and user.id in self.exempt_ids:
+            return True
+
+        retry_after, scope, bucket = self.check(update)
+        if not retry_after:
+            self.allowed += 1
+            return True
+
+        self.rejected[scope] = self.rejected.get(scope, 0) + 1
+        if not bucket.warned:
+            bucket.warned = True
+            logger.info(f"⏱️ Rate limited {scope} for user "
+                        f"{user.id if user else '-'} ({retry_after:.0f}s)")
+            self._notify(update, retry_after)
+        return False
+
+    def _notify(self, update: Update, retry_after: float):
+        """Menjadwalkan pemberitahuan ke user (sekali per periode tertolak)"""
+        if not self.message or self.application is None:
+            return
+        text = self.message.format(seconds=max(1, round(retry_after)))
+        if update.callback_query:
+            notice = update.callback_query.answer(text)
+        elif update.effective_chat is not None:
+            notice = self.application.bot.send_message(update.effective_chat.id, text)
+        else:
+            return
+        task = asyncio.get_running_loop().create_task(self._send_notice(notice))
+        self._notices.add(task)
+        task.add_done_callback(self._notices.discard)
+
+    @staticmethod
+    async def _send_notice(notice: Awaitable[Any]):
+        try:
+            await notice
+        except Exception as e:
+            logger.debug(f"Rate limit notice failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik limiter untuk admin command"""
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "rejected": sum(self.rejected.values()),
+            "rejected_by_scope": dict(self.rejected),
+            "buckets": len(self._buckets)
+        }
@@ -0,0 +1,227 @@
+"""
+========================================
+Modular Telegram Bot - Loop Monitor
+========================================
+Nama: LoopMonitor
+Deskripsi: Mengukur keterlambatan jadwal event loop sebagai histogram
+           dan mendeteksi kode sinkron yang menahan loop (sqlite, PIL,
+           baca file besar). Saat loop tertahan melewati ambang, thread
+           watchdog mengambil stack thread loop dan mencatat plugin serta
+           baris yang sedang berjalan
+Command: /queues (bagian Event Loop)
+Usage: LOOP_BLOCK_THRESHOLD_MS=250 python bot.py
+========================================
+"""
+
+import asyncio
+import bisect
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from utils.logger import logger
+
+# Batas atas bucket histogram lag (milidetik); bucket terakhir = tak hingga
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Root project, untuk menampilkan path relatif dan mencari frame plugin
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PLUGINS = os.path.join(_ROOT, "plugins") + os.sep
+_ASYNCIO = os.path.dirname(asyncio.__file__) + os.sep
+
+def relative_path(filename: str) -> str:
+    """Path relatif terhadap root project (jika di dalamnya)"""
+    if filename.startswith(_ROOT + os.sep):
+        return os.path.relpath(filename, _ROOT)
+    return filename
+
+def find_culprit(stack: List[traceback.FrameSummary]) -> Optional[traceback.FrameSummary]:
+    """
+    Frame paling dalam yang paling mungkin jadi penyebab: frame di folder
+    plugins/, lalu frame lain di dalam project, lalu frame paling dalam.
+    """
+    if not stack:
+        return None
+    for frame in reversed(stack):
+        if frame.filename.startswith(_PLUGINS):
+            return frame
+    for frame in reversed(stack):
+        if frame.filename.startswith(_ROOT + os.sep) and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+class LoopMonitor:
+    """
+    Watchdog event loop.
+
+    - Task kecil di event loop tidur `interval` detik lalu mencatat
+      keterlambatan bangunnya ke histogram dan memperbarui heartbeat
+    - Thread watchdog memeriksa heartbeat; jika loop tidak berdetak lebih
+      dari `interval` + `threshold_ms`, stack thread loop diambil lewat
+      sys._current_frames() (sekali per kejadian) dan dicatat ke log
+      beserta lokasi plugin yang sedang menahan loop
+
+    Overhead: satu wakeup per `interval` di loop dan satu di thread
+    watchdog; stack hanya diambil saat loop benar-benar tertahan.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold_ms: float = 250,
+                 stack_limit: int = 12, history: int = 20):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.stack_limit = stack_limit
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.blocks = 0
+        self.culprits: Counter = Counter()
+        self.recent_blocks: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Kejadian blok yang stack-nya sudah diambil (durasi diisi saat loop jalan lagi)
+        self._pending_block: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def lag_ms(self) -> float:
+        """
+        Lag saat ini: lag sampel terakhir, atau lama loop sudah tertahan
+        jika heartbeat belum datang (dibaca dari thread lain pun aman)
+        """
+        stalled = (time.monotonic() - self._beat - self.interval) * 1000
+        return max(self.last_ms, stalled, 0.0)
+
+    def start(self):
+        """Menjalankan task pengukur dan thread watchdog (dari dalam event loop)"""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        if self.threshold_ms > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog",
+                                              daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        """Menghentikan task pengukur dan thread watchdog"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2 + 1)
+            self._watchdog = None
+
+    async def _measure(self):
+        """Mencatat keterlambatan setiap wakeup ke histogram"""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._observe(max(0.0, (loop.time() - expected) * 1000))
+            self._beat = time.monotonic()
+
+    def _observe(self, lag_ms: float):
+        """Mencatat satu sampel lag"""
+        self.samples += 1
+        self.total_ms += lag_ms
+        self.last_ms = lag_ms
+        if lag_ms > self.max_ms:
+            self.max_ms = lag_ms
+        self.buckets[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+
+        block = self._pending_block
+        if block is not None:
+            self._pending_block = None
+            block["duration_ms"] = round(lag_ms, 1)
+            logger.info(f"🐢 Event loop resumed after {lag_ms:.0f}ms "
+                        f"(blocked at {block['location']})")
+
+    def _watch(self):
+        """Thread watchdog: ambil stack loop saat heartbeat terlambat"""
+        check_every = max(0.01, min(self.interval, self.threshold_ms / 2000))
+        captured_beat = None
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            stalled_ms = (time.monotonic() - beat - self.interval) * 1000
+            # Satu capture per kejadian (heartbeat yang sama)
+            if stalled_ms >= self.threshold_ms and beat != captured_beat:
+                captured_beat = beat
+                self._capture(stalled_ms)
+
+    def _capture(self, stalled_ms: float):
+        """Mengambil stack thread event loop dan mencatat lokasi yang menahan"""
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        del frame
+        culprit = find_culprit(stack)
+        location = (f"{relative_path(culprit.filename)}:{culprit.lineno} in {culprit.name}"
+                    if culprit else "unknown")
+
+        block = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "location": location,
+            "stalled_ms": round(stalled_ms, 1),
+            "duration_ms": None
+        }
+        self.blocks += 1
+        self.culprits[location] += 1
+        self.recent_blocks.append(block)
+        self._pending_block = block
+
+        # Frame event loop (asyncio) di bawah task tidak informatif
+        start = max((i + 1 for i, entry in enumerate(stack)
+                     if entry.filename.startswith(_ASYNCIO)), default=0)
+        lines = "".join(
+            f"  {relative_path(entry.filename)}:{entry.lineno} in {entry.name}\n"
+            f"    {entry.line or ''}\n"
+            for entry in (stack[start:] or stack)[-self.stack_limit:]
+        )
+        logger.warning(f"🐢 Event loop blocked >{stalled_ms:.0f}ms at {location}\n{lines}")
+
+    def percentile(self, q: float) -> float:
+        """Estimasi persentil lag dari histogram (batas atas bucket)"""
+        if not self.samples:
+            return 0.0
+        target = q * self.samples
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LAG_BUCKETS_MS[i] if i < len(LAG_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik lag untuk admin command dan health endpoint"""
+        return {
+            "samples": self.samples,
+            "lag_ms": round(self.lag_ms, 1),
+            "avg_ms": round(self.total_ms / self.samples, 2) if self.samples else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "histogram": dict(zip(
+                [str(b) for b in LAG_BUCKETS_MS] + ["inf"], self.buckets
+            )),
+            "blocks": self.blocks,
+            "top_culprits": self.culprits.most_common(5),
+            "recent_blocks": list(self.recent_blocks)[-5:]
+        }
@@ -0,0 +1,240 @@
+"""
+========================================
+Modular Telegram Bot - Rate Limiter
+========================================
+Nama: FloodRateLimiter
+Deskripsi: Rate limiter request keluar yang mengikuti batas flood
+           Telegram (global, per chat, per grup) dengan jalur prioritas
+           dan retry otomatis saat RetryAfter
+Command: -
+Usage: ApplicationBuilder().rate_limiter(FloodRateLimiter())
+       Kirim massal dengan prioritas rendah:
+       await bot.send_message(chat_id, text,
+                              rate_limit_args={"priority": PRIORITY_BULK})
+========================================
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from utils.logger import logger
+
+# Jalur prioritas: angka kecil dilayani lebih dulu
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+class TokenBucket:
+    """Token bucket sederhana (refill kontinu)"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> float:
+        """Isi ulang token sesuai waktu berlalu; kembalikan jumlah token"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def try_acquire(self, now: float) -> float:
+        """Ambil satu token; kembalikan 0 jika berhasil, atau detik tunggu"""
+        if self.refill(now) >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """True jika bucket sudah penuh lagi (aman dibuang)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+class ChatBucket(TokenBucket):
+    """Token bucket per chat dengan lock FIFO agar urutan pesan terjaga"""
+
+    __slots__ = ("lock",)
+
+    def __init__(self, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self.lock = asyncio.Lock()
+
+class FloodRateLimiter(BaseRateLimiter[Dict[str, Any]]):
+    """
+    Rate limiter untuk Application.
+
+    - Bucket global (default 30 pesan/detik) untuk semua request ke chat
+    - Bucket per chat: 1 pesan/detik untuk chat pribadi, 20 pesan/menit
+      untuk grup/channel (chat_id negatif atau @username)
+    - Antrian bucket global diurutkan per prioritas, sehingga balasan
+      interaktif didahulukan dari broadcast (PRIORITY_BULK)
+    - RetryAfter (HTTP 429) menghentikan semua pengiriman selama waktu
+      yang diminta, lalu request di-retry sampai `max_retries`
+
+    Request tanpa chat_id (getUpdates, getMe, answerCallbackQuery, ...)
+    tidak dibatasi.
+    """
+
+    def __init__(self, global_rate: float = 30, private_rate: float = 1,
+                 group_per_minute: float = 20, max_retries: int = 3):
+        self.global_rate = global_rate
+        self.private_rate = private_rate
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[Union[int, str], ChatBucket] = {}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._last_prune = time.monotonic()
+
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failed = 0
+        self.total_wait_ms = 0.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        # Bangunkan waiter yang tersisa agar tidak menggantung saat shutdown
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.set_result(None)
+        self._waiters.clear()
+
+    def _chat_bucket(self, chat_id: Union[int, str], now: float) -> ChatBucket:
+        """Bucket milik chat (dibuat jika belum ada)"""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if isinstance(chat_id, str) or chat_id < 0:
+                rate = self.group_per_minute / 60
+                bucket = ChatBucket(rate, self.group_per_minute)
+            else:
+                bucket = ChatBucket(self.private_rate, max(1.0, self.private_rate))
+            self._chats[chat_id] = bucket
+
+        # Buang bucket chat yang sudah lama tidak dipakai, paling sering tiap 60 detik
+        if now - self._last_prune > 60:
+            self._last_prune = now
+            for key in [key for key, b in self._chats.items()
+                        if key != chat_id and not b.lock.locked() and b.is_idle(now)]:
+                del self._chats[key]
+        return bucket
+
+    async def _wait_paused(self):
+        """Menunggu jika sedang ada jeda RetryAfter"""
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, chat_id: Union[int, str], priority: int):
+        """
+        Menunggu token chat lalu token global. Lock chat ditahan sampai
+        keduanya didapat, sehingga pesan ke satu chat keluar sesuai urutan.
+        """
+        bucket = self._chat_bucket(chat_id, time.monotonic())
+        async with bucket.lock:
+            while True:
+                await self._wait_paused()
+                delay = bucket.try_acquire(time.monotonic())
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+            await self._acquire_global(priority)
+
+    def _wake_head(self):
+        """Membangunkan waiter dengan prioritas tertinggi"""
+        if self._waiters and not self._waiters[0][2].done():
+            self._waiters[0][2].set_result(None)
+
+    async def _acquire_global(self, priority: int):
+        # Jalur cepat: tidak ada antrian dan token tersedia
+        if not self._waiters and not self._global.try_acquire(time.monotonic()):
+            return
+
+        entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        self._wake_head()
+        try:
+            await entry[2]
+            while True:
+                await self._wait_paused()
+                delay = self._global.try_acquire(time.monotonic())
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self._wake_head()
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict[str, Any]],
+    ) -> Any:
+        options = rate_limit_args or {}
+        priority = options.get("priority", PRIORITY_INTERACTIVE)
+        max_retries = options.get("max_retries", self.max_retries)
+
+        chat_id = data.get("chat_id")
+        if chat_id is not None:
+            try:
+                chat_id = int(chat_id)
+            except (TypeError, ValueError):
+                pass
+
+        self.requests += 1
+        for attempt in range(max_retries + 1):
+            if chat_id is not None:
+                started = time.monotonic()
+                await self._acquire(chat_id, priority)
+                waited = time.monotonic() - started
+                if waited > 0.001:
+                    self.throttled += 1
+                    self.total_wait_ms += waited * 1000
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = (retry_after.total_seconds() if hasattr(retry_after, "total_seconds")
+                         else float(retry_after)) + 0.1
+                if attempt == max_retries:
+                    self.failed += 1
+                    logger.error(f"Flood limit on {endpoint}: gave up after {max_retries} retries")
+                    raise
+                self.retries += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                logger.warning(f"Flood limit on {endpoint}: retrying in {delay:.1f}s")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik rate limiter untuk admin command dan exporter"""
+        lanes: Dict[int, int] = {}
+        for priority, _, _ in self._waiters:
+            lanes[priority] = lanes.get(priority, 0) + 1
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_ms / self.throttled, 2) if self.throttled else 0.0,
+            "queued": len(self._waiters),
+            "queued_by_priority": lanes,
+            "tracked_chats": len(self._chats),
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2)
+        }
@@ -0,0 +1,338 @@
+"""
+========================================
+Modular Telegram Bot - Supervisor
+========================================
+Nama: WorkerPool
+Deskripsi: Menjalankan N proses worker dan meneruskan update dari satu
+           proses penerima (polling/webhook) lewat pipe, di-shard per
+           chat_id sehingga urutan per chat tetap terjaga. Worker
+           mengirim ack setelah update selesai diproses; update tanpa ack
+           dikirim ulang ke worker pengganti jika worker mati
+Command: -
+Usage: BOT_WORKERS=4 python bot.py
+       Benchmark: python benchmarks/supervisor_benchmark.py
+========================================
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from utils.logger import logger
+
+# Proses baru di-spawn (bukan fork) agar tidak mewarisi koneksi SQLite,
+# thread executor atau event loop milik proses penerima
+_context = multiprocessing.get_context("spawn")
+
+# Payload kosong = akhir stream (worker selesai memproses lalu berhenti)
+END_OF_STREAM = b""
+
+def shard_for(key: Optional[Hashable], count: int) -> Optional[int]:
+    """
+    Index worker untuk satu chat key (chat_id atau ("user", user_id)).
+    None jika update tidak punya chat (bebas dikirim ke worker mana pun).
+    """
+    if key is None:
+        return None
+    if isinstance(key, tuple):
+        key = key[-1]
+    return abs(int(key)) % count
+
+def _worker_entry(target: Callable, index: int, count: int, connection: Connection, args: tuple):
+    """Entry point proses worker"""
+    # Ctrl+C ditangani supervisor; worker berhenti saat pipe ditutup
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    target(index, count, connection, *args)
+
+def run_bot_worker(index: int, count: int, connection: Connection):
+    """Target worker bot: stack plugin normal, update dibaca dari pipe"""
+    from bot import bot
+    asyncio.run(bot.run_worker(connection, index, count))
+
+async def serve_connection(connection: Connection, handle: Callable[[bytes], Awaitable[Any]],
+                           queue_size: int = 256) -> int:
+    """
+    Membaca payload dari pipe (di thread terpisah) dan memanggil `handle`
+    untuk setiap payload secara berurutan sampai pipe ditutup.
+
+    Antrian dibatasi `queue_size`: jika penuh, thread pembaca menunggu,
+    pipe penuh, dan supervisor ikut tertahan (backpressure).
+
+    Returns:
+        jumlah payload yang diproses
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def put(data: Optional[bytes]):
+        asyncio.run_coroutine_threadsafe(queue.put(data), loop).result()
+
+    def reader():
+        try:
+            while True:
+                data = connection.recv_bytes()
+                if data == END_OF_STREAM:
+                    put(None)
+                    return
+                put(data)
+        except (EOFError, OSError):
+            # Pipe ditutup supervisor: tandai akhir antrian
+            put(None)
+        except RuntimeError:
+            # Event loop sudah ditutup
+            pass
+
+    threading.Thread(target=reader, name="worker-pipe", daemon=True).start()
+
+    processed = 0
+    while True:
+        data = await queue.get()
+        if data is None:
+            return processed
+        await handle(data)
+        processed += 1
+
+class AckSender:
+    """
+    Tracker sisi worker (pengganti UpdateTracker untuk processor): setiap
+    update yang selesai diproses (berhasil, error, ditolak atau dibatalkan)
+    dikirim update_id-nya ke supervisor lewat pipe yang sama. Duplikat
+    sudah dibuang supervisor, jadi `begin` selalu menerima.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+    def begin(self, update_id: int) -> bool:
+        return True
+
+    def done(self, update_id: int):
+        try:
+            self.connection.send_bytes(str(update_id).encode())
+        except (OSError, ValueError):
+            # Supervisor sudah menutup pipe; offset tidak maju, update diulang
+            pass
+
+class WorkerPool:
+    """
+    Kumpulan proses worker dengan satu pipe per worker.
+
+    Setiap worker punya antrian dan thread pengirim sendiri, sehingga
+    payload ke satu worker selalu terkirim sesuai urutan dispatch. Pipe
+    dua arah: worker membalas ack (update_id) setelah update selesai
+    diproses, dan `on_ack` baru dipanggil saat ack diterima (delivery
+    at-least-once). Worker yang mati di-spawn ulang selama pool belum
+    dihentikan, dan payload yang belum di-ack dikirim ulang ke worker
+    pengganti sebelum payload lain. Payload tanpa update_id tidak
+    dilacak; jika gagal dikirim dihitung sebagai dropped.
+    """
+
+    def __init__(self, count: int, target: Callable = run_bot_worker, args: tuple = (),
+                 queue_size: int = 1024, on_ack: Optional[Callable[[int], Any]] = None):
+        self.count = max(1, count)
+        self.target = target
+        self.args = args
+        self.queue_size = queue_size
+        self.on_ack = on_ack
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.count
+        self._connections: List[Optional[Connection]] = [None] * self.count
+        self._ack_readers: List[Optional[threading.Thread]] = [None] * self.count
+        self._queues: List[asyncio.Queue] = []
+        self._senders: List[ThreadPoolExecutor] = []
+        self._tasks: List[asyncio.Task] = []
+        self._round_robin = itertools.count()
+        # Payload yang sudah dikirim tetapi belum di-ack, per worker (urutan kirim)
+        self._unacked: List[Dict[int, bytes]] = [{} for _ in range(self.count)]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+        self.dispatched = [0] * self.count
+        self.dropped = 0
+        self.redelivered = 0
+        self.restarts = 0
+
+    def _spawn(self, index: int):
+        """Membuat pipe, proses dan thread pembaca ack untuk satu worker"""
+        child, parent = _context.Pipe(duplex=True)
+        process = _context.Process(
+            target=_worker_entry,
+            args=(self.target, index, self.count, child, self.args),
+            name=f"bot-worker-{index}",
+            daemon=False
+        )
+        process.start()
+        # Ujung worker hanya dipakai proses worker
+        child.close()
+        self._processes[index] = process
+        self._connections[index] = parent
+        reader = threading.Thread(target=self._read_acks, args=(index, parent),
+                                  name=f"acks-{index}", daemon=True)
+        reader.start()
+        self._ack_readers[index] = reader
+
+    def _read_acks(self, index: int, connection: Connection):
+        """Thread pembaca ack dari satu worker (berhenti saat worker keluar)"""
+        try:
+            while True:
+                update_id = int(connection.recv_bytes())
+                self._loop.call_soon_threadsafe(self._acked, index, update_id)
+        except (EOFError, OSError, ValueError):
+            pass
+        except RuntimeError:
+            # Event loop sudah ditutup
+            pass
+
+    def _acked(self, index: int, update_id: int):
+        """Update selesai diproses worker"""
+        if self._unacked[index].pop(update_id, None) is not None and self.on_ack:
+            self.on_ack(update_id)
+
+    def start(self):
+        """Menjalankan semua worker (dipanggil dari dalam event loop)"""
+        loop = self._loop = asyncio.get_running_loop()
+        for index in range(self.count):
+            self._spawn(index)
+            self._queues.append(asyncio.Queue(self.queue_size))
+            self._senders.append(
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pipe-{index}")
+            )
+            self._tasks.append(loop.create_task(self._send_loop(index)))
+        self._tasks.append(loop.create_task(self._monitor()))
+        logger.info(f"👷 Started {self.count} worker processes")
+
+    async def dispatch(self, key: Optional[Hashable], payload: bytes,
+                       update_id: Optional[int] = None) -> int:
+        """
+        Memasukkan payload ke antrian worker milik `key`.
+        Menunggu jika antrian worker tersebut penuh. Dengan `update_id`,
+        payload dilacak sampai worker mengirim ack.
+
+        Returns:
+            index worker tujuan
+        """
+        index = shard_for(key, self.count)
+        if index is None:
+            index = next(self._round_robin) % self.count
+        await self._queues[index].put((update_id, payload))
+        self.dispatched[index] += 1
+        return index
+
+    async def _send_loop(self, index: int):
+        """Mengirim isi antrian satu worker ke pipe-nya"""
+        loop = asyncio.get_running_loop()
+        queue = self._queues[index]
+        while True:
+            item = await queue.get()
+            if item is None:
+                # Akhir stream: worker menyelesaikan sisa update lalu keluar
+                try:
+                    await loop.run_in_executor(
+                        self._senders[index], self._connections[index].send_bytes, END_OF_STREAM
+                    )
+                except (OSError, ValueError):
+                    pass
+                return
+            update_id, payload = item
+            if update_id is not None:
+                self._unacked[index][update_id] = payload
+            try:
+                await loop.run_in_executor(
+                    self._senders[index], self._connections[index].send_bytes, payload
+                )
+            except (OSError, ValueError) as e:
+                if update_id is None:
+                    self.dropped += 1
+                    logger.warning(f"Worker {index} unreachable, update dropped: {e}")
+                else:
+                    # Tetap di _unacked; dikirim ulang ke worker pengganti
+                    logger.warning(f"Worker {index} unreachable, update {update_id} "
+                                   f"will be redelivered: {e}")
+
+    def _redeliver(self, index: int):
+        """
+        Mengirim ulang payload yang belum di-ack ke worker pengganti.
+        Dipanggil tepat setelah _spawn (tanpa await di antaranya), sehingga
+        masuk executor pengirim sebelum payload baru dari _send_loop.
+        """
+        payloads = list(self._unacked[index].values())
+        if not payloads:
+            return
+        connection = self._connections[index]
+
+        def send_all():
+            try:
+                for payload in payloads:
+                    connection.send_bytes(payload)
+            except (OSError, ValueError) as e:
+                # Tetap di _unacked; dicoba lagi saat worker di-spawn ulang
+                logger.error(f"Redelivery to worker {index} failed: {e}")
+
+        self.redelivered += len(payloads)
+        logger.warning(f"Redelivering {len(payloads)} unacked updates to worker {index}")
+        self._loop.run_in_executor(self._senders[index], send_all)
+
+    async def _monitor(self, interval: float = 1.0):
+        """Men-spawn ulang worker yang mati"""
+        while not self._stopping:
+            await asyncio.sleep(interval)
+            for index, process in enumerate(self._processes):
+                if self._stopping or process is None or process.is_alive():
+                    continue
+                logger.error(f"Worker {index} exited with code {process.exitcode}, restarting")
+                self._connections[index].close()
+                self._spawn(index)
+                self._redeliver(index)
+                self.restarts += 1
+
+    async def stop(self, timeout: float = 30.0):
+        """
+        Mengirim semua payload yang tersisa dan akhir stream (worker selesai
+        memproses lalu berhenti), menunggu semua proses keluar, lalu
+        menutup pipe. Ack yang datang selama worker menyelesaikan sisa
+        update tetap diterima.
+        """
+        self._stopping = True
+        for queue in self._queues:
+            await queue.put(None)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        for executor in self._senders:
+            executor.shutdown(wait=False)
+
+        loop = asyncio.get_running_loop()
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {index} did not exit in {timeout}s, terminating")
+                process.terminate()
+                await loop.run_in_executor(None, process.join, 5)
+        # Thread pembaca selesai setelah ack terakhir (EOF saat worker keluar);
+        # sleep(0) menjalankan callback _acked yang sudah dijadwalkan
+        for reader in self._ack_readers:
+            if reader is not None:
+                await loop.run_in_executor(None, reader.join, 5)
+        await asyncio.sleep(0)
+
+        for connection in self._connections:
+            if connection is not None:
+                connection.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik pool untuk admin command dan benchmark"""
+        return {
+            "workers": self.count,
+            "alive": sum(1 for process in self._processes if process and process.is_alive()),
+            "dispatched": list(self.dispatched),
+            "queued": [queue.qsize() for queue in self._queues],
+            "unacked": [len(unacked) for unacked in self._unacked],
+            "dropped": self.dropped,
+            "redelivered": self.redelivered,
+            "restarts": self.restarts
+        }
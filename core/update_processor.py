@@ -0,0 +1,199 @@
+"""
+========================================
+Modular Telegram Bot - Update Processor
+========================================
+Nama: ChatOrderedUpdateProcessor
+Deskripsi: Update processor untuk Application yang memproses update
+           secara concurrent (dibatasi) dengan urutan tetap per chat
+Command: -
+Usage: ApplicationBuilder().concurrent_updates(
+           ChatOrderedUpdateProcessor(max_concurrent=64)
+       )
+========================================
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Hashable, Optional, Set
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+class _ChatQueue:
+    """Status antrian satu chat"""
+
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        # asyncio.Lock melayani waiter secara FIFO -> urutan update terjaga
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Menjalankan sampai `max_concurrent` handler sekaligus, tetapi update
+    dari chat yang sama selalu diproses satu per satu sesuai urutan masuk.
+
+    Update menunggu giliran chat-nya lebih dulu, baru mengambil slot
+    global, sehingga chat yang sibuk tidak menghabiskan slot yang bisa
+    dipakai chat lain. `max_pending` membatasi jumlah update yang boleh
+    berada di processor (menunggu + berjalan) sebelum Application ikut
+    menunggu.
+
+    Jika `tracker` (UpdateTracker) dipasang, update duplikat dilewati
+    tanpa menjalankan handler dan update_id yang selesai dicatat. Jika
+    `limiter` (InboundRateLimiter) dipasang, update user yang melewati
+    batas ditolak. Jika `admission` (AdmissionController) dipasang,
+    update prioritas rendah bisa ditunda atau dibuang saat beban tinggi;
+    keputusan itu diambil setelah update mendapat giliran chat-nya,
+    sehingga update yang ditunda tidak bisa didahului update berikutnya
+    dari chat yang sama.
+    """
+
+    def __init__(self, max_concurrent: int = 64, max_pending: int = 4096):
+        super().__init__(max(max_pending, max_concurrent))
+        self.max_concurrent = max_concurrent
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._chats: Dict[Hashable, _ChatQueue] = {}
+        # Task update yang sedang menunggu/berjalan (untuk drain saat shutdown)
+        self._tasks: Set[asyncio.Task] = set()
+        self.in_flight = 0
+        self.pending = 0
+        self.processed = 0
+        self.last_update_at: Optional[float] = None
+        self.max_chat_depth = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        # EWMA waktu update di processor (antri + handler), milidetik
+        self.latency_ms = 0.0
+        self.tracker = None
+        self.limiter = None
+        self.admission = None
+
+    async def initialize(self):
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+
+    async def shutdown(self):
+        self._chats.clear()
+
+    @staticmethod
+    def get_chat_key(update: Any) -> Optional[Hashable]:
+        """Key urutan: chat_id, atau user_id untuk update tanpa chat (inline query dll)"""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return ("user", update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]):
+        if self._slots is None:
+            await self.initialize()
+
+        self.last_update_at = time.time()
+        update_id = getattr(update, "update_id", None) if self.tracker else None
+        if update_id is not None and not self.tracker.begin(update_id):
+            coroutine.close()
+            return
+
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self.pending += 1
+        try:
+            if self.limiter is not None and not self.limiter.admit(update):
+                coroutine.close()
+                return
+            await self._process(update, coroutine)
+        finally:
+            self.pending -= 1
+            self._tasks.discard(task)
+            if update_id is not None:
+                self.tracker.done(update_id)
+
+    async def _process(self, update: object, coroutine: Awaitable[Any]):
+        key = self.get_chat_key(update)
+        if key is None:
+            await self._admit_and_run(update, coroutine, time.perf_counter())
+            return
+
+        queue = self._chats.get(key)
+        if queue is None:
+            queue = self._chats[key] = _ChatQueue()
+        queue.depth += 1
+        if queue.depth > self.max_chat_depth:
+            self.max_chat_depth = queue.depth
+
+        queued_at = time.perf_counter()
+        try:
+            async with queue.lock:
+                await self._admit_and_run(update, coroutine, queued_at)
+        finally:
+            queue.depth -= 1
+            if queue.depth == 0:
+                # Chat tanpa antrian dibuang agar dict tidak tumbuh tanpa batas
+                self._chats.pop(key, None)
+
+    async def _admit_and_run(self, update: object, coroutine: Awaitable[Any], queued_at: float):
+        """Admission control di dalam giliran chat, lalu menjalankan handler"""
+        if self.admission is not None and not await self.admission.admit(update):
+            coroutine.close()
+            return
+        await self._run(coroutine, queued_at)
+
+    async def _run(self, coroutine: Awaitable[Any], queued_at: float):
+        """Menjalankan handler di dalam slot global"""
+        async with self._slots:
+            wait_ms = (time.perf_counter() - queued_at) * 1000
+            self.total_wait_ms += wait_ms
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+            self.in_flight += 1
+            try:
+                await coroutine
+            finally:
+                self.in_flight -= 1
+                self.processed += 1
+                latency_ms = (time.perf_counter() - queued_at) * 1000
+                self.latency_ms += 0.1 * (latency_ms - self.latency_ms)
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Menunggu semua update yang sedang menunggu/berjalan selesai.
+
+        Returns:
+            True jika selesai sebelum `timeout` detik
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    def cancel_pending(self) -> int:
+        """Membatalkan semua update yang belum selesai, mengembalikan jumlahnya"""
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def get_chat_depths(self, top: int = 10) -> Dict[Hashable, int]:
+        """Chat dengan antrian terpanjang saat ini {chat_key: depth}"""
+        ranked = sorted(self._chats.items(), key=lambda item: item[1].depth, reverse=True)
+        return {key: queue.depth for key, queue in ranked[:top]}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik processor untuk admin command dan exporter"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "pending": self.pending,
+            "processed": self.processed,
+            "active_chats": len(self._chats),
+            "max_chat_depth": self.max_chat_depth,
+            "avg_wait_ms": round(self.total_wait_ms / self.processed, 2) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "latency_ms": round(self.latency_ms, 2),
+            "chat_depths": self.get_chat_depths()
+        }
@@ -0,0 +1,188 @@
+"""
+========================================
+Modular Telegram Bot - Update Tracker
+========================================
+Nama: UpdateTracker
+Deskripsi: Menyimpan update_id terakhir yang selesai diproses, mengejar
+           backlog update saat startup (bukan drop_pending_updates) dan
+           membuang update duplikat (retry webhook, overlap backlog)
+Command: -
+Usage: tracker = UpdateTracker(async_db)
+       await tracker.load()
+       await tracker.catch_up(application.bot, application.update_queue)
+========================================
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+
+from telegram import Update
+
+from utils.logger import logger
+
+class UpdateTracker:
+    """
+    Pelacak update_id.
+
+    - `begin(update_id)` dipanggil saat update mulai diproses; False jika
+      update duplikat (sudah tercatat di ring buffer atau <= offset yang
+      tersimpan) sehingga handler tidak dijalankan
+    - `done(update_id)` dipanggil setelah handler selesai
+    - Watermark = update_id tertinggi yang semua update sebelumnya sudah
+      selesai; disimpan ke setting `last_update_id` setiap
+      `flush_interval` detik dan saat shutdown
+
+    Update_id dari Telegram naik berurutan, sehingga update yang masih
+    menunggu di update_queue selalu lebih besar dari watermark. Setelah
+    seminggu tanpa update, Telegram memilih update_id acak; karena itu
+    offset disimpan bersama waktunya dan diabaikan setelah `RESET_AFTER`.
+    """
+
+    SETTING_KEY = "last_update_id"
+    # Sedikit di bawah seminggu agar tidak pernah membandingkan dengan id acak
+    RESET_AFTER = 6 * 24 * 3600
+
+    def __init__(self, database, window: int = 2048, flush_interval: float = 1.0):
+        self.database = database
+        self.flush_interval = flush_interval
+        # Watermark terakhir yang sudah tersimpan di database
+        self.committed = 0
+        self._recent: Deque[int] = deque(maxlen=window)
+        self._recent_ids: Set[int] = set()
+        self._in_flight: Set[int] = set()
+        self._max_begun = 0
+        self._last_seen_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.duplicates = 0
+        self.caught_up = 0
+
+    async def load(self):
+        """Membaca offset yang tersimpan dari database"""
+        value = await self.database.get_setting(self.SETTING_KEY)
+        if not value:
+            return
+        update_id, _, saved_at = str(value).partition(":")
+        self._last_seen_at = float(saved_at or 0)
+        self.committed = self._max_begun = int(update_id)
+        self._expire()
+
+    def _expire(self):
+        """Melupakan offset yang sudah terlalu lama (update_id Telegram bisa di-reset)"""
+        if self.committed and time.time() - self._last_seen_at > self.RESET_AFTER:
+            logger.info(f"Update offset {self.committed} expired, starting fresh")
+            self.committed = self._max_begun = 0
+            self._recent.clear()
+            self._recent_ids.clear()
+
+    def start(self):
+        """Menjalankan task penyimpanan watermark berkala"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self):
+        """Menghentikan task berkala dan menyimpan watermark terakhir"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def begin(self, update_id: int) -> bool:
+        """
+        Menandai update mulai diproses.
+
+        Returns:
+            False jika update duplikat dan harus dilewati
+        """
+        self._expire()
+        self._last_seen_at = time.time()
+        if update_id <= self.committed or update_id in self._recent_ids:
+            self.duplicates += 1
+            logger.debug(f"Duplicate update {update_id} skipped")
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_ids.discard(self._recent[0])
+        self._recent.append(update_id)
+        self._recent_ids.add(update_id)
+        self._in_flight.add(update_id)
+        if update_id > self._max_begun:
+            self._max_begun = update_id
+        return True
+
+    def done(self, update_id: int):
+        """Menandai update selesai diproses (berhasil, error atau dibatalkan)"""
+        self._in_flight.discard(update_id)
+
+    @property
+    def watermark(self) -> int:
+        """update_id tertinggi yang semua update sebelumnya sudah selesai"""
+        if self._in_flight:
+            return min(self._in_flight) - 1
+        return self._max_begun
+
+    async def flush(self):
+        """Menyimpan watermark jika berubah"""
+        watermark = self.watermark
+        if watermark <= self.committed:
+            return
+        try:
+            await self.database.set_setting(
+                self.SETTING_KEY, f"{watermark}:{int(self._last_seen_at)}"
+            )
+            self.committed = watermark
+        except Exception as e:
+            logger.error(f"Failed to save update offset: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def catch_up(self, bot, update_queue: asyncio.Queue, batch_size: int = 100) -> int:
+        """
+        Memproses update yang tertunda di Telegram sebelum polling dimulai.
+
+        Backlog diambil per halaman `batch_size` update mulai dari offset
+        tersimpan. Halaman berikutnya baru diminta (dan halaman sebelumnya
+        baru dikonfirmasi ke Telegram) setelah semua update di halaman itu
+        selesai diproses, sehingga update tidak hilang jika proses mati
+        di tengah catch-up dan jumlah update yang berjalan tetap terbatas.
+
+        Returns:
+            jumlah update backlog yang diproses
+        """
+        started = time.perf_counter()
+        offset = self.committed + 1 if self.committed else None
+        total = 0
+        # getUpdates ditolak Telegram selama webhook masih terpasang
+        await bot.delete_webhook(drop_pending_updates=False)
+        while True:
+            updates = await bot.get_updates(
+                offset=offset, limit=batch_size, timeout=0, allowed_updates=Update.ALL_TYPES
+            )
+            if not updates:
+                break
+            for update in updates:
+                await update_queue.put(update)
+            await update_queue.join()
+            offset = updates[-1].update_id + 1
+            total += len(updates)
+            await self.flush()
+
+        self.caught_up += total
+        if total:
+            logger.info(f"📥 Caught up {total} pending updates in "
+                        f"{time.perf_counter() - started:.1f}s")
+        return total
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrik tracker untuk admin command"""
+        return {
+            "committed": self.committed,
+            "watermark": self.watermark,
+            "in_flight": len(self._in_flight),
+            "duplicates": self.duplicates,
+            "caught_up": self.caught_up
+        }
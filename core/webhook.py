@@ -0,0 +1,111 @@
+"""
+========================================
+Modular Telegram Bot - Webhook Server
+========================================
+Nama: WebhookServer
+Deskripsi: Server HTTP ringan (aiohttp) yang menerima update dari
+           Telegram lewat webhook dan memasukkannya ke update_queue
+           milik Application
+Command: -
+Usage: BOT_MODE=webhook python bot.py
+       Test lokal:
+       curl -X POST http://127.0.0.1:8443/telegram \\
+            -H "X-Telegram-Bot-Api-Secret-Token: $WEBHOOK_SECRET" \\
+            -H "Content-Type: application/json" \\
+            -d '{"update_id": 1, "message": {...}}'
+========================================
+"""
+
+import hmac
+import json
+from typing import Any, Dict, Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from utils.logger import logger
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookServer:
+    """
+    Endpoint webhook Telegram.
+
+    Secret token dicek dengan hmac.compare_digest sebelum body dibaca,
+    sehingga request tanpa secret yang benar ditolak tanpa parsing JSON.
+    Secret wajib diisi; server tidak pernah berjalan tanpa autentikasi.
+    Update hanya dimasukkan ke antrian; pemrosesan tetap dilakukan oleh
+    Application seperti pada mode polling.
+    """
+
+    def __init__(self, application: Application, listen: str = "0.0.0.0",
+                 port: int = 8443, path: str = "/telegram",
+                 secret_token: Optional[str] = None, max_body_size: int = 1024 * 1024):
+        self.application = application
+        self.listen = listen
+        self.port = port
+        self.path = path if path.startswith("/") else f"/{path}"
+        if not secret_token:
+            raise ValueError("WebhookServer requires a secret_token")
+        self.secret_token = secret_token
+        self.max_body_size = max_body_size
+        self._runner = None
+        self.received = 0
+        self.rejected = 0
+        self.invalid = 0
+
+    async def start(self):
+        """Menjalankan server HTTP (dipanggil setelah application.start())"""
+        try:
+            from aiohttp import web
+        except ImportError:
+            raise RuntimeError("Mode webhook membutuhkan aiohttp (pip install aiohttp)")
+
+        app = web.Application(client_max_size=self.max_body_size)
+        app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        logger.info(f"🌐 Webhook listening on {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Menghentikan server HTTP (update yang sudah diterima tetap di antrian)"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        """Handler POST update dari Telegram"""
+        from aiohttp import web
+
+        if not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ""), self.secret_token
+        ):
+            self.rejected += 1
+            return web.Response(status=403)
+
+        try:
+            data = await request.json(loads=json.loads)
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            self.invalid += 1
+            logger.warning(f"Invalid webhook payload: {e}")
+            return web.Response(status=400)
+
+        if update is None:
+            self.invalid += 1
+            return web.Response(status=400)
+
+        self.received += 1
+        await self.application.update_queue.put(update)
+        return web.Response(status=200)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Counter request webhook"""
+        return {
+            "received": self.received,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "queue_size": self.application.update_queue.qsize()
+        }
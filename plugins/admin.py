@@ -6,24 +6,45 @@ Nama: Admin
 Deskripsi: Plugin untuk admin commands (broadcast, user management, dll)
 Commands:
   - /broadcast [pesan]: Kirim pesan ke semua user (admin only)
+  - /broadcast: Lihat job broadcast terakhir (admin only)
+  - /cancelbroadcast [id]: Batalkan job broadcast (admin only)
   - /users: Lihat jumlah user (admin only)
   - /reload: Reload semua plugin (admin only)
   - /logs: Lihat log terakhir (admin only)
+  - /backup: Backup database online (admin only)
+  - /dbstats: Lihat metrik query database (admin only)
+  - /queues: Lihat antrian update, pesan keluar dan lag event loop (admin only)
+  - /errors: Lihat jenis error terbanyak (admin only)
+  - /export [users|stats] [csv|ndjson]: Export data ke file (admin only)
+  - /import [users|stats]: Import data dari file yang di-reply (admin only)
 Contoh Penggunaan:
   - /broadcast Halo semua!
+  - /cancelbroadcast 3
   - /users
   - /reload
   - /logs
+  - /backup
+  - /dbstats
+  - /errors
+  - /export stats csv
+  - /import users (reply ke file .ndjson/.csv)
 ========================================
 """
 
+import asyncio
+import html
+import os
+from datetime import datetime
+
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
 from core.plugin_base import PluginBase
-from config import ADMIN_IDS
-from utils.database import db
+from config import ADMIN_IDS, BACKUP_DIR
+from utils.async_database import async_db
 from utils.logger import logger
+from utils.storage import EXPORT_COLUMNS
+from utils.transfer import FORMATS, export_table, import_table
 
 class AdminPlugin(PluginBase):
     """Plugin untuk admin commands"""
@@ -36,16 +57,30 @@ class AdminPlugin(PluginBase):
     
     COMMANDS = [
         {"command": "broadcast", "description": "[Admin] Kirim broadcast", "handler": "cmd_broadcast"},
+        {"command": "cancelbroadcast", "description": "[Admin] Batalkan broadcast", "handler": "cmd_cancelbroadcast"},
         {"command": "users", "description": "[Admin] Lihat statistik user", "handler": "cmd_users"},
         {"command": "reload", "description": "[Admin] Reload plugins", "handler": "cmd_reload"},
-        {"command": "logs", "description": "[Admin] Lihat log", "handler": "cmd_logs"}
+        {"command": "logs", "description": "[Admin] Lihat log", "handler": "cmd_logs"},
+        {"command": "backup", "description": "[Admin] Backup database", "handler": "cmd_backup"},
+        {"command": "dbstats", "description": "[Admin] Metrik query database", "handler": "cmd_dbstats"},
+        {"command": "queues", "description": "[Admin] Antrian update", "handler": "cmd_queues"},
+        {"command": "errors", "description": "[Admin] Ringkasan error", "handler": "cmd_errors"},
+        {"command": "export", "description": "[Admin] Export users/stats", "handler": "cmd_export"},
+        {"command": "import", "description": "[Admin] Import users/stats", "handler": "cmd_import"}
     ]
     
     EXAMPLES = [
         "/broadcast Halo semua!",
+        "/cancelbroadcast 3",
         "/users",
         "/reload",
-        "/logs"
+        "/logs",
+        "/backup",
+        "/dbstats",
+        "/queues",
+        "/errors",
+        "/export stats csv",
+        "/import users"
     ]
     
     async def initialize(self):
@@ -75,35 +110,78 @@ class AdminPlugin(PluginBase):
             return
         
         if not context.args:
+            jobs = await async_db.run_read(async_db.database.get_broadcast_jobs, None, 5)
+            lines = [
+                f"#{job['id']} {job['status']} - {job['sent']} terkirim, "
+                f"{job['failed']} gagal, {job['blocked']} blokir"
+                for job in jobs
+            ]
             await update.message.reply_text(
                 "⚠️ <b>Penggunaan:</b>\n"
                 "<code>/broadcast [pesan]</code>\n\n"
-                "<i>Contoh: /broadcast Halo semua!</i>",
+                "<i>Contoh: /broadcast Halo semua!</i>"
+                + ("\n\n📋 <b>Job Terakhir:</b>\n" + "\n".join(lines) if lines else ""),
                 parse_mode="HTML"
             )
             return
         
         message = " ".join(context.args)
         
-        # Kirim status
+        # Pesan status, diperbarui oleh engine selama broadcast berjalan
         status_msg = await update.message.reply_text(
-            "📤 <b>Mengirim broadcast...</b>",
+            "📤 <b>Menyiapkan broadcast...</b>",
             parse_mode="HTML"
         )
         
-        # Kirim broadcast
+        # Job berjalan di background agar chat admin tidak tertahan
         from bot import bot
-        result = await bot.send_broadcast(message)
-        
-        await status_msg.edit_text(
-            f"✅ <b>Broadcast Selesai!</b>\n\n"
-            f"📤 <b>Berhasil:</b> {result['success']}\n"
-            f"❌ <b>Gagal:</b> {result['failed']}\n"
-            f"📊 <b>Total:</b> {result['total']}",
-            parse_mode="HTML"
+        job_id = await bot.broadcast.create(
+            message, "HTML", created_by=user.id,
+            status_chat_id=status_msg.chat_id, status_message_id=status_msg.message_id
         )
+        bot.broadcast.submit(job_id)
         
-        logger.info(f"Broadcast sent by admin {user.id}: {result}")
+        logger.info(f"Broadcast #{job_id} started by admin {user.id}")
+    
+    async def cmd_cancelbroadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /cancelbroadcast
+        Format: /cancelbroadcast [id]
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        if not context.args or not context.args[0].lstrip("#").isdigit():
+            await update.message.reply_text(
+                "⚠️ <b>Penggunaan:</b>\n"
+                "<code>/cancelbroadcast [id]</code>",
+                parse_mode="HTML"
+            )
+            return
+        
+        from bot import bot
+        job_id = int(context.args[0].lstrip("#"))
+        
+        if await bot.broadcast.cancel(job_id):
+            await update.message.reply_text(
+                f"🛑 Broadcast #{job_id} dibatalkan.\n"
+                f"<i>Batch yang sedang dikirim tetap diselesaikan.</i>",
+                parse_mode="HTML"
+            )
+            logger.info(f"Broadcast #{job_id} cancelled by admin {user.id}")
+        else:
+            await update.message.reply_text(
+                f"❌ Broadcast #{job_id} tidak ditemukan atau sudah selesai.",
+                parse_mode="HTML"
+            )
     
     async def cmd_users(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -122,11 +200,11 @@ class AdminPlugin(PluginBase):
             return
         
         # Dapatkan statistik
-        total_users = db.get_user_count()
-        recent_stats = db.get_stats(days=7)
+        total_users = await async_db.get_user_count()
+        recent_stats = await async_db.get_stats(days=7)
         
         # Dapatkan beberapa user terbaru
-        recent_users = db.get_all_users(limit=5)
+        recent_users = await async_db.get_all_users(limit=5)
         
         text = f"""
 👥 <b>Statistik User</b>
@@ -245,5 +323,361 @@ class AdminPlugin(PluginBase):
         
         logger.command_used("/logs", user.id, user.username)
 
+    async def cmd_backup(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /backup
+        Membuat backup database online tanpa menghentikan bot
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        status_msg = await update.message.reply_text(
+            "💾 <b>Membuat backup...</b>",
+            parse_mode="HTML"
+        )
+        
+        from bot import bot
+        
+        try:
+            result = await bot.maintenance.run_backup()
+        except NotImplementedError:
+            await status_msg.edit_text(
+                "⚠️ <b>Backend storage ini tidak mendukung backup!</b>",
+                parse_mode="HTML"
+            )
+            return
+        except Exception as e:
+            await status_msg.edit_text(
+                f"❌ <b>Backup gagal:</b> <code>{html.escape(str(e))}</code>",
+                parse_mode="HTML"
+            )
+            return
+        
+        await status_msg.edit_text(
+            f"✅ <b>Backup Selesai!</b>\n\n"
+            f"📁 <b>File:</b> <code>{result['path']}</code>\n"
+            f"📦 <b>Ukuran:</b> {result['size'] / 1024:.1f} KB\n"
+            f"⏱️ <b>Durasi:</b> {result['duration_ms']:.0f} ms",
+            parse_mode="HTML"
+        )
+        
+        logger.command_used("/backup", user.id, user.username)
+
+    async def cmd_dbstats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /dbstats
+        Menampilkan method database terlambat, busy, lock wait dan slow query
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        metrics = async_db.database.get_query_metrics()
+        if not metrics:
+            await update.message.reply_text(
+                "⚠️ <b>Backend storage ini tidak memiliki metrik query!</b>",
+                parse_mode="HTML"
+            )
+            return
+        
+        methods = sorted(metrics["methods"].items(),
+                         key=lambda item: item[1]["total_ms"], reverse=True)[:8]
+        lock_wait = metrics["lock_wait"]
+        
+        text = (
+            f"🗄️ <b>Metrik Database</b>\n\n"
+            f"⏱️ <b>Uptime:</b> {metrics['uptime_seconds']:.0f}s\n"
+            f"🔒 <b>Lock wait:</b> {lock_wait['total_ms']:.1f}ms "
+            f"(max {lock_wait['max_ms']:.1f}ms)\n"
+            f"⚠️ <b>SQLITE_BUSY:</b> {metrics['busy_total']}\n\n"
+            f"<b>Method (total waktu):</b>\n"
+        )
+        for name, stats in methods:
+            text += (f"  • <code>{name}</code>: {stats['calls']}x, "
+                     f"avg {stats['avg_ms']:.2f}ms, p95 ≤{stats['p95_ms']}ms, "
+                     f"{stats['rows']} rows\n")
+        
+        slow = metrics["slow_queries"][-5:]
+        if slow:
+            text += f"\n🐢 <b>Slow query (≥{metrics['slow_query_ms']:.0f}ms):</b>\n"
+            for entry in reversed(slow):
+                text += f"  • {entry['time']} <code>{entry['method']}</code> {entry['duration_ms']}ms\n"
+        
+        await update.message.reply_text(text, parse_mode="HTML")
+        
+        logger.command_used("/dbstats", user.id, user.username)
+
+    async def cmd_errors(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /errors
+        Menampilkan fingerprint error terbanyak sejak bot berjalan
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        from bot import bot
+        metrics = bot.errors.get_metrics()
+        top = bot.errors.summary(8)
+        
+        text = (
+            f"🧯 <b>Ringkasan Error</b>\n\n"
+            f"⚠️ <b>Total:</b> {metrics['total']} ({metrics['fingerprints']} jenis) "
+            f"sejak {metrics['since']}\n"
+            f"🔕 <b>Balasan ditahan:</b> {metrics['replies_suppressed']}\n"
+        )
+        if top:
+            text += "\n<b>Fingerprint teratas:</b>\n"
+            for entry in top:
+                text += (
+                    f"  • <b>{entry['count']}x</b> <code>{html.escape(entry['fingerprint'])}</code>\n"
+                    f"    <i>{html.escape(entry['last_message'][:100])}</i> ({entry['last_seen']})\n"
+                )
+        else:
+            text += "\n✅ Belum ada error."
+        
+        await update.message.reply_text(text, parse_mode="HTML")
+        
+        logger.command_used("/errors", user.id, user.username)
+    
+    async def cmd_queues(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /queues
+        Menampilkan antrian update per chat, rate limit masuk, admission
+        control, antrian pesan keluar dan lag event loop
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        from bot import bot
+        metrics = bot.update_processor.get_metrics()
+        
+        text = (
+            f"📥 <b>Antrian Update</b>\n\n"
+            f"⚙️ <b>Berjalan:</b> {metrics['in_flight']}/{metrics['max_concurrent']}\n"
+            f"⏳ <b>Di processor:</b> {metrics['pending']}\n"
+            f"✅ <b>Diproses:</b> {metrics['processed']}\n"
+            f"💬 <b>Chat aktif:</b> {metrics['active_chats']}\n"
+            f"📏 <b>Antrian chat terpanjang:</b> {metrics['max_chat_depth']}\n"
+            f"⏱️ <b>Tunggu rata-rata:</b> {metrics['avg_wait_ms']}ms "
+            f"(max {metrics['max_wait_ms']}ms)\n"
+        )
+        tracker = bot.tracker.get_metrics()
+        if tracker["committed"]:
+            text += (
+                f"🔖 <b>Offset tersimpan:</b> {tracker['committed']} "
+                f"(backlog {tracker['caught_up']}, duplikat {tracker['duplicates']})\n"
+            )
+        if metrics["chat_depths"]:
+            text += "\n<b>Antrian per chat:</b>\n"
+            for chat, depth in metrics["chat_depths"].items():
+                text += f"  • <code>{chat}</code>: {depth}\n"
+        
+        inbound = bot.inbound_limiter.get_metrics()
+        if inbound["enabled"]:
+            text += (
+                f"\n🚦 <b>Rate Limit Masuk:</b> {inbound['allowed']} diterima, "
+                f"ditolak {inbound['rejected']} ({inbound['buckets']} bucket)\n"
+            )
+            for scope, count in inbound["rejected_by_scope"].items():
+                text += f"  • <code>{scope}</code>: {count}\n"
+        
+        admission = bot.admission.get_metrics()
+        if admission["enabled"]:
+            text += (
+                f"\n🚧 <b>Admission:</b> level {admission['level']} "
+                f"(latensi {admission['latency_ms']}ms, ditunda {admission['deferred']})\n"
+                f"🗑️ <b>Dibuang:</b> {admission['shed']} "
+                f"(total ditunda {admission['deferred_total']})\n"
+            )
+            for category, count in admission["shed_by_category"].items():
+                text += f"  • <code>{category}</code>: {count}\n"
+        
+        outbound = bot.rate_limiter.get_metrics()
+        text += (
+            f"\n📤 <b>Pesan Keluar</b>\n"
+            f"📨 <b>Request:</b> {outbound['requests']} "
+            f"(ditahan {outbound['throttled']}, rata-rata {outbound['avg_wait_ms']}ms)\n"
+            f"🚦 <b>Antrian:</b> {outbound['queued']} {outbound['queued_by_priority']}\n"
+            f"🔁 <b>Retry 429:</b> {outbound['retries']} (gagal {outbound['failed']})\n"
+        )
+
+        loop = bot.loop_monitor.get_metrics()
+        text += (
+            f"\n🔄 <b>Event Loop</b>\n"
+            f"⏱️ <b>Lag:</b> p50 {loop['p50_ms']}ms, p99 {loop['p99_ms']}ms "
+            f"(max {loop['max_ms']}ms, {loop['samples']} sampel)\n"
+            f"🐢 <b>Tertahan:</b> {loop['blocks']}x\n"
+        )
+        for location, count in loop["top_culprits"]:
+            text += f"  • <code>{html.escape(location)}</code>: {count}x\n"
+
+        await update.message.reply_text(text, parse_mode="HTML")
+        
+        logger.command_used("/queues", user.id, user.username)
+    
+    async def cmd_export(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /export
+        Format: /export [users|stats] [csv|ndjson]
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        table = context.args[0].lower() if context.args else ""
+        fmt = context.args[1].lower() if len(context.args) > 1 else "ndjson"
+        if table not in EXPORT_COLUMNS or fmt not in FORMATS:
+            await update.message.reply_text(
+                "⚠️ <b>Penggunaan:</b>\n"
+                "<code>/export [users|stats] [csv|ndjson]</code>\n\n"
+                "<i>Contoh: /export stats csv</i>",
+                parse_mode="HTML"
+            )
+            return
+        
+        status_msg = await update.message.reply_text(
+            f"📤 <b>Mengekspor {table}...</b>",
+            parse_mode="HTML"
+        )
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(BACKUP_DIR, "exports", f"{table}_{timestamp}.{fmt}")
+        
+        try:
+            # Thread terpisah: export membaca per batch tanpa menahan event loop
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None, export_table, async_db.database, table, path, fmt
+            )
+        except NotImplementedError:
+            await status_msg.edit_text(
+                "⚠️ <b>Backend storage ini tidak mendukung export!</b>",
+                parse_mode="HTML"
+            )
+            return
+        except Exception as e:
+            await status_msg.edit_text(
+                f"❌ <b>Export gagal:</b> <code>{html.escape(str(e))}</code>",
+                parse_mode="HTML"
+            )
+            return
+
+        await status_msg.edit_text(
+            f"✅ <b>Export Selesai!</b>\n\n"
+            f"📊 <b>Baris:</b> {result['rows']}\n"
+            f"📦 <b>Ukuran:</b> {result['size'] / 1024:.1f} KB\n"
+            f"⏱️ <b>Durasi:</b> {result['duration_ms']:.0f} ms",
+            parse_mode="HTML"
+        )
+        with open(path, "rb") as fp:
+            await update.message.reply_document(fp, filename=os.path.basename(path))
+        
+        logger.command_used("/export", user.id, user.username)
+    
+    async def cmd_import(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handler untuk command /import
+        Format: /import [users|stats] (reply ke file .ndjson/.csv)
+        Hanya untuk admin
+        """
+        user = update.effective_user
+        
+        if not self.is_admin(user.id):
+            await update.message.reply_text(
+                "⛔ <b>Akses Ditolak!</b>\n\n"
+                "Command ini hanya untuk admin.",
+                parse_mode="HTML"
+            )
+            return
+        
+        table = context.args[0].lower() if context.args else ""
+        reply = update.message.reply_to_message
+        document = reply.document if reply else None
+        if table not in EXPORT_COLUMNS or document is None:
+            await update.message.reply_text(
+                "⚠️ <b>Penggunaan:</b>\n"
+                "Reply ke file .ndjson/.csv dengan\n"
+                "<code>/import [users|stats]</code>",
+                parse_mode="HTML"
+            )
+            return
+        
+        status_msg = await update.message.reply_text(
+            f"📥 <b>Mengimpor {table}...</b>",
+            parse_mode="HTML"
+        )
+        
+        filename = os.path.basename(document.file_name or f"{table}.ndjson")
+        path = os.path.join(BACKUP_DIR, "imports", filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        try:
+            file = await document.get_file()
+            await file.download_to_drive(path)
+            
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None, import_table, async_db.database, table, path
+            )
+        except NotImplementedError:
+            await status_msg.edit_text(
+                "⚠️ <b>Backend storage ini tidak mendukung import!</b>",
+                parse_mode="HTML"
+            )
+            return
+        except Exception as e:
+            await status_msg.edit_text(
+                f"❌ <b>Import gagal:</b> <code>{html.escape(str(e))}</code>",
+                parse_mode="HTML"
+            )
+            return
+        
+        await status_msg.edit_text(
+            f"✅ <b>Import Selesai!</b>\n\n"
+            f"📊 <b>Baris:</b> {result['rows']}\n"
+            f"⏱️ <b>Durasi:</b> {result['duration_ms']:.0f} ms",
+            parse_mode="HTML"
+        )
+        
+        logger.info(f"Import {table} by admin {user.id}: {result}")
+
 # Instance plugin
 plugin = AdminPlugin()
@@ -23,7 +23,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -91,7 +91,7 @@ class CalculatorPlugin(PluginBase):
         Format: /calc [expression]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -137,7 +137,7 @@ class CalculatorPlugin(PluginBase):
         Format: /factorial [n]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -184,7 +184,7 @@ class CalculatorPlugin(PluginBase):
         Format: /sqrt [n]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -224,7 +224,7 @@ class CalculatorPlugin(PluginBase):
         Format: /power [base] [exponent]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if len(context.args) < 2:
             await update.message.reply_text(
@@ -20,7 +20,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -166,7 +166,7 @@ class ConverterPlugin(PluginBase):
         Format: /convert [nilai] [dari] [ke]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if len(context.args) < 3:
             # Tampilkan bantuan
@@ -220,7 +220,7 @@ class ConverterPlugin(PluginBase):
         Format: /temp [nilai] [dari] [ke]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if len(context.args) < 3:
             await update.message.reply_text(
@@ -21,7 +21,7 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class EchoPlugin(PluginBase):
@@ -59,7 +59,7 @@ class EchoPlugin(PluginBase):
         Format: /echo [teks]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -81,7 +81,7 @@ class EchoPlugin(PluginBase):
         Format: /upper [teks]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -106,7 +106,7 @@ class EchoPlugin(PluginBase):
         Format: /lower [teks]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -131,7 +131,7 @@ class EchoPlugin(PluginBase):
         Format: /reverse [teks]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
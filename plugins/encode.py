@@ -25,7 +25,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -65,7 +65,7 @@ class EncodePlugin(PluginBase):
         Format: /base64enc [text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -102,7 +102,7 @@ class EncodePlugin(PluginBase):
         Format: /base64dec [base64_text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -139,7 +139,7 @@ class EncodePlugin(PluginBase):
         Format: /hash [text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -187,7 +187,7 @@ class EncodePlugin(PluginBase):
         Format: /urlencode [text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -224,7 +224,7 @@ class EncodePlugin(PluginBase):
         Format: /urldecode [encoded_url]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -22,7 +22,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -153,7 +153,7 @@ class FactsPlugin(PluginBase):
         Format: /fact atau /fact [category]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Determine category
         category = None
@@ -204,7 +204,7 @@ class FactsPlugin(PluginBase):
         await query.answer()
         
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Get category from callback data
         category = query.data.split("_")[1]
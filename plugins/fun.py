@@ -23,7 +23,7 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class FunPlugin(PluginBase):
@@ -105,7 +105,7 @@ class FunPlugin(PluginBase):
         Format: /roll atau /roll [sides]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Parse argumen
         sides = 6
@@ -136,7 +136,7 @@ class FunPlugin(PluginBase):
         Flip koin (head/tail)
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/flip", user.id, user.username)
         
         # Flip koin
@@ -155,7 +155,7 @@ class FunPlugin(PluginBase):
         Random joke
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/joke", user.id, user.username)
         
         # Pilih random joke
@@ -173,7 +173,7 @@ class FunPlugin(PluginBase):
         Format: /8ball [pertanyaan]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
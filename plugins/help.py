@@ -19,7 +19,7 @@ from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 
 from core.plugin_base import PluginBase
 from config import BUTTON_BACK, HELP_MESSAGE
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class HelpPlugin(PluginBase):
@@ -57,7 +57,7 @@ class HelpPlugin(PluginBase):
         Format: /help atau /help [plugin_name]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         args = context.args
         
@@ -156,7 +156,7 @@ class HelpPlugin(PluginBase):
         await query.answer()
         
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Panggil _show_general_help dengan is_callback=True
         await self._show_general_help(update, context, is_callback=True)
@@ -22,7 +22,7 @@ from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 
 from core.plugin_base import PluginBase
 from config import BOT_NAME, BOT_VERSION, BOT_AUTHOR, BUTTON_BACK
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class InfoPlugin(PluginBase):
@@ -88,10 +88,11 @@ class InfoPlugin(PluginBase):
         Menampilkan informasi tentang bot
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/info", user.id, user.username)
         
         from bot import bot
+        user_count = await async_db.get_user_count()
         
         info_text = f"""
 ℹ️ <b>Informasi Bot</b>
@@ -102,7 +103,7 @@ class InfoPlugin(PluginBase):
 ⏱️ <b>Uptime:</b> {self.get_uptime()}
 
 📦 <b>Plugin terinstall:</b> {bot.plugin_manager.plugin_count}
-👥 <b>Total pengguna:</b> {db.get_user_count()}
+👥 <b>Total pengguna:</b> {user_count}
 
 <i>Bot modular yang mudah dikembangkan!</i>
 """
@@ -120,7 +121,7 @@ class InfoPlugin(PluginBase):
         Menampilkan statistik bot
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/stats", user.id, user.username)
         
         await self._show_stats(update, context, is_callback=False)
@@ -128,10 +129,10 @@ class InfoPlugin(PluginBase):
     async def _show_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback: bool = False):
         """Helper untuk menampilkan statistik"""
         # Dapatkan statistik dari database
-        stats = db.get_stats(days=7)
+        stats = await async_db.get_stats(days=7)
         
         # Statistik plugin
-        plugin_stats = db.get_plugin_stats()
+        plugin_stats = await async_db.get_plugin_stats()
         
         stats_text = f"""
 📊 <b>Statistik Bot</b>
@@ -174,7 +175,7 @@ class InfoPlugin(PluginBase):
         Cek latency bot
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/ping", user.id, user.username)
         
         # Hitung latency
@@ -198,9 +199,10 @@ class InfoPlugin(PluginBase):
         await query.answer()
         
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         from bot import bot
+        user_count = await async_db.get_user_count()
         
         info_text = f"""
 ℹ️ <b>Informasi Bot</b>
@@ -211,7 +213,7 @@ class InfoPlugin(PluginBase):
 ⏱️ <b>Uptime:</b> {self.get_uptime()}
 
 📦 <b>Plugin terinstall:</b> {bot.plugin_manager.plugin_count}
-👥 <b>Total pengguna:</b> {db.get_user_count()}
+👥 <b>Total pengguna:</b> {user_count}
 
 <i>Bot modular yang mudah dikembangkan!</i>
 """
@@ -229,7 +231,7 @@ class InfoPlugin(PluginBase):
         await query.answer("🔄 Data diperbarui!")
         
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         await self._show_stats(update, context, is_callback=True)
 
@@ -23,7 +23,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -162,7 +162,7 @@ class PasswordPlugin(PluginBase):
         Format: /password atau /password [length]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Parse length
         length = 12
@@ -203,7 +203,7 @@ class PasswordPlugin(PluginBase):
         Generate memorable passphrase
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/passphrase", user.id, user.username)
         
         # Parse word count
@@ -239,7 +239,7 @@ class PasswordPlugin(PluginBase):
         Generate PIN
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         # Parse length
         length = 4
@@ -19,7 +19,7 @@ from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 
 from core.plugin_base import PluginBase
 from config import PLUGINS_PER_PAGE, BUTTON_BACK, EMOJI_PLUGINS
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class PluginsMenuPlugin(PluginBase):
@@ -102,7 +102,7 @@ class PluginsMenuPlugin(PluginBase):
     async def cmd_plugins(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk command /plugins"""
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/plugins", user.id, user.username)
         await self._show_plugins_list(update, context, page=0, is_callback=False)
     
@@ -195,7 +195,7 @@ class PluginsMenuPlugin(PluginBase):
             text = f"⚠️ Plugin <b>{plugin_id}</b> tidak ditemukan!"
             kb = InlineKeyboardMarkup([[InlineKeyboardButton(BUTTON_BACK, callback_data="plugins_list_0")]])
         else:
-            db.update_plugin_usage(plugin_id)
+            await async_db.update_plugin_usage(plugin_id)
             text = plugin.get_info_text()
             kb = self.create_plugin_detail_keyboard(plugin_id)
         
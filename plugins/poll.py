@@ -17,7 +17,7 @@ from telegram import Update, Poll
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -99,7 +99,7 @@ class PollPlugin(PluginBase):
         Format: /poll [question] | [option1] | [option2] | ...
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -155,7 +155,7 @@ class PollPlugin(PluginBase):
         Format: /quiz [question] | [option1] | [option2] | ... | [correct_answer_number]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -17,12 +17,13 @@ Contoh Penggunaan:
 """
 
 import asyncio
+import time
 from datetime import datetime, timedelta
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 
@@ -52,13 +53,47 @@ class ReminderPlugin(PluginBase):
         super().__init__()
         # Store active reminders per user
         self.active_reminders = {}
+        # Task reminder/timer yang sedang menunggu -> job (kolom scheduled_messages)
+        self._tasks = {}
     
     async def initialize(self):
+        # Lanjutkan reminder/timer yang disimpan saat shutdown sebelumnya
+        restored = await async_db.pop_scheduled_messages()
+        for job in restored:
+            self.schedule_message(job)
+        if restored:
+            logger.info(f"Restored {len(restored)} scheduled reminders/timers")
         logger.info(f"Plugin {self.PLUGIN_NAME} initialized")
     
     async def shutdown(self):
+        # Reminder/timer yang belum terkirim disimpan, lalu task dibatalkan
+        pending = [job for task, job in self._tasks.items() if not task.done()]
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        self.active_reminders.clear()
+        if pending:
+            saved = await async_db.save_scheduled_messages(pending)
+            logger.info(f"Saved {saved} pending reminders/timers")
         logger.info(f"Plugin {self.PLUGIN_NAME} shutdown")
     
+    def schedule_message(self, job: dict) -> asyncio.Task:
+        """
+        Mengirim pesan job pada job["due_at"] (epoch detik) di task
+        terpisah, agar handler selesai langsung dan antrian update chat
+        tidak tertahan. Job yang belum terkirim disimpan saat shutdown.
+        """
+        async def delayed():
+            await asyncio.sleep(max(0.0, job["due_at"] - time.time()))
+            await self.deliver(job)
+        
+        task = asyncio.get_running_loop().create_task(delayed())
+        self._tasks[task] = job
+        task.add_done_callback(lambda done: self._tasks.pop(done, None))
+        if job["kind"] == "reminder":
+            self.active_reminders.setdefault(job["user_id"], []).append(job)
+        return task
+    
     def parse_time(self, time_str: str) -> int:
         """Parse time string ke detik"""
         time_str = time_str.lower().strip()
@@ -76,23 +111,27 @@ class ReminderPlugin(PluginBase):
             # Assume seconds if no unit
             return int(time_str)
     
-    async def send_reminder(self, chat_id: int, message: str, user_id: int):
-        """Kirim reminder ke user"""
+    async def deliver(self, job: dict):
+        """Kirim pesan reminder/timer ke chat"""
         from bot import bot
+        text = job["text"]
+        if job["kind"] == "reminder":
+            text = f"⏰ <b>Reminder!</b>\n\n{text}"
         try:
             await bot.application.bot.send_message(
-                chat_id=chat_id,
-                text=f"⏰ <b>Reminder!</b>\n\n{message}",
-                parse_mode="HTML"
+                chat_id=job["chat_id"],
+                text=text,
+                parse_mode=job["parse_mode"],
+                reply_to_message_id=job["reply_to_message_id"],
+                allow_sending_without_reply=True
             )
-            # Remove from active reminders
-            if user_id in self.active_reminders:
-                self.active_reminders[user_id] = [
-                    r for r in self.active_reminders[user_id] 
-                    if r['message'] != message
-                ]
         except Exception as e:
-            logger.error(f"Failed to send reminder: {e}")
+            logger.error(f"Failed to send {job['kind']}: {e}")
+        finally:
+            # Remove from active reminders
+            reminders = self.active_reminders.get(job["user_id"])
+            if reminders and job in reminders:
+                reminders.remove(job)
     
     async def cmd_remind(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -100,7 +139,7 @@ class ReminderPlugin(PluginBase):
         Format: /remind [time] [message]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if len(context.args) < 2:
             await update.message.reply_text(
@@ -145,16 +184,6 @@ class ReminderPlugin(PluginBase):
             # Calculate reminder time
             remind_at = datetime.now() + timedelta(seconds=seconds)
             
-            # Store reminder
-            if user.id not in self.active_reminders:
-                self.active_reminders[user.id] = []
-            
-            self.active_reminders[user.id].append({
-                'message': message,
-                'time': remind_at,
-                'seconds': seconds
-            })
-            
             # Format time display
             if seconds < 60:
                 time_display = f"{seconds} detik"
@@ -173,9 +202,16 @@ class ReminderPlugin(PluginBase):
                 parse_mode="HTML"
             )
             
-            # Schedule reminder
-            await asyncio.sleep(seconds)
-            await self.send_reminder(update.effective_chat.id, message, user.id)
+            # Schedule reminder (juga dicatat di active_reminders)
+            self.schedule_message({
+                "kind": "reminder",
+                "chat_id": update.effective_chat.id,
+                "user_id": user.id,
+                "text": message,
+                "parse_mode": "HTML",
+                "reply_to_message_id": None,
+                "due_at": int(remind_at.timestamp())
+            })
             
         except ValueError:
             await update.message.reply_text(
@@ -195,7 +231,7 @@ class ReminderPlugin(PluginBase):
         Format: /timer [seconds]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not context.args:
             await update.message.reply_text(
@@ -227,15 +263,17 @@ class ReminderPlugin(PluginBase):
                 parse_mode="HTML"
             )
             
-            # Wait for timer
-            await asyncio.sleep(seconds)
-            
-            # Send notification
-            await update.message.reply_text(
-                f"⏰ <b>Timer Selesai!</b>\n\n"
-                f"Timer {seconds} detik telah berakhir! ⏱️",
-                parse_mode="HTML"
-            )
+            # Kirim notifikasi saat timer selesai
+            self.schedule_message({
+                "kind": "timer",
+                "chat_id": update.effective_chat.id,
+                "user_id": user.id,
+                "text": f"⏰ <b>Timer Selesai!</b>\n\n"
+                        f"Timer {seconds} detik telah berakhir! ⏱️",
+                "parse_mode": "HTML",
+                "reply_to_message_id": update.message.message_id,
+                "due_at": int(time.time()) + seconds
+            })
             
         except ValueError:
             await update.message.reply_text(
@@ -249,7 +287,7 @@ class ReminderPlugin(PluginBase):
         Lihat daftar reminder aktif
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/reminders", user.id, user.username)
         
         if user.id not in self.active_reminders or not self.active_reminders[user.id]:
@@ -264,7 +302,8 @@ class ReminderPlugin(PluginBase):
         text = "📋 <b>Reminder Aktif</b>\n\n"
         
         for i, reminder in enumerate(self.active_reminders[user.id], 1):
-            time_left = (reminder['time'] - datetime.now()).total_seconds()
+            remind_at = datetime.fromtimestamp(reminder['due_at'])
+            time_left = (remind_at - datetime.now()).total_seconds()
             if time_left > 0:
                 if time_left < 60:
                     time_str = f"{int(time_left)}s"
@@ -275,8 +314,8 @@ class ReminderPlugin(PluginBase):
                 else:
                     time_str = f"{int(time_left // 86400)}d"
                 
-                text += f"{i}. <b>{reminder['message']}</b>\n"
-                text += f"   ⏰ {time_str} lagi ({reminder['time'].strftime('%H:%M')})\n\n"
+                text += f"{i}. <b>{reminder['text']}</b>\n"
+                text += f"   ⏰ {time_str} lagi ({remind_at.strftime('%H:%M')})\n\n"
         
         await update.message.reply_text(text, parse_mode="HTML")
 
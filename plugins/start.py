@@ -23,7 +23,7 @@ from config import (
     BOT_NAME, BOT_VERSION, WELCOME_MESSAGE, 
     BUTTON_PLUGINS, BUTTON_HELP, BUTTON_INFO, BUTTON_BACK
 )
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 class StartPlugin(PluginBase):
@@ -121,7 +121,7 @@ class StartPlugin(PluginBase):
         user = update.effective_user
         
         # Simpan/update user ke database
-        db.add_user(
+        await async_db.add_user(
             user_id=user.id,
             username=user.username,
             first_name=user.first_name,
@@ -130,7 +130,7 @@ class StartPlugin(PluginBase):
             is_bot=user.is_bot
         )
         
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/start", user.id, user.username)
         
         from bot import bot
@@ -150,7 +150,7 @@ class StartPlugin(PluginBase):
         Menampilkan menu utama
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         logger.command_used("/menu", user.id, user.username)
         
         from bot import bot
@@ -175,7 +175,7 @@ class StartPlugin(PluginBase):
         await query.answer()
         
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         from bot import bot
         plugin_count = bot.plugin_manager.plugin_count
@@ -23,7 +23,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.plugin_base import PluginBase
-from utils.database import db
+from utils.async_database import async_db
 from utils.logger import logger
 
 # Try to import googletrans (free library)
@@ -114,7 +114,7 @@ class TranslatePlugin(PluginBase):
         Format: /translate [lang_code] [text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not HAS_TRANSLATOR:
             await update.message.reply_text(
@@ -219,7 +219,7 @@ class TranslatePlugin(PluginBase):
         Format: /detect [text]
         """
         user = update.effective_user
-        db.update_user_activity(user.id)
+        await async_db.update_user_activity(user.id)
         
         if not HAS_TRANSLATOR:
             await update.message.reply_text(
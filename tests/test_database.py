@@ -0,0 +1,96 @@
+"""
+========================================
+Modular Telegram Bot - Database Tests
+========================================
+Nama: Database Tests
+Deskripsi: Regression test Database SQLite: rollup statistik (import
+           ulang idempoten, user aktif sekali per tanggal) dan cache user
+Usage: pytest tests/
+========================================
+"""
+
+from datetime import date, timedelta
+
+from utils.database import Database
+
+
+def test_stats_reimport_does_not_double_count(tmp_path):
+    db = Database(str(tmp_path / "bot.db"))
+    today = date.today().isoformat()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    rows = [
+        (yesterday, "start", 1, 2),
+        (today, "start", 1, 3),
+        (today, "qr", 2, 4),
+    ]
+
+    # chunk_size=2: tanggal hari ini tersebar di dua chunk
+    db.import_rows("stats", rows, chunk_size=2)
+    first = db.get_stats(days=7)
+    db.import_rows("stats", rows, chunk_size=2)
+    second = db.get_stats(days=7)
+
+    assert first == second
+    assert second["total_commands"] == 9
+    assert second["active_users"] == 2
+    assert {row["date"]: row["active_users"] for row in second["daily_active_users"]} == {
+        yesterday: 1, today: 2
+    }
+
+
+def test_user_active_on_two_dates_in_one_batch_counts_for_both(tmp_path):
+    db = Database(str(tmp_path / "bot.db"))
+    today = date.today().isoformat()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    # Batch yang melewati tengah malam UTC, lalu event terlambat untuk kemarin
+    db.apply_write_batch({}, {(yesterday, "start", 1): 1, (today, "start", 1): 1})
+    db.apply_write_batch({}, {(yesterday, "qr", 1): 1, (yesterday, "qr", 2): 1})
+
+    stats = db.get_stats(days=7)
+    assert {row["date"]: row["active_users"] for row in stats["daily_active_users"]} == {
+        yesterday: 2, today: 1
+    }
+    assert stats["active_users"] == 2
+
+
+def test_activity_writes_invalidate_cached_user(tmp_path):
+    db = Database(str(tmp_path / "bot.db"))
+    db.add_user(5, username="budi")
+    assert db.get_user(5)["message_count"] == 0
+
+    db.update_user_activity(5)
+    assert db.get_user(5)["message_count"] == 1
+
+    db.apply_write_batch({5: (3, "2024-01-02T03:04:05")}, {})
+    user = db.get_user(5)
+    assert user["message_count"] == 4
+    assert user["last_activity"] == "2024-01-02T03:04:05"
+
+
+def test_import_after_prune_keeps_preserved_rollups(tmp_path):
+    db = Database(str(tmp_path / "bot.db"))
+    old = (date.today() - timedelta(days=20)).isoformat()
+    recent = (date.today() - timedelta(days=2)).isoformat()
+    rows = [
+        (old, "start", 1, 5),
+        (old, "qr", 2, 1),
+        (recent, "start", 1, 2),
+    ]
+    db.import_rows("stats", rows)
+
+    # Retensi: baris mentah lama dihapus, rollup-nya tetap
+    cutoff = (date.today() - timedelta(days=10)).isoformat()
+    while db.prune_stats(cutoff):
+        pass
+    before = db.get_stats(days=30)
+
+    # File yang hanya berisi sebagian baris tanggal lama
+    db.import_rows("stats", [(old, "qr", 2, 1), (recent, "start", 1, 2)])
+    after = db.get_stats(days=30)
+
+    assert after == before
+    assert after["total_commands"] == 8
+    assert {row["date"]: row["active_users"] for row in after["daily_active_users"]} == {
+        old: 2, recent: 1
+    }
@@ -0,0 +1,53 @@
+"""
+========================================
+Modular Telegram Bot - Inbound Rate Limiter Tests
+========================================
+Nama: Inbound Rate Limiter Tests
+Deskripsi: Regression test keputusan rate limit masuk yang sinkron
+           (pemberitahuan tidak menahan dispatch)
+Usage: pytest tests/
+========================================
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from telegram import Chat, Message, Update, User
+
+from core.inbound_limiter import InboundRateLimiter
+
+
+def _update(update_id: int, user_id: int) -> Update:
+    chat = Chat(user_id, Chat.PRIVATE)
+    user = User(user_id, "user", False)
+    return Update(update_id, message=Message(update_id, datetime.now(), chat,
+                                             from_user=user, text="/qr"))
+
+
+def test_rejection_notice_is_sent_in_background():
+    async def main():
+        sent = []
+        never = asyncio.Event()
+
+        async def send_message(chat_id, text):
+            sent.append((chat_id, text))
+            await never.wait()
+
+        limiter = InboundRateLimiter(user_limit=(1, 60), message="Tunggu {seconds} detik")
+        limiter.bind(SimpleNamespace(bot=SimpleNamespace(send_message=send_message)))
+        results = [limiter.admit(_update(i, 7)) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        return results, sent, limiter.get_metrics()
+
+    results, sent, metrics = asyncio.run(main())
+    assert results == [True, False, False]
+    # Hanya satu pemberitahuan per periode tertolak
+    assert sent == [(7, "Tunggu 60 detik")]
+    assert metrics["rejected"] == 2
+    assert metrics["rejected_by_scope"] == {"user": 2}
+
+
+def test_rejected_is_zero_without_rejections():
+    limiter = InboundRateLimiter(user_limit=(5, 60))
+    assert limiter.get_metrics()["rejected"] == 0
@@ -0,0 +1,65 @@
+"""
+========================================
+Modular Telegram Bot - Migration Tests
+========================================
+Nama: Migration Tests
+Deskripsi: Regression test migrasi skema SQLite
+Usage: pytest tests/
+========================================
+"""
+
+import sqlite3
+
+from utils.migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version, run_migrations
+
+
+def _v3_database() -> sqlite3.Connection:
+    """Database di skema v3 (sebelum kolom epoch)"""
+    conn = sqlite3.connect(":memory:")
+    run_migrations(conn, migrations=[m for m in MIGRATIONS if m.version <= 3])
+    return conn
+
+
+def test_v4_backfill_skips_null_and_unparseable_dates():
+    conn = _v3_database()
+    conn.executemany(
+        "INSERT INTO users (user_id, joined_date, last_activity) VALUES (?, ?, ?)",
+        [
+            (1, "2024-01-02 03:04:05", "2024-01-03 00:00:00"),
+            (2, None, None),
+            (3, "bukan tanggal", "2024-01-03 00:00:00"),
+            (4, "2024-02-01 00:00:00", None),
+        ]
+    )
+    conn.commit()
+
+    # chunk_size=1: setiap baris jadi chunk sendiri, termasuk baris yang gagal
+    report = run_migrations(conn, chunk_size=1)
+
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert report.to_version == SCHEMA_VERSION
+    joined = dict(conn.execute("SELECT user_id, joined_at FROM users"))
+    assert joined[1] == 1704164645
+    assert joined[2] is None
+    assert joined[3] is None
+    assert joined[4] == 1706745600
+
+
+def test_v7_backfill_counts_every_active_day():
+    conn = sqlite3.connect(":memory:")
+    run_migrations(conn, migrations=[m for m in MIGRATIONS if m.version <= 6])
+    conn.executemany(
+        "INSERT INTO stats (date, command, user_id, count) VALUES (?, ?, ?, ?)",
+        [("2024-01-01", "start", 1, 1), ("2024-01-02", "start", 1, 1),
+         ("2024-01-02", "qr", 2, 1)]
+    )
+    # Rollup lama: user 1 hanya terhitung di tanggal terakhirnya
+    conn.executemany("INSERT INTO stats_daily_users (date, active_users) VALUES (?, ?)",
+                     [("2024-01-02", 2), ("2023-12-01", 5)])
+    conn.commit()
+
+    run_migrations(conn, chunk_size=100)
+
+    assert dict(conn.execute("SELECT date, active_users FROM stats_daily_users")) == {
+        "2023-12-01": 5, "2024-01-01": 1, "2024-01-02": 2
+    }
@@ -0,0 +1,78 @@
+"""
+========================================
+Modular Telegram Bot - Update Processor Tests
+========================================
+Nama: Update Processor Tests
+Deskripsi: Regression test urutan per chat saat admission control
+           menunda atau membuang update
+Usage: pytest tests/
+========================================
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from telegram import Chat, Message, Update
+
+from core.admission import AdmissionController
+from core.update_processor import ChatOrderedUpdateProcessor
+
+
+def _update(update_id: int, chat_id: int) -> Update:
+    chat = Chat(chat_id, Chat.PRIVATE)
+    return Update(update_id, message=Message(update_id, datetime.now(), chat, text="/fun"))
+
+
+class _DeferFirst:
+    """Admission palsu: update pertama ditunda sebentar, sisanya langsung diterima"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def admit(self, update) -> bool:
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(0.05)
+        return True
+
+
+def test_deferred_update_is_not_overtaken_by_same_chat():
+    async def main():
+        processor = ChatOrderedUpdateProcessor(max_concurrent=8)
+        processor.admission = _DeferFirst()
+        order = []
+
+        async def handler(update_id):
+            order.append(update_id)
+
+        await asyncio.gather(*(
+            processor.process_update(_update(i, 42), handler(i)) for i in range(1, 4)
+        ))
+        return order
+
+    assert asyncio.run(main()) == [1, 2, 3]
+
+
+def test_busy_reply_does_not_block_admission():
+    async def main():
+        sent = asyncio.Event()
+        never = asyncio.Event()
+
+        async def send_message(chat_id, text):
+            sent.set()
+            await never.wait()
+
+        processor = ChatOrderedUpdateProcessor()
+        admission = AdmissionController(processor, low_depth=1, busy_message="sibuk")
+        admission.bind(SimpleNamespace(bot=SimpleNamespace(send_message=send_message)))
+        admission.level = lambda: 2
+        admission.categorize = lambda update: "fun"
+
+        admitted = await asyncio.wait_for(admission.admit(_update(1, 42)), timeout=1)
+        await asyncio.wait_for(sent.wait(), timeout=1)
+        return admitted, admission.shed
+
+    admitted, shed = asyncio.run(main())
+    assert admitted is False
+    assert shed == {"fun": 1}
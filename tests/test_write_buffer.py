@@ -0,0 +1,74 @@
+"""
+========================================
+Modular Telegram Bot - Write Buffer Tests
+========================================
+Nama: Write Buffer Tests
+Deskripsi: Regression test event write buffer tidak hilang saat stop()
+           di tengah flush atau saat flush gagal
+Usage: pytest tests/
+========================================
+"""
+
+import asyncio
+
+import pytest
+
+from utils.write_buffer import WriteBuffer
+
+
+class _SlowStore:
+    """flush_func palsu yang lambat dan menjumlahkan event yang tertulis"""
+
+    def __init__(self, delay: float = 0.1, fail_first: bool = False):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.activity = 0
+        self.commands = 0
+        self.started = asyncio.Event()
+
+    async def flush(self, activity, commands) -> bool:
+        self.started.set()
+        await asyncio.sleep(self.delay)
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("database is locked")
+        self.activity += sum(count for count, _ in activity.values())
+        self.commands += sum(commands.values())
+        return True
+
+
+def test_stop_during_slow_flush_loses_no_events():
+    async def main():
+        store = _SlowStore()
+        buffer = WriteBuffer(store.flush, interval_ms=10_000, max_events=4)
+        buffer.start()
+        for user_id in range(4):
+            buffer.add_activity(user_id)
+        await store.started.wait()
+        # Flush periodik sedang berjalan; event baru lalu stop()
+        buffer.add_command("start", 1)
+        buffer.add_activity(1)
+        await buffer.stop()
+        return store, buffer
+
+    store, buffer = asyncio.run(main())
+    assert store.activity == 5
+    assert store.commands == 1
+    assert buffer.pending_events == 0
+
+
+def test_failed_flush_keeps_events():
+    async def main():
+        store = _SlowStore(delay=0, fail_first=True)
+        buffer = WriteBuffer(store.flush)
+        buffer.add_command("qr", 7)
+        buffer.add_command("qr", 7)
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        pending = buffer.pending_events
+        await buffer.flush()
+        return store, pending
+
+    store, pending = asyncio.run(main())
+    assert pending == 2
+    assert store.commands == 2
@@ -7,7 +7,12 @@ Deskripsi: Package untuk utility functions
 ========================================
 """
 
-from utils.database import db, Database
+from utils.database import db, Database, create_backend
+from utils.storage import StorageBackend, MemoryBackend, DbmBackend
+from utils.async_database import async_db, AsyncDatabase
 from utils.logger import logger, BotLogger
 
-__all__ = ['db', 'Database', 'logger', 'BotLogger']
+__all__ = [
+    'db', 'Database', 'create_backend', 'StorageBackend', 'MemoryBackend', 'DbmBackend',
+    'async_db', 'AsyncDatabase', 'logger', 'BotLogger'
+]
@@ -0,0 +1,217 @@
+"""
+========================================
+Modular Telegram Bot - Async Database
+========================================
+Nama: AsyncDatabase
+Deskripsi: Facade awaitable untuk Database agar handler tidak
+           memblokir event loop saat mengakses SQLite
+Command: -
+Usage: from utils.async_database import async_db
+       await async_db.update_user_activity(user.id)
+========================================
+"""
+
+import asyncio
+import functools
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, Tuple, AsyncIterator
+
+from config import (
+    DATABASE_READER_THREADS, DATABASE_BUSY_RETRIES,
+    WRITE_BUFFER_INTERVAL_MS, WRITE_BUFFER_MAX_EVENTS
+)
+from utils.database import db, is_busy_error
+from utils.storage import StorageBackend, UserRow
+from utils.write_buffer import WriteBuffer
+
+class AsyncDatabase:
+    """
+    Facade async untuk storage backend (Database/SQLite secara default).
+
+    Semua write dijalankan di satu thread writer khusus (urutan write
+    terjaga), sedangkan read dijalankan di pool thread reader kecil.
+    Error SQLITE_BUSY di-retry dengan exponential backoff.
+
+    Setelah start(), update_user_activity dan log_command masuk ke
+    write buffer dan ditulis per batch (write-behind).
+    """
+
+    def __init__(self, database: StorageBackend, reader_threads: int = 4,
+                 max_retries: int = 5, retry_delay: float = 0.05,
+                 buffer_interval_ms: int = 1000, buffer_max_events: int = 500):
+        self.database = database
+        self.reader_threads = reader_threads
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self.buffer = WriteBuffer(self._flush_batch, buffer_interval_ms, buffer_max_events)
+
+    def _get_writer(self) -> ThreadPoolExecutor:
+        """Executor satu thread untuk semua write"""
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        return self._writer
+
+    def _get_readers(self) -> ThreadPoolExecutor:
+        """Executor pool untuk read"""
+        if self._readers is None:
+            self._readers = ThreadPoolExecutor(
+                max_workers=self.reader_threads, thread_name_prefix="db-reader"
+            )
+        return self._readers
+
+    def _call(self, func: Callable, args: tuple, kwargs: dict, raise_busy: bool) -> Any:
+        """Menjalankan func di thread executor"""
+        if not raise_busy:
+            return func(*args, **kwargs)
+        with self.database.propagate_busy():
+            return func(*args, **kwargs)
+
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        """Menjalankan func di executor dengan retry saat SQLITE_BUSY"""
+        loop = asyncio.get_running_loop()
+        delay = self.retry_delay
+
+        for attempt in range(self.max_retries + 1):
+            # Percobaan terakhir memakai perilaku sync biasa (error ditelan)
+            raise_busy = attempt < self.max_retries
+            call = functools.partial(self._call, func, args, kwargs, raise_busy)
+            try:
+                return await loop.run_in_executor(executor, call)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def run_write(self, func: Callable, *args, **kwargs) -> Any:
+        """Menjalankan fungsi write custom di thread writer"""
+        return await self._run(self._get_writer(), func, *args, **kwargs)
+
+    async def run_read(self, func: Callable, *args, **kwargs) -> Any:
+        """Menjalankan fungsi read custom di pool reader"""
+        return await self._run(self._get_readers(), func, *args, **kwargs)
+
+    async def _flush_batch(self, activity: Dict[int, Tuple[int, str]],
+                           commands: Dict[Tuple[str, str, int], int]) -> bool:
+        """Menulis satu batch dari write buffer"""
+        return await self.run_write(self.database.apply_write_batch, activity, commands)
+
+    def start(self):
+        """Mengaktifkan write buffer (dipanggil dari dalam event loop)"""
+        self.buffer.start()
+
+    async def flush(self) -> int:
+        """Memaksa flush write buffer"""
+        return await self.buffer.flush()
+
+    async def stop(self):
+        """Menghentikan write buffer dan menulis semua event tertunda"""
+        await self.buffer.stop()
+
+    def close(self):
+        """Menunggu semua operasi selesai lalu menghentikan thread"""
+        for executor in (self._writer, self._readers):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._writer = None
+        self._readers = None
+
+    # User Methods
+    async def add_user(self, user_id: int, username: Optional[str] = None,
+                       first_name: Optional[str] = None, last_name: Optional[str] = None,
+                       language_code: Optional[str] = None, is_bot: bool = False) -> bool:
+        """Menambahkan atau update user"""
+        return await self.run_write(
+            self.database.add_user, user_id, username, first_name,
+            last_name, language_code, is_bot
+        )
+
+    async def update_user_activity(self, user_id: int):
+        """Update aktivitas terakhir user (di-buffer jika write buffer aktif)"""
+        if self.buffer.running:
+            self.buffer.add_activity(user_id)
+            return
+        await self.run_write(self.database.update_user_activity, user_id)
+
+    async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan data user"""
+        return await self.run_read(self.database.get_user, user_id)
+
+    async def get_all_users(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Mendapatkan semua user"""
+        return await self.run_read(self.database.get_all_users, limit, offset)
+
+    async def iter_users(self, batch_size: int = 500,
+                         filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[UserRow]:
+        """
+        Async generator semua user dengan keyset pagination.
+        Hanya satu batch yang ada di memory pada satu waktu.
+        """
+        after = None
+        while True:
+            rows = await self.run_read(self.database.get_users_page, batch_size, after, filters)
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1].joined_date, rows[-1].user_id)
+
+    async def get_user_count(self) -> int:
+        """Mendapatkan jumlah user"""
+        return await self.run_read(self.database.get_user_count)
+
+    # Stats Methods
+    async def log_command(self, command: str, user_id: int):
+        """Mencatat penggunaan command (di-buffer jika write buffer aktif)"""
+        if self.buffer.running:
+            self.buffer.add_command(command, user_id)
+            return
+        await self.run_write(self.database.log_command, command, user_id)
+
+    async def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        """Mendapatkan statistik penggunaan"""
+        return await self.run_read(self.database.get_stats, days)
+
+    # Scheduled Message Methods
+    async def save_scheduled_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Menyimpan pesan terjadwal yang belum terkirim"""
+        return await self.run_write(self.database.save_scheduled_messages, messages)
+
+    async def pop_scheduled_messages(self) -> List[Dict[str, Any]]:
+        """Mengambil lalu menghapus semua pesan terjadwal"""
+        return await self.run_write(self.database.pop_scheduled_messages)
+
+    # Plugin Methods
+    async def register_plugin(self, name: str, description: str = "",
+                              version: str = "1.0", author: str = "Unknown") -> bool:
+        """Mendaftarkan plugin ke database"""
+        return await self.run_write(self.database.register_plugin, name, description, version, author)
+
+    async def update_plugin_usage(self, name: str):
+        """Update penggunaan plugin"""
+        await self.run_write(self.database.update_plugin_usage, name)
+
+    async def get_plugin_stats(self) -> List[Dict[str, Any]]:
+        """Mendapatkan statistik plugin"""
+        return await self.run_read(self.database.get_plugin_stats)
+
+    # Settings Methods
+    async def set_setting(self, key: str, value: str):
+        """Menyimpan setting"""
+        await self.run_write(self.database.set_setting, key, value)
+
+    async def get_setting(self, key: str, default: Any = None) -> Any:
+        """Mendapatkan setting (dari snapshot in-memory, tanpa thread)"""
+        return self.database.get_setting(key, default)
+
+# Singleton instance (berbagi pool koneksi dengan db)
+async_db = AsyncDatabase(
+    db,
+    reader_threads=DATABASE_READER_THREADS,
+    max_retries=DATABASE_BUSY_RETRIES,
+    buffer_interval_ms=WRITE_BUFFER_INTERVAL_MS,
+    buffer_max_events=WRITE_BUFFER_MAX_EVENTS
+)
@@ -0,0 +1,79 @@
+"""
+========================================
+Modular Telegram Bot - Cache
+========================================
+Nama: TTLCache
+Deskripsi: Cache LRU in-process dengan batas ukuran dan TTL
+Command: -
+Usage: cache = TTLCache(maxsize=1000, ttl=300)
+========================================
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    Cache LRU thread-safe dengan TTL per entry.
+
+    Entry tertua dibuang saat ukuran melebihi `maxsize`, dan entry yang
+    umurnya lebih dari `ttl` detik dianggap miss.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Mendapatkan value (default jika tidak ada atau kedaluwarsa)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Menyimpan value dan membuang entry LRU jika penuh"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Menghapus satu entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Menghapus semua entry"""
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistik cache (ukuran, hit, miss, hit rate)"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
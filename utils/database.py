@@ -3,7 +3,7 @@
 Modular Telegram Bot - Database Handler
 ========================================
 Nama: Database
-Deskripsi: Handler untuk database SQLite
+Deskripsi: Handler untuk database SQLite (backend storage default)
 Command: -
 Usage: Import dari file lain
 ========================================
@@ -11,17 +11,85 @@ Usage: Import dari file lain
 
 import sqlite3
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from itertools import islice
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator, Sequence
 from contextlib import contextmanager
 
-class Database:
-    """Class untuk mengelola database SQLite"""
+from config import (
+    DATABASE_URL, DATABASE_BUSY_TIMEOUT, DATABASE_CACHED_STATEMENTS,
+    USER_CACHE_SIZE, USER_CACHE_TTL, SLOW_QUERY_MS
+)
+from utils.cache import TTLCache
+from utils.metrics import QueryMetrics, instrumented
+from utils.migrations import MigrationReport, run_migrations
+from utils.storage import (
+    StorageBackend, MemoryBackend, DbmBackend, UserRow,
+    USER_FILTER_COLUMNS, EXPORT_COLUMNS, SCHEDULED_MESSAGE_COLUMNS,
+    parse_database_url, utc_today
+)
+
+def is_busy_error(error: Exception) -> bool:
+    """Cek apakah error adalah SQLITE_BUSY / SQLITE_LOCKED"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def is_write_failure(error: Exception) -> bool:
+    """Cek apakah error berarti database tidak bisa ditulis (bukan sekadar sibuk)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in ("readonly", "disk is full", "disk i/o", "unable to open"))
+
+# Filter yang didukung oleh get_users_page/iter_users: nama -> kondisi SQL
+USER_FILTERS = {
+    name: f"{column} >= ?" if name == "active_since" else f"{column} = ?"
+    for name, column in USER_FILTER_COLUMNS.items()
+}
+
+class Database(StorageBackend):
+    """
+    Class untuk mengelola database SQLite.
+    
+    Koneksi dibuka sekali dan dipakai ulang: satu koneksi writer
+    (dijaga lock) dan satu koneksi reader per thread. Semua koneksi
+    memakai WAL sehingga reader tidak memblokir writer.
+    """
     
-    def __init__(self, db_path: str = "data/bot_database.db"):
+    # Setting: baris stats dengan tanggal < nilai ini sudah di-prune (rollup tetap)
+    PRUNED_BEFORE_KEY = "stats_pruned_before"
+    
+    def __init__(self, db_path: str = "data/bot_database.db",
+                 busy_timeout: int = 5000, cached_statements: int = 256,
+                 user_cache_size: int = 10000, user_cache_ttl: float = 300,
+                 slow_query_ms: float = 100):
+        # Dibuat sebelum super().__init__() karena reload_settings ikut diukur
+        self.metrics = QueryMetrics(slow_query_ms)
+        super().__init__()
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        
+        # Cache hash profil (untuk skip upsert) dan baris user (untuk get_user)
+        self._profile_cache = TTLCache(user_cache_size, user_cache_ttl)
+        self._user_cache = TTLCache(user_cache_size, user_cache_ttl)
+        self._upserts_skipped = 0
+        self._upserts_written = 0
+        
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.migration_report: Optional[MigrationReport] = None
+        
         self._ensure_directory()
         self._init_tables()
+        self.reload_settings()
     
     def _ensure_directory(self):
         """Memastikan direktori database ada"""
@@ -29,135 +97,524 @@ class Database:
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
     
+    @property
+    def is_memory(self) -> bool:
+        """True jika database berada di memory (tidak bisa dibagi antar koneksi)"""
+        return self.db_path == ":memory:" or self.db_path.startswith("file::memory:")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Membuka koneksi baru dengan PRAGMA performa"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            uri=self.db_path.startswith("file:")
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        # Hanya berlaku untuk database baru; harus sebelum mode WAL aktif
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if not self.is_memory:
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        """Mendapatkan koneksi writer (dibuat saat pertama dipakai)"""
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+    
+    def _get_reader(self) -> sqlite3.Connection:
+        """Mendapatkan koneksi reader milik thread saat ini"""
+        # Database in-memory hanya terlihat dari satu koneksi
+        if self.is_memory:
+            return self._get_writer()
+        
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
     @contextmanager
     def _get_connection(self):
-        """Context manager untuk koneksi database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Context manager untuk koneksi writer (commit/rollback otomatis)"""
+        start = time.perf_counter()
+        with self._write_lock:
+            self.metrics.record_lock_wait((time.perf_counter() - start) * 1000)
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                if is_write_failure(e):
+                    self.writable = False
+                raise e
+            self.writable = True
+    
+    @contextmanager
+    def _get_read_connection(self):
+        """Context manager untuk koneksi reader (tanpa write lock)"""
+        if self.is_memory:
+            with self._write_lock:
+                yield self._get_writer()
+            return
+        yield self._get_reader()
+    
+    @contextmanager
+    def propagate_busy(self):
+        """
+        Context manager agar error SQLITE_BUSY di thread ini di-raise
+        (bukan ditelan), sehingga pemanggil bisa retry dengan backoff.
+        """
+        previous = getattr(self._local, "raise_busy", False)
+        self._local.raise_busy = True
         try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
+            yield
         finally:
-            conn.close()
+            self._local.raise_busy = previous
+    
+    def _raise_if_busy(self, error: Exception):
+        """
+        Raise ulang error busy jika thread ini meminta propagate_busy.
+        Dipanggil di setiap blok except, sekaligus mencatat metrik error.
+        """
+        busy = is_busy_error(error)
+        if busy:
+            self.metrics.record_busy()
+            if getattr(self._local, "raise_busy", False):
+                raise error
+        self.metrics.record_error()
+    
+    def check_health(self, quick_check: bool = False) -> bool:
+        """
+        Readiness check di koneksi reader (tidak mengambil write lock):
+        SELECT 1, opsional PRAGMA quick_check, dan status write terakhir
+        (`writable` diperbarui oleh write sungguhan, bukan oleh probe).
+        """
+        try:
+            with self._get_read_connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+                if quick_check:
+                    result = conn.execute("PRAGMA quick_check").fetchone()[0]
+                    if result != "ok":
+                        print(f"Database quick_check failed: {result}")
+                        return False
+        except Exception as e:
+            print(f"Database not readable: {e}")
+            return False
+        if self.writable is False:
+            print("Database not writable: last write failed")
+            return False
+        return True
+    
+    def get_query_metrics(self) -> Dict[str, Any]:
+        """Metrik per method: durasi, baris, busy, lock wait dan slow query"""
+        return self.metrics.snapshot()
+    
+    def close(self):
+        """Menutup semua koneksi yang dibuka pool"""
+        with self._readers_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._readers = []
+        self._local = threading.local()
+        
+        with self._write_lock:
+            if self._writer is not None:
+                try:
+                    self._writer.execute("PRAGMA optimize")
+                    self._writer.close()
+                except sqlite3.Error:
+                    pass
+                self._writer = None
     
     def _init_tables(self):
-        """Inisialisasi tabel-tabel database"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Tabel Users
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    first_name TEXT,
-                    last_name TEXT,
-                    language_code TEXT,
-                    is_bot INTEGER DEFAULT 0,
-                    joined_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                    last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
-                    message_count INTEGER DEFAULT 0,
-                    is_banned INTEGER DEFAULT 0
-                )
-            """)
-            
-            # Tabel Chats
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chats (
-                    chat_id INTEGER PRIMARY KEY,
-                    chat_type TEXT,
-                    chat_title TEXT,
-                    joined_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                    last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
-                    message_count INTEGER DEFAULT 0
-                )
-            """)
-            
-            # Tabel Stats
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT DEFAULT CURRENT_DATE,
-                    command TEXT,
-                    user_id INTEGER,
-                    count INTEGER DEFAULT 1,
-                    UNIQUE(date, command, user_id)
-                )
-            """)
+        """Inisialisasi tabel-tabel database lewat migrasi berversi"""
+        with self._write_lock:
+            self.migration_report = run_migrations(self._get_writer())
+    
+    # Maintenance Methods
+    @instrumented
+    def backup(self, dest_path: str, pages: int = 256, sleep: float = 0.05) -> Dict[str, Any]:
+        """
+        Backup online memakai sqlite3 backup API.
+        
+        Disalin `pages` halaman per langkah dengan jeda `sleep` detik di
+        antara langkah, sehingga writer tidak pernah tertahan lama.
+        File ditulis ke `<dest>.part` lalu di-rename agar tidak ada
+        backup setengah jadi.
+        
+        Returns:
+            dict berisi path, size (bytes), duration_ms dan steps
+        """
+        directory = os.path.dirname(dest_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        temp_path = f"{dest_path}.part"
+        steps = 0
+        
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+        
+        start = time.perf_counter()
+        dest = sqlite3.connect(temp_path)
+        try:
+            if self.is_memory:
+                with self._write_lock:
+                    self._get_writer().backup(dest, pages=pages, progress=progress, sleep=sleep)
+            else:
+                # Koneksi terpisah agar pool reader/writer tidak ikut tertahan
+                source = self._connect()
+                try:
+                    source.backup(dest, pages=pages, progress=progress, sleep=sleep)
+                finally:
+                    source.close()
+        finally:
+            dest.close()
+        os.replace(temp_path, dest_path)
+        
+        return {
+            "path": dest_path,
+            "size": os.path.getsize(dest_path),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "steps": steps
+        }
+    
+    @instrumented
+    def prune_stats(self, before: str, limit: int = 1000) -> int:
+        """
+        Menghapus satu chunk baris stats per user dengan tanggal < `before`.
+        
+        Agregat per hari per command sudah ada di stats_daily (ditulis di
+        transaksi yang sama dengan baris stats), jadi baris lama cukup
+        dihapus, begitu juga pasangan (tanggal, user) yang sudah dihitung
+        di stats_daily_users. Satu chunk = satu transaksi pendek agar
+        write lain tetap bisa berjalan di antara chunk.
+        
+        Returns:
+            Jumlah baris yang dihapus
+        """
+        try:
+            # Dicatat sebelum menghapus: import tidak boleh menyentuh rollup
+            # tanggal yang baris mentahnya (sebagian) sudah hilang
+            if before > (self.get_setting(self.PRUNED_BEFORE_KEY) or ""):
+                self.set_setting(self.PRUNED_BEFORE_KEY, before)
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    DELETE FROM stats WHERE id IN (
+                        SELECT id FROM stats WHERE date < ? LIMIT ?
+                    )
+                """, (before, int(limit)))
+                deleted = cursor.rowcount
+                cursor = conn.execute("""
+                    DELETE FROM stats_daily_user_seen WHERE (date, user_id) IN (
+                        SELECT date, user_id FROM stats_daily_user_seen WHERE date < ? LIMIT ?
+                    )
+                """, (before, int(limit)))
+                return deleted + cursor.rowcount
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error pruning stats: {e}")
+            return 0
+    
+    @instrumented
+    def get_storage_size(self) -> int:
+        """Bytes yang terpakai oleh data (halaman di luar freelist)"""
+        with self._get_read_connection() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist) * page_size
+    
+    # Export/Import Methods
+    def export_rows(self, table: str, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Generator semua baris `table` (users/stats) sesuai EXPORT_COLUMNS.
+        
+        Dibaca per batch dengan keyset pada rowid, sehingga memory tetap
+        konstan dan tidak ada transaksi baca panjang yang menahan checkpoint.
+        """
+        columns = ", ".join(EXPORT_COLUMNS[table])
+        last_rowid = -(2 ** 63)
+        while True:
+            with self._get_read_connection() as conn:
+                rows = conn.execute(f"""
+                    SELECT rowid, {columns} FROM {table}
+                    WHERE rowid > ? ORDER BY rowid LIMIT ?
+                """, (last_rowid, batch_size)).fetchall()
+            for row in rows:
+                yield tuple(row)[1:]
+            if len(rows) < batch_size:
+                return
+            last_rowid = rows[-1][0]
+    
+    @instrumented
+    def import_rows(self, table: str, rows: Iterable[tuple], chunk_size: int = 1000) -> int:
+        """
+        Mengimpor baris (urutan kolom EXPORT_COLUMNS) per chunk.
+        
+        Setiap chunk adalah satu transaksi executemany. User dan counter
+        stats di-upsert (data file menang), sehingga import ulang file yang
+        sama tidak menggandakan counter; rollup tanggal yang tersentuh
+        dihitung ulang dari tabel stats di transaksi yang sama.
+        
+        Baris stats dengan tanggal sebelum batas retensi yang sudah di-prune
+        dilewati: rollup tanggal tersebut disimpan utuh dan tidak bisa
+        dihitung ulang dari baris mentah.
+        
+        Returns:
+            Jumlah baris yang diimpor
+        """
+        columns = EXPORT_COLUMNS[table]
+        placeholders = ", ".join("?" for _ in columns)
+        if table == "users":
+            updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "user_id")
+            sql = f"""
+                INSERT INTO users ({", ".join(columns)}) VALUES ({placeholders})
+                ON CONFLICT(user_id) DO UPDATE SET {updates}
+            """
+        else:
+            sql = f"""
+                INSERT INTO stats ({", ".join(columns)}) VALUES ({placeholders})
+                ON CONFLICT(date, command, user_id) DO UPDATE SET count = excluded.count
+            """
+        
+        total = 0
+        iterator = iter(rows)
+        pruned_before = self.get_setting(self.PRUNED_BEFORE_KEY) if table == "stats" else None
+        skipped = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            if pruned_before:
+                retained = [row for row in chunk if row[0] >= pruned_before]
+                skipped += len(chunk) - len(retained)
+                chunk = retained
+                if not chunk:
+                    continue
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(sql, chunk)
+                if table == "stats":
+                    self._rebuild_stats_rollups(cursor, chunk)
+            total += len(chunk)
+        
+        if table == "users":
+            self._profile_cache.clear()
+            self._user_cache.clear()
+        elif skipped:
+            print(f"Import stats: {skipped} rows before {pruned_before} skipped (already pruned)")
+        return total
+    
+    @instrumented
+    def run_maintenance(self, vacuum_pages: int = 1000) -> Dict[str, Any]:
+        """
+        Maintenance berkala: ANALYZE, incremental vacuum dan checkpoint WAL.
+        
+        Incremental vacuum hanya berjalan jika auto_vacuum = INCREMENTAL
+        (default untuk database baru; database lama perlu VACUUM sekali).
+        """
+        start = time.perf_counter()
+        with self._write_lock:
+            conn = self._get_writer()
+            conn.execute("ANALYZE")
+            conn.commit()
             
-            # Tabel Plugins
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS plugins (
-                    name TEXT PRIMARY KEY,
-                    description TEXT,
-                    version TEXT DEFAULT '1.0',
-                    author TEXT,
-                    is_active INTEGER DEFAULT 1,
-                    install_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                    usage_count INTEGER DEFAULT 0
-                )
-            """)
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            freelist_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if auto_vacuum == 2:
+                # executescript menjalankan pragma sampai selesai; execute()
+                # dari modul sqlite3 hanya melakukan satu langkah (satu halaman)
+                conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+            freelist_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
             
-            # Tabel Settings
+            if not self.is_memory:
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        
+        return {
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "incremental_vacuum": auto_vacuum == 2,
+            "pages_freed": freelist_before - freelist_after,
+            "freelist_pages": freelist_after
+        }
+    
+    def _update_stats_rollups(self, cursor: sqlite3.Cursor,
+                              commands: Dict[Tuple[str, str, int], int]):
+        """Memperbarui tabel rollup untuk counter command yang baru ditulis"""
+        daily: Dict[Tuple[str, str], int] = {}
+        active: Dict[int, str] = {}
+        pairs = set()
+        for (date, command, user_id), count in commands.items():
+            daily[(date, command)] = daily.get((date, command), 0) + count
+            pairs.add((date, user_id))
+            if date > active.get(user_id, ""):
+                active[user_id] = date
+        
+        cursor.executemany("""
+            INSERT INTO stats_daily (date, command, total)
+            VALUES (?, ?, ?)
+            ON CONFLICT(date, command) DO UPDATE SET total = total + excluded.total
+        """, [(date, command, total) for (date, command), total in daily.items()])
+        
+        # User dihitung aktif sekali per hari: hanya pasangan (tanggal, user) yang baru
+        new_users: Dict[str, int] = {}
+        for date, user_id in pairs:
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                INSERT OR IGNORE INTO stats_daily_user_seen (date, user_id) VALUES (?, ?)
+            """, (date, user_id))
+            if cursor.rowcount:
+                new_users[date] = new_users.get(date, 0) + 1
+        cursor.executemany("""
+            INSERT INTO stats_daily_users (date, active_users)
+            VALUES (?, ?)
+            ON CONFLICT(date) DO UPDATE SET active_users = active_users + excluded.active_users
+        """, list(new_users.items()))
+        cursor.executemany("""
+            INSERT INTO stats_user_last_active (user_id, date)
+            VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET date = excluded.date
+            WHERE excluded.date > stats_user_last_active.date
+        """, list(active.items()))
+    
+    def _rebuild_stats_rollups(self, cursor: sqlite3.Cursor, rows: List[tuple]):
+        """Menghitung ulang rollup tanggal yang ada di `rows` dari tabel stats"""
+        active: Dict[int, str] = {}
+        for date, _, user_id, _ in rows:
+            if date > active.get(user_id, ""):
+                active[user_id] = date
+        date_params = [(date,) for date in {row[0] for row in rows}]
+        cursor.executemany("DELETE FROM stats_daily WHERE date = ?", date_params)
+        cursor.executemany("""
+            INSERT INTO stats_daily (date, command, total)
+            SELECT date, command, SUM(count) FROM stats
+            WHERE date = ?
+            GROUP BY date, command
+        """, date_params)
+        cursor.executemany("""
+            INSERT OR IGNORE INTO stats_daily_user_seen (date, user_id) VALUES (?, ?)
+        """, list({(row[0], row[2]) for row in rows}))
+        cursor.executemany("""
+            INSERT INTO stats_daily_users (date, active_users)
+            SELECT date, COUNT(*) FROM stats_daily_user_seen
+            WHERE date = ?
+            GROUP BY date
+            ON CONFLICT(date) DO UPDATE SET active_users = excluded.active_users
+        """, date_params)
+        cursor.executemany("""
+            INSERT INTO stats_user_last_active (user_id, date)
+            VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET date = excluded.date
+            WHERE excluded.date > stats_user_last_active.date
+        """, list(active.items()))
     
     # User Methods
+    @instrumented
     def add_user(self, user_id: int, username: Optional[str] = None, 
                  first_name: Optional[str] = None, last_name: Optional[str] = None,
                  language_code: Optional[str] = None, is_bot: bool = False) -> bool:
-        """Menambahkan atau update user"""
+        """
+        Menambahkan atau update user.
+        
+        Upsert hanya dijalankan jika profil berubah sejak terakhir ditulis
+        (dicek lewat hash di cache). joined_date, message_count dan
+        is_banned tidak ikut ditimpa.
+        """
+        profile_hash = hash((username, first_name, last_name, language_code, bool(is_bot)))
+        if self._profile_cache.get(user_id) == profile_hash:
+            self._upserts_skipped += 1
+            return True
+        
+        now = datetime.now()
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    INSERT OR REPLACE INTO users 
-                    (user_id, username, first_name, last_name, language_code, is_bot, last_activity)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO users 
+                    (user_id, username, first_name, last_name, language_code, is_bot,
+                     last_activity, joined_at, last_activity_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET
+                        username = excluded.username,
+                        first_name = excluded.first_name,
+                        last_name = excluded.last_name,
+                        language_code = excluded.language_code,
+                        is_bot = excluded.is_bot,
+                        last_activity = excluded.last_activity,
+                        last_activity_at = excluded.last_activity_at
                 """, (user_id, username, first_name, last_name, language_code, 
-                      1 if is_bot else 0, datetime.now().isoformat()))
-                return True
+                      1 if is_bot else 0, now.isoformat(), int(now.timestamp()),
+                      int(now.timestamp())))
+            self._profile_cache.set(user_id, profile_hash)
+            self._user_cache.invalidate(user_id)
+            self._upserts_written += 1
+            return True
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error adding user: {e}")
             return False
     
+    @instrumented
     def update_user_activity(self, user_id: int):
         """Update aktivitas terakhir user"""
+        now = datetime.now()
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE users 
-                    SET last_activity = ?, message_count = message_count + 1
+                    SET last_activity = ?, last_activity_at = ?, message_count = message_count + 1,
+                        is_blocked = 0
                     WHERE user_id = ?
-                """, (datetime.now().isoformat(), user_id))
+                """, (now.isoformat(), int(now.timestamp()), user_id))
+            self._user_cache.invalidate(user_id)
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error updating user activity: {e}")
     
+    @instrumented
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Mendapatkan data user"""
+        """
+        Mendapatkan data user.
+        Hasil di-cache sampai TTL; setiap write ke baris users
+        (profil, aktivitas, status) menghapus entry cache user tersebut.
+        """
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            with self._get_connection() as conn:
+            with self._get_read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
                 row = cursor.fetchone()
-                return dict(row) if row else None
+                if row is None:
+                    return None
+                user = dict(row)
+                self._user_cache.set(user_id, user)
+                return dict(user)
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error getting user: {e}")
             return None
     
+    @instrumented
     def get_all_users(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
         """Mendapatkan semua user"""
         try:
-            with self._get_connection() as conn:
+            with self._get_read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT * FROM users 
@@ -166,77 +623,369 @@ class Database:
                 """, (limit, offset))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error getting users: {e}")
             return []
     
+    @instrumented
+    def get_users_page(self, batch_size: int = 500, after: Optional[Tuple[str, int]] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[UserRow]:
+        """
+        Mendapatkan satu halaman user dengan keyset pagination.
+        
+        Args:
+            batch_size: Jumlah user per halaman
+            after: (joined_date, user_id) dari baris terakhir halaman sebelumnya
+            filters: Filter opsional, key harus ada di USER_FILTERS
+        
+        Returns:
+            List UserRow, urut joined_date DESC, user_id DESC
+        """
+        conditions = []
+        params: List[Any] = []
+        
+        for name, value in (filters or {}).items():
+            if name not in USER_FILTERS:
+                raise ValueError(f"Unknown user filter: {name}")
+            conditions.append(USER_FILTERS[name])
+            params.append(int(value) if isinstance(value, bool) else value)
+        
+        if after is not None:
+            conditions.append("(joined_date, user_id) < (?, ?)")
+            params.extend(after)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(batch_size)
+        
+        try:
+            with self._get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT user_id, username, first_name, language_code, joined_date
+                    FROM users 
+                    {where}
+                    ORDER BY joined_date DESC, user_id DESC 
+                    LIMIT ?
+                """, params)
+                return [UserRow(*row) for row in cursor.fetchall()]
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error getting users page: {e}")
+            return []
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistik cache user (hit rate skip-upsert dan get_user)"""
+        upserts = self._upserts_skipped + self._upserts_written
+        return {
+            "profiles": self._profile_cache.get_stats(),
+            "users": self._user_cache.get_stats(),
+            "upserts_skipped": self._upserts_skipped,
+            "upserts_written": self._upserts_written,
+            "upsert_skip_rate": round(self._upserts_skipped / upserts, 4) if upserts else 0.0
+        }
+    
+    @instrumented
     def get_user_count(self) -> int:
         """Mendapatkan jumlah user"""
         try:
-            with self._get_connection() as conn:
+            with self._get_read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM users")
                 return cursor.fetchone()[0]
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error getting user count: {e}")
             return 0
     
     # Stats Methods
+    @instrumented
     def log_command(self, command: str, user_id: int):
         """Mencatat penggunaan command"""
+        # Tanggal UTC, sama dengan CURRENT_DATE di SQLite
+        date = utc_today()
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO stats (date, command, user_id, count)
-                    VALUES (CURRENT_DATE, ?, ?, 1)
+                    VALUES (?, ?, ?, 1)
                     ON CONFLICT(date, command, user_id) 
                     DO UPDATE SET count = count + 1
-                """, (command, user_id))
+                """, (date, command, user_id))
+                self._update_stats_rollups(cursor, {(date, command, user_id): 1})
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error logging command: {e}")
     
-    def get_stats(self, days: int = 7) -> Dict[str, Any]:
-        """Mendapatkan statistik penggunaan"""
+    @instrumented
+    def apply_write_batch(self, activity: Dict[int, Tuple[int, str]],
+                          commands: Dict[Tuple[str, str, int], int]) -> bool:
+        """
+        Menulis batch aktivitas user dan counter command dalam satu transaksi.
+        
+        Args:
+            activity: {user_id: (jumlah pesan, last_activity)}
+            commands: {(date, command, user_id): count}
+        
+        Returns:
+            True jika berhasil
+        """
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                if activity:
+                    cursor.executemany("""
+                        UPDATE users 
+                        SET last_activity = ?, last_activity_at = ?,
+                            message_count = message_count + ?, is_blocked = 0
+                        WHERE user_id = ?
+                    """, [(last, int(datetime.fromisoformat(last).timestamp()), count, user_id)
+                          for user_id, (count, last) in activity.items()])
+                if commands:
+                    cursor.executemany("""
+                        INSERT INTO stats (date, command, user_id, count)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(date, command, user_id) 
+                        DO UPDATE SET count = count + excluded.count
+                    """, [(date, command, user_id, count)
+                          for (date, command, user_id), count in commands.items()])
+                    self._update_stats_rollups(cursor, commands)
+            for user_id in activity:
+                self._user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error applying write batch: {e}")
+            return False
+    
+    @instrumented
+    def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Mendapatkan statistik penggunaan.
+        Dibaca dari tabel rollup, bukan dari tabel stats mentah.
+        """
+        since = f"-{int(days)} days"
+        try:
+            with self._get_read_connection() as conn:
+                cursor = conn.cursor()
                 
                 # Total commands
                 cursor.execute("""
-                    SELECT SUM(count) FROM stats 
-                    WHERE date >= date('now', '-{} days')
-                """.format(days))
+                    SELECT SUM(total) FROM stats_daily 
+                    WHERE date >= date('now', ?)
+                """, (since,))
                 total_commands = cursor.fetchone()[0] or 0
                 
                 # Top commands
                 cursor.execute("""
-                    SELECT command, SUM(count) as total 
-                    FROM stats 
-                    WHERE date >= date('now', '-{} days')
+                    SELECT command, SUM(total) as total 
+                    FROM stats_daily 
+                    WHERE date >= date('now', ?)
                     GROUP BY command 
                     ORDER BY total DESC 
                     LIMIT 10
-                """.format(days))
+                """, (since,))
                 top_commands = [dict(row) for row in cursor.fetchall()]
                 
                 # Active users
                 cursor.execute("""
-                    SELECT COUNT(DISTINCT user_id) FROM stats 
-                    WHERE date >= date('now', '-{} days')
-                """.format(days))
+                    SELECT COUNT(*) FROM stats_user_last_active 
+                    WHERE date >= date('now', ?)
+                """, (since,))
                 active_users = cursor.fetchone()[0] or 0
                 
+                # Active users per hari
+                cursor.execute("""
+                    SELECT date, active_users FROM stats_daily_users 
+                    WHERE date >= date('now', ?)
+                    ORDER BY date
+                """, (since,))
+                daily_active_users = [dict(row) for row in cursor.fetchall()]
+                
                 return {
                     "total_commands": total_commands,
                     "active_users": active_users,
                     "top_commands": top_commands,
+                    "daily_active_users": daily_active_users,
                     "period_days": days
                 }
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error getting stats: {e}")
-            return {"total_commands": 0, "active_users": 0, "top_commands": [], "period_days": days}
+            return {"total_commands": 0, "active_users": 0, "top_commands": [],
+                    "daily_active_users": [], "period_days": days}
     
+    # Broadcast Methods
+    @instrumented
+    def create_broadcast_job(self, message: str, parse_mode: Optional[str] = None,
+                             created_by: Optional[int] = None, total: int = 0,
+                             status_chat_id: Optional[int] = None,
+                             status_message_id: Optional[int] = None) -> int:
+        """Membuat job broadcast baru (status pending), mengembalikan id job"""
+        now = datetime.now().isoformat()
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO broadcast_jobs
+                    (message, parse_mode, created_by, status_chat_id, status_message_id,
+                     total, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (message, parse_mode, created_by, status_chat_id, status_message_id,
+                      total, now, now))
+                return cursor.lastrowid
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error creating broadcast job: {e}")
+            return 0
+
+    @instrumented
+    def get_broadcast_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan satu job broadcast"""
+        try:
+            with self._get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM broadcast_jobs WHERE id = ?", (job_id,))
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error getting broadcast job: {e}")
+            return None
+
+    @instrumented
+    def get_broadcast_jobs(self, statuses: Optional[Sequence[str]] = None,
+                           limit: int = 20) -> List[Dict[str, Any]]:
+        """Daftar job broadcast terbaru (opsional difilter status)"""
+        query = "SELECT * FROM broadcast_jobs"
+        params: List[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        try:
+            with self._get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error getting broadcast jobs: {e}")
+            return []
+
+    @instrumented
+    def set_broadcast_status(self, job_id: int, status: str) -> bool:
+        """Mengubah status job (pending, running, done, cancelled)"""
+        now = datetime.now().isoformat()
+        finished = now if status in ("done", "cancelled") else None
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE broadcast_jobs
+                    SET status = ?, updated_at = ?, finished_at = COALESCE(?, finished_at)
+                    WHERE id = ?
+                """, (status, now, finished, job_id))
+                return cursor.rowcount > 0
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error setting broadcast status: {e}")
+            return False
+
+    @instrumented
+    def checkpoint_broadcast(self, job_id: int, cursor: Tuple[str, int], sent: int,
+                             outcomes: List[Tuple[int, str, Optional[str]]]) -> bool:
+        """
+        Menyimpan hasil satu batch dalam satu transaksi: hasil per penerima
+        yang gagal, counter job, posisi keyset terakhir, dan flag is_blocked
+        untuk user yang memblokir bot.
+        """
+        blocked = [user_id for user_id, outcome, _ in outcomes if outcome == "blocked"]
+        try:
+            with self._get_connection() as conn:
+                db_cursor = conn.cursor()
+                if outcomes:
+                    db_cursor.executemany("""
+                        INSERT OR REPLACE INTO broadcast_outcomes (job_id, user_id, outcome, error)
+                        VALUES (?, ?, ?, ?)
+                    """, [(job_id, user_id, outcome, error)
+                          for user_id, outcome, error in outcomes])
+                if blocked:
+                    db_cursor.executemany("UPDATE users SET is_blocked = 1 WHERE user_id = ?",
+                                          [(user_id,) for user_id in blocked])
+                db_cursor.execute("""
+                    UPDATE broadcast_jobs
+                    SET sent = sent + ?, failed = failed + ?, blocked = blocked + ?,
+                        cursor_joined_date = ?, cursor_user_id = ?, updated_at = ?
+                    WHERE id = ?
+                """, (sent, len(outcomes) - len(blocked), len(blocked),
+                      cursor[0], cursor[1], datetime.now().isoformat(), job_id))
+            for user_id in blocked:
+                self._user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error saving broadcast checkpoint: {e}")
+            return False
+
+    @instrumented
+    def get_broadcast_outcomes(self, job_id: int) -> Dict[str, int]:
+        """Jumlah penerima gagal per outcome {outcome: count}"""
+        try:
+            with self._get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT outcome, COUNT(*) FROM broadcast_outcomes
+                    WHERE job_id = ? GROUP BY outcome
+                """, (job_id,))
+                return {outcome: count for outcome, count in cursor.fetchall()}
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error getting broadcast outcomes: {e}")
+            return {}
+
+    # Scheduled Message Methods
+    @instrumented
+    def save_scheduled_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Menyimpan pesan terjadwal yang belum terkirim dalam satu transaksi"""
+        if not messages:
+            return 0
+        columns = ", ".join(SCHEDULED_MESSAGE_COLUMNS)
+        placeholders = ", ".join("?" * len(SCHEDULED_MESSAGE_COLUMNS))
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    f"INSERT INTO scheduled_messages ({columns}) VALUES ({placeholders})",
+                    [tuple(message.get(column) for column in SCHEDULED_MESSAGE_COLUMNS)
+                     for message in messages]
+                )
+                return len(messages)
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error saving scheduled messages: {e}")
+            return 0
+
+    @instrumented
+    def pop_scheduled_messages(self) -> List[Dict[str, Any]]:
+        """Mengambil lalu menghapus semua pesan terjadwal (satu transaksi)"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM scheduled_messages ORDER BY due_at, id")
+                messages = [dict(row) for row in cursor.fetchall()]
+                if messages:
+                    cursor.execute("DELETE FROM scheduled_messages WHERE id <= ?",
+                                   (max(message["id"] for message in messages),))
+                return messages
+        except Exception as e:
+            self._raise_if_busy(e)
+            print(f"Error loading scheduled messages: {e}")
+            return []
+
     # Plugin Methods
+    @instrumented
     def register_plugin(self, name: str, description: str = "", 
                        version: str = "1.0", author: str = "Unknown") -> bool:
         """Mendaftarkan plugin ke database"""
@@ -250,9 +999,11 @@ class Database:
                 """, (name, description, version, author, datetime.now().isoformat()))
                 return True
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error registering plugin: {e}")
             return False
     
+    @instrumented
     def update_plugin_usage(self, name: str):
         """Update penggunaan plugin"""
         try:
@@ -264,22 +1015,34 @@ class Database:
                     WHERE name = ?
                 """, (name,))
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error updating plugin usage: {e}")
     
+    @instrumented
     def get_plugin_stats(self) -> List[Dict[str, Any]]:
         """Mendapatkan statistik plugin"""
         try:
-            with self._get_connection() as conn:
+            with self._get_read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM plugins ORDER BY usage_count DESC")
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error getting plugin stats: {e}")
             return []
     
     # Settings Methods
-    def set_setting(self, key: str, value: str):
-        """Menyimpan setting"""
+    @instrumented
+    def _load_settings(self) -> Dict[str, Any]:
+        """Membaca semua setting dari tabel settings"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT key, value FROM settings")
+            return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    @instrumented
+    def _write_setting(self, key: str, value: str) -> bool:
+        """Menyimpan setting ke tabel settings"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -287,20 +1050,35 @@ class Database:
                     INSERT OR REPLACE INTO settings (key, value, updated_at)
                     VALUES (?, ?, ?)
                 """, (key, value, datetime.now().isoformat()))
+                return True
         except Exception as e:
+            self._raise_if_busy(e)
             print(f"Error setting config: {e}")
+            return False
+
+def create_backend(url: str, **options) -> StorageBackend:
+    """
+    Membuat storage backend dari DATABASE_URL.
     
-    def get_setting(self, key: str, default: Any = None) -> Any:
-        """Mendapatkan setting"""
-        try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-                row = cursor.fetchone()
-                return row[0] if row else default
-        except Exception as e:
-            print(f"Error getting config: {e}")
-            return default
+    Args:
+        url: sqlite:///path, memory://, atau dbm:///path
+        options: Opsi tambahan untuk Database (SQLite)
+    """
+    scheme, path = parse_database_url(url)
+    if scheme == "sqlite":
+        return Database(path or ":memory:", **options)
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "dbm":
+        return DbmBackend(path or "data/bot_counters")
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
 
 # Singleton instance
-db = Database()
+db = create_backend(
+    DATABASE_URL,
+    busy_timeout=DATABASE_BUSY_TIMEOUT,
+    cached_statements=DATABASE_CACHED_STATEMENTS,
+    user_cache_size=USER_CACHE_SIZE,
+    user_cache_ttl=USER_CACHE_TTL,
+    slow_query_ms=SLOW_QUERY_MS
+)
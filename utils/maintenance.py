@@ -0,0 +1,222 @@
+"""
+========================================
+Modular Telegram Bot - Maintenance
+========================================
+Nama: MaintenanceScheduler
+Deskripsi: Job in-process untuk backup online database (sqlite3
+           backup API), retensi statistik, ANALYZE dan incremental
+           vacuum berkala
+Command: -
+Usage: Dijalankan oleh ModularBot; manual:
+       python -m utils.maintenance backup
+       python -m utils.maintenance retention
+       python -m utils.maintenance maintain
+========================================
+"""
+
+import asyncio
+import glob
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from config import (
+    BACKUP_DIR, BACKUP_KEEP, BACKUP_INTERVAL_HOURS, BACKUP_PAGES_PER_STEP,
+    BACKUP_STEP_SLEEP_MS, MAINTENANCE_INTERVAL_HOURS, INCREMENTAL_VACUUM_PAGES,
+    STATS_RETENTION_DAYS, STATS_RETENTION_CHUNK
+)
+from utils.async_database import AsyncDatabase
+from utils.logger import logger
+
+class MaintenanceScheduler:
+    """
+    Scheduler backup dan maintenance database.
+
+    Backup berjalan di thread terpisah dengan budget halaman per langkah,
+    retensi statistik dan maintenance (ANALYZE, incremental vacuum)
+    berjalan di thread writer.
+    Interval 0 berarti job tersebut tidak dijadwalkan.
+    """
+
+    def __init__(self, database: AsyncDatabase, backup_dir: str = "backups",
+                 backup_keep: int = 7, backup_interval_hours: float = 24,
+                 maintenance_interval_hours: float = 6, pages_per_step: int = 256,
+                 step_sleep_ms: int = 50, vacuum_pages: int = 1000,
+                 retention_days: int = 90, retention_chunk: int = 1000):
+        self.database = database
+        self.backup_dir = backup_dir
+        self.backup_keep = backup_keep
+        self.backup_interval_hours = backup_interval_hours
+        self.maintenance_interval_hours = maintenance_interval_hours
+        self.pages_per_step = pages_per_step
+        self.step_sleep_ms = step_sleep_ms
+        self.vacuum_pages = vacuum_pages
+        self.retention_days = retention_days
+        self.retention_chunk = retention_chunk
+        self._tasks = []
+        self._backup_lock: Optional[asyncio.Lock] = None
+        self.last_backup: Optional[Dict[str, Any]] = None
+        self.last_maintenance: Optional[Dict[str, Any]] = None
+        self.last_retention: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        """Memulai job berkala (dipanggil dari dalam event loop)"""
+        loop = asyncio.get_running_loop()
+        self._backup_lock = asyncio.Lock()
+        if self.backup_interval_hours > 0:
+            self._tasks.append(loop.create_task(
+                self._every(self.backup_interval_hours, self.run_backup)
+            ))
+        if self.maintenance_interval_hours > 0:
+            self._tasks.append(loop.create_task(
+                self._every(self.maintenance_interval_hours, self.run_maintenance)
+            ))
+
+    async def stop(self):
+        """Menghentikan semua job berkala"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _every(self, hours: float, job):
+        """Menjalankan job setiap `hours` jam"""
+        while True:
+            await asyncio.sleep(hours * 3600)
+            try:
+                await job()
+            except NotImplementedError:
+                return
+            except Exception as e:
+                logger.error(f"Maintenance job {job.__name__} failed: {e}")
+
+    async def run_backup(self) -> Dict[str, Any]:
+        """
+        Membuat backup online lalu menghapus backup lama.
+
+        Returns:
+            dict berisi path, size, duration_ms dan steps
+        """
+        lock = self._backup_lock or asyncio.Lock()
+        async with lock:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            dest_path = os.path.join(self.backup_dir, f"backup_{timestamp}.db")
+
+            # Thread executor default: backup tidak memakai thread writer/reader pool
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None, self.database.database.backup, dest_path,
+                self.pages_per_step, self.step_sleep_ms / 1000
+            )
+            self._prune_backups()
+
+            self.last_backup = result
+            logger.info(f"💾 Backup created: {result['path']} "
+                        f"({result['size']} bytes, {result['duration_ms']}ms)")
+            return result
+
+    async def run_retention(self) -> Dict[str, Any]:
+        """
+        Menghapus statistik per user yang lebih tua dari `retention_days`.
+
+        Setiap chunk adalah satu transaksi terpisah di thread writer, jadi
+        write dari handler bisa masuk di antara chunk.
+
+        Returns:
+            dict berisi cutoff, rows_deleted, chunks, bytes_reclaimed, duration_ms
+        """
+        start = time.perf_counter()
+        cutoff = (datetime.now(timezone.utc).date()
+                  - timedelta(days=self.retention_days)).isoformat()
+        database = self.database.database
+
+        size_before = await self.database.run_read(database.get_storage_size)
+        rows_deleted = 0
+        chunks = 0
+        while True:
+            rows = await self.database.run_write(
+                database.prune_stats, cutoff, self.retention_chunk
+            )
+            if rows <= 0:
+                break
+            rows_deleted += rows
+            chunks += 1
+            if rows < self.retention_chunk:
+                break
+            await asyncio.sleep(self.step_sleep_ms / 1000)
+        size_after = await self.database.run_read(database.get_storage_size)
+
+        result = {
+            "cutoff": cutoff,
+            "rows_deleted": rows_deleted,
+            "chunks": chunks,
+            "bytes_reclaimed": max(0, size_before - size_after),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        self.last_retention = result
+        logger.info(f"🗑️ Stats retention: {rows_deleted} rows older than {cutoff} removed, "
+                    f"{result['bytes_reclaimed']} bytes reclaimed")
+        return result
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        """Menjalankan retensi statistik lalu ANALYZE dan incremental vacuum"""
+        if self.retention_days > 0:
+            await self.run_retention()
+        result = await self.database.run_write(
+            self.database.database.run_maintenance, self.vacuum_pages
+        )
+        self.last_maintenance = result
+        logger.info(f"🧹 Database maintenance done: {result}")
+        return result
+
+    def _prune_backups(self):
+        """Menyimpan hanya `backup_keep` backup terbaru"""
+        if self.backup_keep <= 0:
+            return
+        backups = sorted(glob.glob(os.path.join(self.backup_dir, "backup_*.db")))
+        for path in backups[:-self.backup_keep]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Cannot remove old backup {path}: {e}")
+
+def create_scheduler(database: AsyncDatabase) -> MaintenanceScheduler:
+    """Membuat scheduler dari konfigurasi di config.py"""
+    return MaintenanceScheduler(
+        database,
+        backup_dir=BACKUP_DIR,
+        backup_keep=BACKUP_KEEP,
+        backup_interval_hours=BACKUP_INTERVAL_HOURS,
+        maintenance_interval_hours=MAINTENANCE_INTERVAL_HOURS,
+        pages_per_step=BACKUP_PAGES_PER_STEP,
+        step_sleep_ms=BACKUP_STEP_SLEEP_MS,
+        vacuum_pages=INCREMENTAL_VACUUM_PAGES,
+        retention_days=STATS_RETENTION_DAYS,
+        retention_chunk=STATS_RETENTION_CHUNK
+    )
+
+async def _main(action: str) -> Dict[str, Any]:
+    from utils.async_database import async_db
+
+    scheduler = create_scheduler(async_db)
+    try:
+        if action == "backup":
+            return await scheduler.run_backup()
+        if action == "retention":
+            return await scheduler.run_retention()
+        return await scheduler.run_maintenance()
+    finally:
+        async_db.close()
+        async_db.database.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in ("backup", "retention", "maintain"):
+        print("Usage: python -m utils.maintenance [backup|retention|maintain]")
+        sys.exit(1)
+    print(asyncio.run(_main(sys.argv[1])))
@@ -0,0 +1,218 @@
+"""
+========================================
+Modular Telegram Bot - Query Metrics
+========================================
+Nama: QueryMetrics
+Deskripsi: Instrumentasi per method database: histogram durasi,
+           jumlah baris, error SQLITE_BUSY, waktu tunggu lock dan
+           slow-query log
+Command: -
+Usage: class Database:
+           @instrumented
+           def get_user(self, user_id): ...
+       db.get_query_metrics()
+========================================
+"""
+
+import bisect
+import functools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from utils.logger import logger
+
+# Batas atas bucket histogram durasi (milidetik); bucket terakhir = tak hingga
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+class MethodStats:
+    """Counter untuk satu method"""
+
+    __slots__ = ("calls", "errors", "busy", "rows", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.busy = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, q: float) -> float:
+        """Estimasi persentil dari histogram (batas atas bucket)"""
+        if not self.calls:
+            return 0.0
+        target = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "busy": self.busy,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": dict(zip(
+                [str(b) for b in LATENCY_BUCKETS_MS] + ["inf"], self.buckets
+            ))
+        }
+
+def count_rows(result: Any) -> int:
+    """Jumlah baris dari hasil method (list = len, None/bool/int = 0, lainnya = 1)"""
+    if result is None or isinstance(result, (bool, int, float)):
+        return 0
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1
+
+class QueryMetrics:
+    """
+    Kumpulan metrik query, aman dipakai dari banyak thread.
+
+    Setiap pencatatan hanya berupa beberapa operasi integer di bawah
+    satu lock, sehingga overhead per panggilan tetap kecil.
+    """
+
+    def __init__(self, slow_query_ms: float = 100, slow_log_size: int = 50):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods: Dict[str, MethodStats] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self.lock_waits = 0
+        self.lock_wait_ms = 0.0
+        self.lock_wait_max_ms = 0.0
+        self.started_at = time.time()
+
+    @property
+    def current_method(self) -> Optional[str]:
+        """Method database yang sedang berjalan di thread ini"""
+        return getattr(self._local, "method", None)
+
+    def _stats(self, name: str) -> MethodStats:
+        """MethodStats untuk `name` (dibuat jika belum ada); panggil di bawah lock"""
+        stats = self._methods.get(name)
+        if stats is None:
+            stats = self._methods[name] = MethodStats()
+        return stats
+
+    def observe(self, name: str, duration_ms: float, rows: int = 0, error: bool = False,
+                args: tuple = ()):
+        """Mencatat satu panggilan method"""
+        with self._lock:
+            stats = self._stats(name)
+            stats.calls += 1
+            stats.rows += rows
+            stats.total_ms += duration_ms
+            if duration_ms > stats.max_ms:
+                stats.max_ms = duration_ms
+            if error:
+                stats.errors += 1
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+        if self.slow_query_ms and duration_ms >= self.slow_query_ms:
+            entry = {
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "method": name,
+                "duration_ms": round(duration_ms, 2),
+                "rows": rows,
+                "args": repr(args)[:120]
+            }
+            self.slow_queries.append(entry)
+            logger.warning(f"🐢 Slow query: {name} took {duration_ms:.1f}ms "
+                           f"({rows} rows) args={entry['args']}")
+
+    def record_busy(self, name: Optional[str] = None):
+        """Mencatat error SQLITE_BUSY/LOCKED untuk method yang sedang berjalan"""
+        name = name or self.current_method or "unknown"
+        with self._lock:
+            self._stats(name).busy += 1
+
+    def record_error(self, name: Optional[str] = None):
+        """Mencatat error yang ditangani (ditelan) di dalam method"""
+        name = name or self.current_method or "unknown"
+        with self._lock:
+            self._stats(name).errors += 1
+
+    def record_lock_wait(self, wait_ms: float):
+        """Mencatat waktu tunggu write lock in-process"""
+        with self._lock:
+            self.lock_waits += 1
+            self.lock_wait_ms += wait_ms
+            if wait_ms > self.lock_wait_max_ms:
+                self.lock_wait_max_ms = wait_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Salinan semua metrik (untuk admin command dan exporter)"""
+        with self._lock:
+            methods = {name: stats.to_dict() for name, stats in self._methods.items()}
+            lock_wait = {
+                "acquisitions": self.lock_waits,
+                "total_ms": round(self.lock_wait_ms, 3),
+                "max_ms": round(self.lock_wait_max_ms, 3)
+            }
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "slow_query_ms": self.slow_query_ms,
+            "methods": methods,
+            "lock_wait": lock_wait,
+            "busy_total": sum(m["busy"] for m in methods.values()),
+            "slow_queries": list(self.slow_queries)
+        }
+
+    def top(self, n: int = 10, key: str = "total_ms") -> List[Dict[str, Any]]:
+        """Method teratas berdasarkan `key` (total_ms, calls, max_ms, ...)"""
+        methods = self.snapshot()["methods"]
+        ranked = sorted(methods.items(), key=lambda item: item[1][key], reverse=True)
+        return [dict(stats, method=name) for name, stats in ranked[:n]]
+
+    def reset(self):
+        """Mengosongkan semua metrik"""
+        with self._lock:
+            self._methods.clear()
+            self.slow_queries.clear()
+            self.lock_waits = 0
+            self.lock_wait_ms = 0.0
+            self.lock_wait_max_ms = 0.0
+            self.started_at = time.time()
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Decorator untuk method backend yang punya atribut `metrics`.
+    Mencatat durasi, jumlah baris hasil dan exception per method.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        metrics: QueryMetrics = self.metrics
+        local = metrics._local
+        previous = getattr(local, "method", None)
+        local.method = name
+        start = time.perf_counter()
+        error = False
+        result = None
+        try:
+            result = func(self, *args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            local.method = previous
+            metrics.observe(name, (time.perf_counter() - start) * 1000,
+                            count_rows(result), error, args)
+
+    return wrapper
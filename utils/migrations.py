@@ -0,0 +1,415 @@
+"""
+========================================
+Modular Telegram Bot - Schema Migrations
+========================================
+Nama: Migrations
+Deskripsi: Migrasi skema database berurutan yang dicatat di
+           PRAGMA user_version
+Command: -
+Usage: Dipanggil otomatis oleh Database saat inisialisasi
+========================================
+
+Cara menambah migrasi baru:
+1. Buat fungsi `_vN_up(cursor)` berisi DDL (harus idempotent)
+2. Opsional: buat generator `_vN_backfill(conn, chunk_size)` yang
+   memproses data per chunk dan yield jumlah baris per chunk
+3. Tambahkan Migration(N, "deskripsi", _vN_up, _vN_backfill) ke MIGRATIONS
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple
+
+@dataclass
+class Migration:
+    """Satu langkah migrasi skema"""
+    version: int
+    description: str
+    up: Callable[[sqlite3.Cursor], None]
+    backfill: Optional[Callable[[sqlite3.Connection, int], Iterator[int]]] = None
+
+@dataclass
+class MigrationReport:
+    """Hasil menjalankan migrasi saat startup"""
+    from_version: int
+    to_version: int
+    applied: List[Tuple[int, str, float, int]] = field(default_factory=list)
+    total_ms: float = 0.0
+
+    def summary(self) -> str:
+        """Ringkasan satu baris untuk log startup"""
+        if not self.applied:
+            return f"Database schema v{self.to_version} (up to date, {self.total_ms:.1f}ms)"
+        steps = ", ".join(
+            f"v{version} {description} {ms:.1f}ms ({rows} rows)"
+            for version, description, ms, rows in self.applied
+        )
+        return (f"Database schema v{self.from_version} -> v{self.to_version} "
+                f"in {self.total_ms:.1f}ms: {steps}")
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    """ALTER TABLE ADD COLUMN yang aman dijalankan ulang"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# ==================== v1: Skema awal ====================
+
+def _v1_up(cursor: sqlite3.Cursor):
+    # Tabel Users
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            first_name TEXT,
+            last_name TEXT,
+            language_code TEXT,
+            is_bot INTEGER DEFAULT 0,
+            joined_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
+            message_count INTEGER DEFAULT 0,
+            is_banned INTEGER DEFAULT 0
+        )
+    """)
+
+    # Tabel Chats
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chats (
+            chat_id INTEGER PRIMARY KEY,
+            chat_type TEXT,
+            chat_title TEXT,
+            joined_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
+            message_count INTEGER DEFAULT 0
+        )
+    """)
+
+    # Tabel Stats
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT DEFAULT CURRENT_DATE,
+            command TEXT,
+            user_id INTEGER,
+            count INTEGER DEFAULT 1,
+            UNIQUE(date, command, user_id)
+        )
+    """)
+
+    # Tabel Plugins
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS plugins (
+            name TEXT PRIMARY KEY,
+            description TEXT,
+            version TEXT DEFAULT '1.0',
+            author TEXT,
+            is_active INTEGER DEFAULT 1,
+            install_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            usage_count INTEGER DEFAULT 0
+        )
+    """)
+
+    # Tabel Settings
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+# ==================== v2: Index keyset user ====================
+
+def _v2_up(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_joined
+        ON users (joined_date, user_id)
+    """)
+
+# ==================== v3: Rollup statistik ====================
+
+def _v3_up(cursor: sqlite3.Cursor):
+    # Rollup harian per command
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_daily (
+            date TEXT NOT NULL,
+            command TEXT NOT NULL,
+            total INTEGER DEFAULT 0,
+            PRIMARY KEY (date, command)
+        ) WITHOUT ROWID
+    """)
+
+    # Rollup jumlah user aktif per hari
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_daily_users (
+            date TEXT PRIMARY KEY,
+            active_users INTEGER DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+
+    # Tanggal aktif terakhir per user (untuk hitung user aktif per periode)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_user_last_active (
+            user_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stats_user_last_active_date
+        ON stats_user_last_active (date)
+    """)
+
+    # Rollup diisi ulang penuh oleh backfill
+    cursor.execute("DELETE FROM stats_daily")
+    cursor.execute("DELETE FROM stats_daily_users")
+    cursor.execute("DELETE FROM stats_user_last_active")
+
+def _v3_backfill(conn: sqlite3.Connection, chunk_size: int) -> Iterator[int]:
+    """Mengisi rollup dari tabel stats, per rentang tanggal"""
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM stats ORDER BY date")]
+    # Satu chunk = beberapa tanggal; rata-rata baris per tanggal tidak diketahui,
+    # jadi ukuran chunk dihitung dalam jumlah tanggal
+    dates_per_chunk = max(1, chunk_size // 100)
+
+    for i in range(0, len(dates), dates_per_chunk):
+        first, last = dates[i], dates[min(i + dates_per_chunk, len(dates)) - 1]
+        cursor = conn.execute("""
+            INSERT INTO stats_daily (date, command, total)
+            SELECT date, command, SUM(count) FROM stats
+            WHERE date BETWEEN ? AND ?
+            GROUP BY date, command
+        """, (first, last))
+        rows = cursor.rowcount
+        conn.execute("""
+            INSERT INTO stats_daily_users (date, active_users)
+            SELECT date, COUNT(DISTINCT user_id) FROM stats
+            WHERE date BETWEEN ? AND ?
+            GROUP BY date
+        """, (first, last))
+        conn.execute("""
+            INSERT INTO stats_user_last_active (user_id, date)
+            SELECT user_id, MAX(date) FROM stats
+            WHERE date BETWEEN ? AND ?
+            GROUP BY user_id
+            ON CONFLICT(user_id) DO UPDATE SET date = excluded.date
+            WHERE excluded.date > stats_user_last_active.date
+        """, (first, last))
+        yield rows
+
+# ==================== v4: Timestamp integer (epoch) ====================
+
+def _v4_up(cursor: sqlite3.Cursor):
+    _add_column(cursor, "users", "joined_at", "INTEGER")
+    _add_column(cursor, "users", "last_activity_at", "INTEGER")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_last_activity_at
+        ON users (last_activity_at)
+    """)
+
+def _v4_backfill(conn: sqlite3.Connection, chunk_size: int) -> Iterator[int]:
+    """
+    Konversi joined_date (UTC) dan last_activity (waktu lokal) ke epoch.
+
+    Tabel dijalani dengan cursor user_id, bukan "WHERE joined_at IS NULL",
+    karena joined_date yang NULL atau tidak bisa di-parse tetap menghasilkan
+    joined_at NULL dan akan terpilih lagi selamanya.
+    """
+    last_id = -(2 ** 63)
+    while True:
+        upper, count = conn.execute("""
+            SELECT MAX(user_id), COUNT(*) FROM (
+                SELECT user_id FROM users
+                WHERE user_id > ? AND joined_at IS NULL
+                ORDER BY user_id LIMIT ?
+            )
+        """, (last_id, chunk_size)).fetchone()
+        if not count:
+            return
+        conn.execute("""
+            UPDATE users SET
+                joined_at = CAST(strftime('%s', joined_date) AS INTEGER),
+                last_activity_at = CAST(strftime('%s', last_activity, 'utc') AS INTEGER)
+            WHERE user_id > ? AND user_id <= ? AND joined_at IS NULL
+        """, (last_id, upper))
+        last_id = upper
+        yield count
+
+# ==================== v5: Broadcast job ====================
+
+def _v5_up(cursor: sqlite3.Cursor):
+    # User yang memblokir bot (ditandai otomatis saat broadcast)
+    _add_column(cursor, "users", "is_blocked", "INTEGER DEFAULT 0")
+
+    # Job broadcast dengan checkpoint keyset (joined_date, user_id)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message TEXT NOT NULL,
+            parse_mode TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            created_by INTEGER,
+            status_chat_id INTEGER,
+            status_message_id INTEGER,
+            total INTEGER DEFAULT 0,
+            sent INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            blocked INTEGER DEFAULT 0,
+            cursor_joined_date TEXT,
+            cursor_user_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_status
+        ON broadcast_jobs (status)
+    """)
+
+    # Hasil per penerima yang tidak terkirim (yang sukses cukup dihitung)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_outcomes (
+            job_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            outcome TEXT NOT NULL,
+            error TEXT,
+            PRIMARY KEY (job_id, user_id)
+        ) WITHOUT ROWID
+    """)
+
+# ==================== v6: Pesan terjadwal ====================
+
+def _v6_up(cursor: sqlite3.Cursor):
+    # Pesan terjadwal (reminder/timer) yang disimpan saat shutdown
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER,
+            text TEXT NOT NULL,
+            parse_mode TEXT,
+            reply_to_message_id INTEGER,
+            due_at INTEGER NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+# ==================== v7: User aktif per (tanggal, user) ====================
+
+def _v7_up(cursor: sqlite3.Cursor):
+    # Pasangan (tanggal, user) yang sudah dihitung di stats_daily_users, agar
+    # setiap user dihitung tepat sekali per hari walau event datang terlambat
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_daily_user_seen (
+            date TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (date, user_id)
+        ) WITHOUT ROWID
+    """)
+
+def _v7_backfill(conn: sqlite3.Connection, chunk_size: int) -> Iterator[int]:
+    """
+    Mengisi pasangan (tanggal, user) dari tabel stats per rentang tanggal
+    dan memperbaiki stats_daily_users yang kurang hitung (tidak pernah
+    diturunkan: tanggal yang baris stats-nya sudah di-prune tetap utuh)
+    """
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM stats ORDER BY date")]
+    dates_per_chunk = max(1, chunk_size // 100)
+
+    for i in range(0, len(dates), dates_per_chunk):
+        first, last = dates[i], dates[min(i + dates_per_chunk, len(dates)) - 1]
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO stats_daily_user_seen (date, user_id)
+            SELECT DISTINCT date, user_id FROM stats
+            WHERE date BETWEEN ? AND ?
+        """, (first, last))
+        rows = cursor.rowcount
+        conn.execute("""
+            INSERT INTO stats_daily_users (date, active_users)
+            SELECT date, COUNT(*) FROM stats_daily_user_seen
+            WHERE date BETWEEN ? AND ?
+            GROUP BY date
+            ON CONFLICT(date) DO UPDATE
+            SET active_users = MAX(active_users, excluded.active_users)
+        """, (first, last))
+        yield rows
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _v1_up),
+    Migration(2, "users keyset index", _v2_up),
+    Migration(3, "stats rollup tables", _v3_up, _v3_backfill),
+    Migration(4, "epoch timestamp columns", _v4_up, _v4_backfill),
+    Migration(5, "broadcast jobs", _v5_up),
+    Migration(6, "scheduled messages", _v6_up),
+    Migration(7, "daily active user pairs", _v7_up, _v7_backfill),
+]
+
+# Versi skema terbaru
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Membaca PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(conn: sqlite3.Connection, chunk_size: int = 5000,
+                   migrations: Optional[List[Migration]] = None) -> MigrationReport:
+    """
+    Menjalankan semua migrasi yang belum diterapkan, berurutan.
+
+    DDL setiap migrasi dijalankan dalam satu transaksi. Backfill data
+    dijalankan per chunk, setiap chunk di-commit sendiri agar write lock
+    tidak ditahan lama. user_version baru dinaikkan setelah backfill
+    selesai, sehingga migrasi yang terputus akan diulang saat startup.
+
+    Args:
+        conn: Koneksi writer
+        chunk_size: Jumlah baris per chunk backfill
+        migrations: Daftar migrasi (default: MIGRATIONS)
+
+    Returns:
+        MigrationReport
+    """
+    migrations = migrations or MIGRATIONS
+    started = time.perf_counter()
+    current = get_schema_version(conn)
+    report = MigrationReport(from_version=current, to_version=current)
+
+    if conn.in_transaction:
+        conn.commit()
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+
+        step_started = time.perf_counter()
+        rows = 0
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration.up(conn.cursor())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if migration.backfill is not None:
+            for chunk_rows in migration.backfill(conn, chunk_size):
+                conn.commit()
+                rows += chunk_rows
+            conn.commit()
+
+        # PRAGMA tidak bisa memakai parameter; versi selalu int
+        conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        conn.commit()
+
+        current = migration.version
+        report.to_version = current
+        report.applied.append((
+            migration.version, migration.description,
+            (time.perf_counter() - step_started) * 1000, rows
+        ))
+
+    report.total_ms = (time.perf_counter() - started) * 1000
+    return report
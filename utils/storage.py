@@ -0,0 +1,785 @@
+"""
+========================================
+Modular Telegram Bot - Storage Backends
+========================================
+Nama: Storage
+Deskripsi: Interface abstrak storage backend beserta implementasi
+           in-memory dan key-value embedded (dbm)
+Command: -
+Usage: Backend dipilih lewat DATABASE_URL di config.py
+       - sqlite:///data/bot_database.db  (default, utils.database.Database)
+       - memory://                        (MemoryBackend, untuk test/benchmark)
+       - dbm:///data/bot_counters         (DbmBackend, key-value embedded)
+========================================
+"""
+
+import asyncio
+import bisect
+import dbm
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import (
+    Optional, List, Dict, Any, Tuple, Iterable, Iterator, NamedTuple, Callable, Mapping,
+    Sequence
+)
+
+class UserRow(NamedTuple):
+    """Baris user ringkas untuk iterasi massal (broadcast, export)"""
+    user_id: int
+    username: Optional[str]
+    first_name: Optional[str]
+    language_code: Optional[str]
+    joined_date: str
+
+# Filter yang didukung get_users_page/iter_users: nama -> kolom user
+USER_FILTER_COLUMNS = {
+    "is_banned": "is_banned",
+    "is_blocked": "is_blocked",
+    "is_bot": "is_bot",
+    "language_code": "language_code",
+    "active_since": "last_activity_at",  # epoch detik, dibandingkan dengan >=
+}
+
+# Kolom yang diekspor/diimpor per tabel (urutan = urutan kolom file)
+EXPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": (
+        "user_id", "username", "first_name", "last_name", "language_code", "is_bot",
+        "joined_date", "last_activity", "message_count", "is_banned",
+        "joined_at", "last_activity_at", "is_blocked"
+    ),
+    "stats": ("date", "command", "user_id", "count"),
+}
+
+# Kolom pesan terjadwal (tabel scheduled_messages, tanpa id dan created_at)
+SCHEDULED_MESSAGE_COLUMNS: Tuple[str, ...] = (
+    "kind", "chat_id", "user_id", "text", "parse_mode", "reply_to_message_id", "due_at"
+)
+
+def utc_today() -> str:
+    """Tanggal UTC hari ini (sama dengan CURRENT_DATE di SQLite)"""
+    return datetime.now(timezone.utc).date().isoformat()
+
+def parse_database_url(url: str) -> Tuple[str, str]:
+    """
+    Memecah DATABASE_URL menjadi (scheme, path).
+
+    sqlite:///data/bot.db -> ("sqlite", "data/bot.db")
+    sqlite:////abs/bot.db -> ("sqlite", "/abs/bot.db")
+    memory://             -> ("memory", "")
+    """
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        # Tanpa scheme: anggap path file SQLite
+        return "sqlite", url
+    path = rest[1:] if rest.startswith("/") else rest
+    return scheme.lower(), path
+
+class StorageBackend(ABC):
+    """
+    Interface storage untuk bot.
+
+    Subclass wajib mengimplementasikan method abstrak. Snapshot settings,
+    subscriber, iter_users, log_command dan update_user_activity sudah
+    disediakan di sini di atas method abstrak tersebut.
+    """
+
+    def __init__(self):
+        # Laporan migrasi skema (hanya diisi backend yang punya migrasi)
+        self.migration_report = None
+        # Hasil write terakhir: None = belum ada write, False = write gagal
+        # karena database tidak bisa ditulis (read-only, disk penuh, I/O)
+        self.writable: Optional[bool] = None
+
+        # Snapshot immutable tabel settings + subscriber perubahan
+        self._settings: Mapping[str, Any] = MappingProxyType({})
+        self._settings_lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[Callable, Optional[asyncio.AbstractEventLoop]]]] = {}
+
+    # Error Handling
+    @contextmanager
+    def propagate_busy(self):
+        """Context manager agar error "busy" di-raise (default: tidak ada efek)"""
+        yield
+
+    def _raise_if_busy(self, error: Exception):
+        """Raise ulang error busy jika diminta (default: tidak ada efek)"""
+
+    def close(self):
+        """Menutup backend"""
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistik cache backend (jika ada)"""
+        return {}
+
+    def get_query_metrics(self) -> Dict[str, Any]:
+        """Metrik query per method (jika backend mendukung instrumentasi)"""
+        return {}
+
+    def check_health(self, quick_check: bool = False) -> bool:
+        """
+        Readiness check murah (tanpa write lock): backend bisa dibaca dan
+        write terakhir tidak gagal
+        """
+        return self.writable is not False
+
+    # Maintenance Methods
+    def backup(self, dest_path: str, pages: int = 256, sleep: float = 0.05) -> Dict[str, Any]:
+        """Backup online (tidak didukung semua backend)"""
+        raise NotImplementedError(f"{type(self).__name__} does not support backup")
+
+    def run_maintenance(self, vacuum_pages: int = 1000) -> Dict[str, Any]:
+        """Maintenance berkala (default: tidak ada yang dilakukan)"""
+        return {}
+
+    def prune_stats(self, before: str, limit: int = 1000) -> int:
+        """
+        Menghapus maksimal `limit` counter per user dengan tanggal < `before`.
+        Agregat harian per command tetap disimpan. Mengembalikan jumlah
+        baris yang dihapus (0 berarti tidak ada lagi yang perlu dihapus).
+        """
+        return 0
+
+    def get_storage_size(self) -> int:
+        """Ukuran data yang terpakai dalam bytes (0 jika tidak diketahui)"""
+        return 0
+
+    # Export/Import Methods
+    def export_rows(self, table: str, batch_size: int = 1000) -> Iterator[tuple]:
+        """Generator baris `table` sesuai EXPORT_COLUMNS (tidak didukung semua backend)"""
+        raise NotImplementedError(f"{type(self).__name__} does not support export")
+
+    def import_rows(self, table: str, rows: Iterable[tuple], chunk_size: int = 1000) -> int:
+        """Mengimpor baris `table` per chunk (tidak didukung semua backend)"""
+        raise NotImplementedError(f"{type(self).__name__} does not support import")
+
+    # User Methods
+    @abstractmethod
+    def add_user(self, user_id: int, username: Optional[str] = None,
+                 first_name: Optional[str] = None, last_name: Optional[str] = None,
+                 language_code: Optional[str] = None, is_bot: bool = False) -> bool:
+        """Menambahkan atau update user"""
+
+    def update_user_activity(self, user_id: int):
+        """Update aktivitas terakhir user"""
+        self.apply_write_batch({user_id: (1, datetime.now().isoformat())}, {})
+
+    @abstractmethod
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan data user"""
+
+    @abstractmethod
+    def get_all_users(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Mendapatkan semua user"""
+
+    @abstractmethod
+    def get_users_page(self, batch_size: int = 500, after: Optional[Tuple[str, int]] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[UserRow]:
+        """Mendapatkan satu halaman user (joined_date DESC, user_id DESC)"""
+
+    def iter_users(self, batch_size: int = 500,
+                   filters: Optional[Dict[str, Any]] = None) -> Iterator[UserRow]:
+        """Iterasi semua user per batch tanpa memuat seluruh tabel ke memory"""
+        after = None
+        while True:
+            rows = self.get_users_page(batch_size, after, filters)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1].joined_date, rows[-1].user_id)
+
+    @abstractmethod
+    def get_user_count(self) -> int:
+        """Mendapatkan jumlah user"""
+
+    # Stats Methods
+    def log_command(self, command: str, user_id: int):
+        """Mencatat penggunaan command"""
+        self.apply_write_batch({}, {(utc_today(), command, user_id): 1})
+
+    @abstractmethod
+    def apply_write_batch(self, activity: Dict[int, Tuple[int, str]],
+                          commands: Dict[Tuple[str, str, int], int]) -> bool:
+        """
+        Menulis batch aktivitas user dan counter command sekaligus.
+
+        Args:
+            activity: {user_id: (jumlah pesan, last_activity ISO)}
+            commands: {(date, command, user_id): count}
+        """
+
+    @abstractmethod
+    def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        """Mendapatkan statistik penggunaan"""
+
+    # Broadcast Methods
+    @abstractmethod
+    def create_broadcast_job(self, message: str, parse_mode: Optional[str] = None,
+                             created_by: Optional[int] = None, total: int = 0,
+                             status_chat_id: Optional[int] = None,
+                             status_message_id: Optional[int] = None) -> int:
+        """Membuat job broadcast baru (status pending), mengembalikan id job"""
+
+    @abstractmethod
+    def get_broadcast_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan satu job broadcast"""
+
+    @abstractmethod
+    def get_broadcast_jobs(self, statuses: Optional[Sequence[str]] = None,
+                           limit: int = 20) -> List[Dict[str, Any]]:
+        """Daftar job broadcast terbaru (opsional difilter status)"""
+
+    @abstractmethod
+    def set_broadcast_status(self, job_id: int, status: str) -> bool:
+        """Mengubah status job (pending, running, done, cancelled)"""
+
+    @abstractmethod
+    def checkpoint_broadcast(self, job_id: int, cursor: Tuple[str, int], sent: int,
+                             outcomes: List[Tuple[int, str, Optional[str]]]) -> bool:
+        """
+        Menyimpan hasil satu batch secara atomik: posisi keyset terakhir,
+        jumlah terkirim, hasil per penerima yang gagal, dan menandai user
+        dengan outcome "blocked" sebagai is_blocked.
+        """
+
+    @abstractmethod
+    def get_broadcast_outcomes(self, job_id: int) -> Dict[str, int]:
+        """Jumlah penerima gagal per outcome {outcome: count}"""
+
+    # Scheduled Message Methods
+    @abstractmethod
+    def save_scheduled_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Menyimpan pesan terjadwal yang belum terkirim (dipanggil saat
+        shutdown). Kolom: SCHEDULED_MESSAGE_COLUMNS.
+        """
+
+    @abstractmethod
+    def pop_scheduled_messages(self) -> List[Dict[str, Any]]:
+        """Mengambil lalu menghapus semua pesan terjadwal (urut due_at)"""
+
+    # Plugin Methods
+    @abstractmethod
+    def register_plugin(self, name: str, description: str = "",
+                        version: str = "1.0", author: str = "Unknown") -> bool:
+        """Mendaftarkan plugin"""
+
+    @abstractmethod
+    def update_plugin_usage(self, name: str):
+        """Update penggunaan plugin"""
+
+    @abstractmethod
+    def get_plugin_stats(self) -> List[Dict[str, Any]]:
+        """Mendapatkan statistik plugin"""
+
+    # Settings Methods
+    @abstractmethod
+    def _load_settings(self) -> Dict[str, Any]:
+        """Membaca semua setting dari storage"""
+
+    @abstractmethod
+    def _write_setting(self, key: str, value: str) -> bool:
+        """Menulis satu setting ke storage"""
+
+    def reload_settings(self):
+        """Memuat ulang settings ke snapshot in-memory"""
+        try:
+            snapshot = self._load_settings()
+            with self._settings_lock:
+                self._settings = MappingProxyType(snapshot)
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+
+    def set_setting(self, key: str, value: str):
+        """Menyimpan setting (write-through ke storage dan snapshot)"""
+        if not self._write_setting(key, value):
+            return
+
+        # Snapshot diganti utuh, pembaca tidak pernah melihat dict setengah jadi
+        with self._settings_lock:
+            snapshot = dict(self._settings)
+            snapshot[key] = value
+            self._settings = MappingProxyType(snapshot)
+
+        self._notify_setting(key, value)
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """Mendapatkan setting dari snapshot in-memory (tanpa akses disk)"""
+        return self._settings.get(key, default)
+
+    def get_settings(self) -> Mapping[str, Any]:
+        """Mendapatkan snapshot read-only semua setting"""
+        return self._settings
+
+    def subscribe_setting(self, key: str, callback: Callable[[str, Any], Any]) -> Callable[[], None]:
+        """
+        Mendaftarkan callback yang dipanggil saat setting berubah.
+
+        Args:
+            key: Key setting, atau "*" untuk semua key
+            callback: Fungsi callback(key, value). Jika coroutine function,
+                      harus didaftarkan dari dalam event loop dan akan
+                      dijadwalkan di loop tersebut.
+
+        Returns:
+            Fungsi untuk berhenti subscribe
+        """
+        loop = asyncio.get_running_loop() if asyncio.iscoroutinefunction(callback) else None
+        entry = (callback, loop)
+        with self._settings_lock:
+            self._subscribers.setdefault(key, []).append(entry)
+
+        def unsubscribe():
+            with self._settings_lock:
+                if entry in self._subscribers.get(key, []):
+                    self._subscribers[key].remove(entry)
+
+        return unsubscribe
+
+    def _notify_setting(self, key: str, value: Any):
+        """Memanggil semua subscriber untuk key yang berubah"""
+        with self._settings_lock:
+            entries = list(self._subscribers.get(key, [])) + list(self._subscribers.get("*", []))
+
+        for callback, loop in entries:
+            try:
+                if loop is not None:
+                    asyncio.run_coroutine_threadsafe(callback(key, value), loop)
+                else:
+                    callback(key, value)
+            except Exception as e:
+                print(f"Error in setting subscriber for '{key}': {e}")
+
+class KeyValueBackend(StorageBackend):
+    """
+    Backend di atas key-value store sederhana.
+
+    Layout key:
+        user:<id>                   -> record user (kolom sama dengan tabel users)
+        stat:<date>:<cmd>:<user_id> -> counter per user
+        daily:<date>                -> {command: total}
+        dau:<date>                  -> [user_id, ...] user aktif hari itu
+        plugin:<name>               -> record plugin
+        setting:<key>               -> value
+        broadcast:<id>              -> record job broadcast
+        broadcast_outcome:<id>:<uid> -> [outcome, error] penerima gagal
+        scheduled:<id>              -> record pesan terjadwal
+
+    Subclass cukup mengimplementasikan _get, _put dan _keys.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()
+        # Index terurut (joined_date, user_id) untuk keyset pagination
+        self._user_index: List[Tuple[str, int]] = []
+        self._build_user_index()
+        self.reload_settings()
+
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        """Membaca value (None jika tidak ada)"""
+
+    @abstractmethod
+    def _put(self, key: str, value: Any):
+        """Menulis value"""
+
+    @abstractmethod
+    def _keys(self, prefix: str) -> Iterator[str]:
+        """Semua key dengan prefix tertentu"""
+
+    @abstractmethod
+    def _delete(self, key: str):
+        """Menghapus key (jika ada)"""
+
+    def _flush(self):
+        """Dipanggil setelah batch write (misal untuk sync ke disk)"""
+
+    def _build_user_index(self):
+        with self._lock:
+            index = []
+            for key in self._keys("user:"):
+                user = self._get(key)
+                index.append((user["joined_date"], user["user_id"]))
+            index.sort()
+            self._user_index = index
+
+    # User Methods
+    def add_user(self, user_id: int, username: Optional[str] = None,
+                 first_name: Optional[str] = None, last_name: Optional[str] = None,
+                 language_code: Optional[str] = None, is_bot: bool = False) -> bool:
+        """Menambahkan atau update user (counter dan joined_date dipertahankan)"""
+        now = datetime.now()
+        with self._lock:
+            user = self._get(f"user:{user_id}")
+            if user is None:
+                joined = datetime.now(timezone.utc)
+                user = {
+                    "user_id": user_id,
+                    "joined_date": joined.strftime("%Y-%m-%d %H:%M:%S"),
+                    "joined_at": int(joined.timestamp()),
+                    "message_count": 0,
+                    "is_banned": 0
+                }
+                bisect.insort(self._user_index, (user["joined_date"], user_id))
+            user.update({
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+                "language_code": language_code,
+                "is_bot": 1 if is_bot else 0,
+                "last_activity": now.isoformat(),
+                "last_activity_at": int(now.timestamp())
+            })
+            self._put(f"user:{user_id}", user)
+            self._flush()
+        return True
+
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan data user"""
+        with self._lock:
+            return self._get(f"user:{user_id}")
+
+    def get_all_users(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Mendapatkan semua user"""
+        with self._lock:
+            keys = list(reversed(self._user_index))[offset:offset + limit]
+            return [self._get(f"user:{user_id}") for _, user_id in keys]
+
+    def get_users_page(self, batch_size: int = 500, after: Optional[Tuple[str, int]] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[UserRow]:
+        """Mendapatkan satu halaman user dengan keyset pagination"""
+        filters = filters or {}
+        for name in filters:
+            if name not in USER_FILTER_COLUMNS:
+                raise ValueError(f"Unknown user filter: {name}")
+
+        rows: List[UserRow] = []
+        with self._lock:
+            end = bisect.bisect_left(self._user_index, tuple(after)) if after else len(self._user_index)
+            for i in range(end - 1, -1, -1):
+                user = self._get(f"user:{self._user_index[i][1]}")
+                if not self._match_filters(user, filters):
+                    continue
+                rows.append(UserRow(user["user_id"], user.get("username"), user.get("first_name"),
+                                    user.get("language_code"), user["joined_date"]))
+                if len(rows) >= batch_size:
+                    break
+        return rows
+
+    @staticmethod
+    def _match_filters(user: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        for name, value in filters.items():
+            column = USER_FILTER_COLUMNS[name]
+            if name == "active_since":
+                if (user.get(column) or 0) < value:
+                    return False
+            elif isinstance(value, (bool, int)):
+                # Flag yang belum pernah ditulis dianggap 0
+                if (user.get(column) or 0) != int(value):
+                    return False
+            elif user.get(column) != value:
+                return False
+        return True
+
+    def get_user_count(self) -> int:
+        """Mendapatkan jumlah user"""
+        return len(self._user_index)
+
+    # Stats Methods
+    def apply_write_batch(self, activity: Dict[int, Tuple[int, str]],
+                          commands: Dict[Tuple[str, str, int], int]) -> bool:
+        """Menulis batch aktivitas user dan counter command"""
+        with self._lock:
+            for user_id, (count, last) in activity.items():
+                user = self._get(f"user:{user_id}")
+                if user is None:
+                    continue
+                user["message_count"] = user.get("message_count", 0) + count
+                user["last_activity"] = last
+                user["last_activity_at"] = int(datetime.fromisoformat(last).timestamp())
+                user["is_blocked"] = 0
+                self._put(f"user:{user_id}", user)
+
+            daily: Dict[str, Dict[str, int]] = {}
+            active: Dict[str, set] = {}
+            for (date, command, user_id), count in commands.items():
+                key = f"stat:{date}:{command}:{user_id}"
+                self._put(key, (self._get(key) or 0) + count)
+                totals = daily.setdefault(date, self._get(f"daily:{date}") or {})
+                totals[command] = totals.get(command, 0) + count
+                active.setdefault(date, set(self._get(f"dau:{date}") or [])).add(user_id)
+
+            for date, totals in daily.items():
+                self._put(f"daily:{date}", totals)
+            for date, users in active.items():
+                self._put(f"dau:{date}", sorted(users))
+
+            self._flush()
+        return True
+
+    def prune_stats(self, before: str, limit: int = 1000) -> int:
+        """Menghapus counter per user lama (rollup daily:<date> tetap ada)"""
+        with self._lock:
+            expired = []
+            for key in self._keys("stat:"):
+                if key.split(":", 2)[1] < before:
+                    expired.append(key)
+                    if len(expired) >= limit:
+                        break
+            for key in expired:
+                self._delete(key)
+            self._flush()
+        return len(expired)
+
+    def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        """Mendapatkan statistik dari rollup harian (O(days x commands))"""
+        today = datetime.now(timezone.utc).date()
+        dates = [(today - timedelta(days=i)).isoformat() for i in range(int(days), -1, -1)]
+
+        totals: Dict[str, int] = {}
+        active_users: set = set()
+        daily_active_users = []
+        with self._lock:
+            for date in dates:
+                for command, total in (self._get(f"daily:{date}") or {}).items():
+                    totals[command] = totals.get(command, 0) + total
+                users = self._get(f"dau:{date}")
+                if users:
+                    active_users.update(users)
+                    daily_active_users.append({"date": date, "active_users": len(users)})
+
+        top_commands = sorted(
+            ({"command": command, "total": total} for command, total in totals.items()),
+            key=lambda item: item["total"], reverse=True
+        )[:10]
+
+        return {
+            "total_commands": sum(totals.values()),
+            "active_users": len(active_users),
+            "top_commands": top_commands,
+            "daily_active_users": daily_active_users,
+            "period_days": days
+        }
+
+    # Broadcast Methods
+    def create_broadcast_job(self, message: str, parse_mode: Optional[str] = None,
+                             created_by: Optional[int] = None, total: int = 0,
+                             status_chat_id: Optional[int] = None,
+                             status_message_id: Optional[int] = None) -> int:
+        """Membuat job broadcast baru"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            job_id = (self._get("broadcast_seq") or 0) + 1
+            self._put("broadcast_seq", job_id)
+            self._put(f"broadcast:{job_id}", {
+                "id": job_id, "message": message, "parse_mode": parse_mode,
+                "status": "pending", "created_by": created_by,
+                "status_chat_id": status_chat_id, "status_message_id": status_message_id,
+                "total": total, "sent": 0, "failed": 0, "blocked": 0,
+                "cursor_joined_date": None, "cursor_user_id": None,
+                "created_at": now, "updated_at": now, "finished_at": None
+            })
+            self._flush()
+        return job_id
+
+    def get_broadcast_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Mendapatkan satu job broadcast"""
+        with self._lock:
+            return self._get(f"broadcast:{job_id}")
+
+    def get_broadcast_jobs(self, statuses: Optional[Sequence[str]] = None,
+                           limit: int = 20) -> List[Dict[str, Any]]:
+        """Daftar job broadcast terbaru"""
+        with self._lock:
+            jobs = [self._get(key) for key in self._keys("broadcast:")]
+        jobs = [job for job in jobs if not statuses or job["status"] in statuses]
+        return sorted(jobs, key=lambda job: job["id"], reverse=True)[:limit]
+
+    def set_broadcast_status(self, job_id: int, status: str) -> bool:
+        """Mengubah status job"""
+        with self._lock:
+            job = self._get(f"broadcast:{job_id}")
+            if job is None:
+                return False
+            job["status"] = status
+            job["updated_at"] = datetime.now().isoformat()
+            if status in ("done", "cancelled"):
+                job["finished_at"] = job["updated_at"]
+            self._put(f"broadcast:{job_id}", job)
+            self._flush()
+        return True
+
+    def checkpoint_broadcast(self, job_id: int, cursor: Tuple[str, int], sent: int,
+                             outcomes: List[Tuple[int, str, Optional[str]]]) -> bool:
+        """Menyimpan hasil satu batch broadcast"""
+        with self._lock:
+            job = self._get(f"broadcast:{job_id}")
+            if job is None:
+                return False
+            blocked = 0
+            for user_id, outcome, error in outcomes:
+                self._put(f"broadcast_outcome:{job_id}:{user_id}", [outcome, error])
+                if outcome == "blocked":
+                    blocked += 1
+                    user = self._get(f"user:{user_id}")
+                    if user is not None:
+                        user["is_blocked"] = 1
+                        self._put(f"user:{user_id}", user)
+            job["cursor_joined_date"], job["cursor_user_id"] = cursor
+            job["sent"] += sent
+            job["blocked"] += blocked
+            job["failed"] += len(outcomes) - blocked
+            job["updated_at"] = datetime.now().isoformat()
+            self._put(f"broadcast:{job_id}", job)
+            self._flush()
+        return True
+
+    def get_broadcast_outcomes(self, job_id: int) -> Dict[str, int]:
+        """Jumlah penerima gagal per outcome"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for key in self._keys(f"broadcast_outcome:{job_id}:"):
+                outcome = self._get(key)[0]
+                counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+    # Scheduled Message Methods
+    def save_scheduled_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Menyimpan pesan terjadwal"""
+        with self._lock:
+            next_id = self._get("scheduled_seq") or 0
+            for message in messages:
+                next_id += 1
+                record = {column: message.get(column) for column in SCHEDULED_MESSAGE_COLUMNS}
+                record["id"] = next_id
+                self._put(f"scheduled:{next_id}", record)
+            self._put("scheduled_seq", next_id)
+            self._flush()
+        return len(messages)
+
+    def pop_scheduled_messages(self) -> List[Dict[str, Any]]:
+        """Mengambil lalu menghapus semua pesan terjadwal"""
+        with self._lock:
+            keys = list(self._keys("scheduled:"))
+            messages = [self._get(key) for key in keys]
+            for key in keys:
+                self._delete(key)
+            self._flush()
+        return sorted(messages, key=lambda message: (message["due_at"], message["id"]))
+
+    # Plugin Methods
+    def register_plugin(self, name: str, description: str = "",
+                        version: str = "1.0", author: str = "Unknown") -> bool:
+        """Mendaftarkan plugin"""
+        with self._lock:
+            plugin = self._get(f"plugin:{name}") or {"usage_count": 0}
+            plugin.update({
+                "name": name,
+                "description": description,
+                "version": version,
+                "author": author,
+                "is_active": 1,
+                "install_date": datetime.now().isoformat()
+            })
+            self._put(f"plugin:{name}", plugin)
+            self._flush()
+        return True
+
+    def update_plugin_usage(self, name: str):
+        """Update penggunaan plugin"""
+        with self._lock:
+            plugin = self._get(f"plugin:{name}")
+            if plugin is not None:
+                plugin["usage_count"] = plugin.get("usage_count", 0) + 1
+                self._put(f"plugin:{name}", plugin)
+
+    def get_plugin_stats(self) -> List[Dict[str, Any]]:
+        """Mendapatkan statistik plugin"""
+        with self._lock:
+            plugins = [self._get(key) for key in self._keys("plugin:")]
+        return sorted(plugins, key=lambda p: p.get("usage_count", 0), reverse=True)
+
+    # Settings Methods
+    def _load_settings(self) -> Dict[str, Any]:
+        with self._lock:
+            return {key[len("setting:"):]: self._get(key) for key in self._keys("setting:")}
+
+    def _write_setting(self, key: str, value: str) -> bool:
+        with self._lock:
+            self._put(f"setting:{key}", value)
+            self._flush()
+        return True
+
+class MemoryBackend(KeyValueBackend):
+    """Backend in-memory (tanpa disk I/O) untuk test dan benchmark"""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        super().__init__()
+
+    def _get(self, key: str) -> Any:
+        value = self._data.get(key)
+        # Salinan agar pemanggil tidak mengubah data tersimpan
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return list(value)
+        return value
+
+    def _put(self, key: str, value: Any):
+        self._data[key] = value
+
+    def _delete(self, key: str):
+        self._data.pop(key, None)
+
+    def _keys(self, prefix: str) -> Iterator[str]:
+        return iter([key for key in self._data if key.startswith(prefix)])
+
+class DbmBackend(KeyValueBackend):
+    """
+    Backend key-value embedded di atas modul dbm (value disimpan JSON).
+    Cocok untuk counter yang sering ditulis.
+    """
+
+    def __init__(self, path: str = "data/bot_counters"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._store = dbm.open(path, "c")
+        super().__init__()
+
+    def _get(self, key: str) -> Any:
+        raw = self._store.get(key.encode())
+        return json.loads(raw) if raw is not None else None
+
+    def _put(self, key: str, value: Any):
+        self._store[key.encode()] = json.dumps(value, separators=(",", ":")).encode()
+
+    def _delete(self, key: str):
+        try:
+            del self._store[key.encode()]
+        except KeyError:
+            pass
+
+    def _keys(self, prefix: str) -> Iterator[str]:
+        encoded = prefix.encode()
+        return iter([key.decode() for key in self._store.keys() if key.startswith(encoded)])
+
+    def _flush(self):
+        sync = getattr(self._store, "sync", None)
+        if sync is not None:
+            sync()
+
+    def close(self):
+        """Menutup file dbm"""
+        with self._lock:
+            if self._store is not None:
+                self._flush()
+                self._store.close()
+                self._store = None
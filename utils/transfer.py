@@ -0,0 +1,168 @@
+"""
+========================================
+Modular Telegram Bot - Data Transfer
+========================================
+Nama: Transfer
+Deskripsi: Export/import streaming tabel users dan stats ke/dari
+           file NDJSON atau CSV (memory konstan)
+Command: -
+Usage: python -m utils.transfer export users users.ndjson
+       python -m utils.transfer export stats stats.csv
+       python -m utils.transfer import users users.ndjson
+========================================
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from utils.storage import EXPORT_COLUMNS, StorageBackend
+
+FORMATS = ("ndjson", "csv")
+
+# Kolom integer (CSV menyimpan semua value sebagai teks)
+INTEGER_COLUMNS = {
+    "user_id", "is_bot", "message_count", "is_banned", "is_blocked",
+    "joined_at", "last_activity_at", "count"
+}
+
+# Flag yang tidak ada di file lama dianggap 0 (bukan NULL)
+FLAG_COLUMNS = {"is_bot", "is_banned", "is_blocked"}
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Format dari argumen atau ekstensi file (.csv, selain itu NDJSON)"""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+def _check_table(table: str):
+    if table not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown table: {table} (pilihan: {', '.join(EXPORT_COLUMNS)})")
+
+def write_rows(rows: Iterator[tuple], table: str, fp: TextIO, fmt: str) -> int:
+    """Menulis baris ke file yang sudah dibuka, satu per satu"""
+    columns = EXPORT_COLUMNS[table]
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(fp)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+            count += 1
+    else:
+        for row in rows:
+            fp.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            fp.write("\n")
+            count += 1
+    return count
+
+def read_rows(fp: TextIO, table: str, fmt: str) -> Iterator[tuple]:
+    """Generator baris dari file (urutan kolom EXPORT_COLUMNS)"""
+    columns = EXPORT_COLUMNS[table]
+
+    if fmt == "csv":
+        for record in csv.DictReader(fp):
+            yield tuple(_convert(column, record.get(column)) for column in columns)
+        return
+
+    for line in fp:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        yield tuple(_convert(column, record.get(column)) for column in columns)
+
+def _convert(column: str, value: Any) -> Any:
+    """Normalisasi value dari file (string kosong CSV = NULL)"""
+    if value == "" or value is None:
+        return 0 if column in FLAG_COLUMNS else None
+    if column in INTEGER_COLUMNS and not isinstance(value, int):
+        return int(value)
+    return value
+
+def export_table(database: StorageBackend, table: str, path: str,
+                 fmt: Optional[str] = None, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Export satu tabel ke file. Ditulis ke `<path>.part` lalu di-rename.
+
+    Returns:
+        dict berisi table, path, format, rows, size dan duration_ms
+    """
+    _check_table(table)
+    fmt = detect_format(path, fmt)
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    start = time.perf_counter()
+    temp_path = f"{path}.part"
+    with open(temp_path, "w", encoding="utf-8", newline="") as fp:
+        rows = write_rows(database.export_rows(table, batch_size), table, fp, fmt)
+    os.replace(temp_path, path)
+
+    return {
+        "table": table,
+        "path": path,
+        "format": fmt,
+        "rows": rows,
+        "size": os.path.getsize(path),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+def import_table(database: StorageBackend, table: str, path: str,
+                 fmt: Optional[str] = None, chunk_size: int = 1000) -> Dict[str, Any]:
+    """
+    Import satu tabel dari file, per chunk `chunk_size` baris.
+
+    Returns:
+        dict berisi table, path, format, rows dan duration_ms
+    """
+    _check_table(table)
+    fmt = detect_format(path, fmt)
+
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8", newline="") as fp:
+        rows = database.import_rows(table, read_rows(fp, table, fmt), chunk_size)
+
+    return {
+        "table": table,
+        "path": path,
+        "format": fmt,
+        "rows": rows,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.transfer",
+        description="Export/import users dan stats (NDJSON atau CSV)"
+    )
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("table", choices=tuple(EXPORT_COLUMNS))
+    parser.add_argument("path", help="File tujuan/sumber (.csv atau .ndjson)")
+    parser.add_argument("--format", choices=FORMATS, help="Default: dari ekstensi file")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Baris per batch baca / transaksi import")
+    args = parser.parse_args(argv)
+
+    from utils.database import db
+
+    try:
+        if args.action == "export":
+            result = export_table(db, args.table, args.path, args.format, args.chunk_size)
+        else:
+            result = import_table(db, args.table, args.path, args.format, args.chunk_size)
+    finally:
+        db.close()
+
+    print(json.dumps(result))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+========================================
+Modular Telegram Bot - Write Buffer
+========================================
+Nama: WriteBuffer
+Deskripsi: Akumulator write-behind untuk update_user_activity dan
+           log_command. Event digabung di memory lalu di-flush dalam
+           satu transaksi executemany.
+Command: -
+Usage: Dipakai oleh AsyncDatabase (async_db.buffer)
+========================================
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable
+
+from utils.logger import logger
+
+# (date, command, user_id) -> count
+CommandKey = Tuple[str, str, int]
+
+class WriteBuffer:
+    """
+    Buffer write-behind.
+
+    - Aktivitas user digabung per user_id: (jumlah pesan, aktivitas terakhir)
+    - Counter command digabung per (date, command, user_id)
+    - Flush setiap `interval_ms` atau saat jumlah event mencapai `max_events`
+    """
+
+    def __init__(self, flush_func: Callable[[Dict[int, Tuple[int, str]], Dict[CommandKey, int]],
+                                            Awaitable[bool]],
+                 interval_ms: int = 1000, max_events: int = 500):
+        self.flush_func = flush_func
+        self.interval_ms = interval_ms
+        self.max_events = max_events
+
+        self._activity: Dict[int, Tuple[int, str]] = {}
+        self._commands: Dict[CommandKey, int] = {}
+        self._pending_events = 0
+        self._oldest_event: Optional[float] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # Metrics
+        self._flush_count = 0
+        self._event_count = 0
+        self._flushed_events = 0
+        self._failed_flushes = 0
+        self._last_batch_size = 0
+        self._max_batch_size = 0
+        self._last_flush_lag_ms = 0.0
+        self._max_flush_lag_ms = 0.0
+        self._last_flush_duration_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """True jika task flush periodik sedang berjalan"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_events(self) -> int:
+        """Jumlah event yang belum di-flush"""
+        return self._pending_events
+
+    def start(self):
+        """Memulai task flush periodik (harus dipanggil di dalam event loop)"""
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Menghentikan task periodik lalu flush semua sisa event. Task tidak
+        di-cancel: flush yang sedang berjalan ditunggu sampai selesai.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def add_activity(self, user_id: int):
+        """Mencatat satu aktivitas user"""
+        count, _ = self._activity.get(user_id, (0, ""))
+        self._activity[user_id] = (count + 1, datetime.now().isoformat())
+        self._event_added()
+
+    def add_command(self, command: str, user_id: int):
+        """Mencatat satu penggunaan command (tanggal UTC seperti CURRENT_DATE)"""
+        key = (datetime.now(timezone.utc).date().isoformat(), command, user_id)
+        self._commands[key] = self._commands.get(key, 0) + 1
+        self._event_added()
+
+    def _event_added(self):
+        """Update counter dan bangunkan flusher jika batas event tercapai"""
+        if self._oldest_event is None:
+            self._oldest_event = time.monotonic()
+        self._pending_events += 1
+        self._event_count += 1
+        if self._pending_events >= self.max_events and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        """Loop flush periodik (berhenti setelah flush berikutnya jika stop() dipanggil)"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write buffer flush error: {e}")
+
+    async def flush(self) -> int:
+        """
+        Menulis semua event tertunda dalam satu transaksi.
+
+        Returns:
+            Jumlah event yang di-flush
+        """
+        if not self._pending_events:
+            return 0
+
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            activity, commands = self._activity, self._commands
+            batch_size = self._pending_events
+            oldest = self._oldest_event
+
+            self._activity, self._commands = {}, {}
+            self._pending_events = 0
+            self._oldest_event = None
+
+            if not batch_size:
+                return 0
+
+            start = time.monotonic()
+            try:
+                ok = await self.flush_func(activity, commands)
+            except BaseException:
+                # Error atau cancel: batch tidak boleh hilang
+                self._failed_flushes += 1
+                self._merge_back(activity, commands, batch_size, oldest)
+                raise
+            end = time.monotonic()
+
+            if not ok:
+                # Kembalikan event ke buffer agar dicoba lagi di flush berikutnya
+                self._failed_flushes += 1
+                self._merge_back(activity, commands, batch_size, oldest)
+                return 0
+
+            lag_ms = (start - oldest) * 1000 if oldest is not None else 0.0
+            self._flush_count += 1
+            self._flushed_events += batch_size
+            self._last_batch_size = batch_size
+            self._max_batch_size = max(self._max_batch_size, batch_size)
+            self._last_flush_lag_ms = lag_ms
+            self._max_flush_lag_ms = max(self._max_flush_lag_ms, lag_ms)
+            self._last_flush_duration_ms = (end - start) * 1000
+            return batch_size
+
+    def _merge_back(self, activity: Dict[int, Tuple[int, str]], commands: Dict[CommandKey, int],
+                    batch_size: int, oldest: Optional[float]):
+        """Menggabungkan kembali batch yang gagal ke buffer"""
+        for user_id, (count, last) in activity.items():
+            current_count, current_last = self._activity.get(user_id, (0, ""))
+            self._activity[user_id] = (count + current_count, max(last, current_last))
+        for key, count in commands.items():
+            self._commands[key] = self._commands.get(key, 0) + count
+        self._pending_events += batch_size
+        if oldest is not None:
+            self._oldest_event = min(oldest, self._oldest_event or oldest)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Mendapatkan metrics buffer (flush lag, ukuran batch, dll)"""
+        return {
+            "pending_events": self._pending_events,
+            "total_events": self._event_count,
+            "flush_count": self._flush_count,
+            "failed_flushes": self._failed_flushes,
+            "last_batch_size": self._last_batch_size,
+            "max_batch_size": self._max_batch_size,
+            "avg_batch_size": round(self._flushed_events / self._flush_count, 2)
+            if self._flush_count else 0.0,
+            "last_flush_lag_ms": round(self._last_flush_lag_ms, 2),
+            "max_flush_lag_ms": round(self._max_flush_lag_ms, 2),
+            "last_flush_duration_ms": round(self._last_flush_duration_ms, 2)
+        }